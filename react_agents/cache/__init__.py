@@ -0,0 +1,4 @@
+from .answer_cache import CachedAgent, SemanticAnswerCache
+from .tool_memo import ToolMemo
+
+__all__ = ["CachedAgent", "SemanticAnswerCache", "ToolMemo"]
@@ -0,0 +1,305 @@
+import asyncio
+import hashlib
+import json
+import random
+import time
+import unicodedata
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+import chromadb
+from pydantic import BaseModel
+from ..models.agent_result import AgentResult
+from ..models.embeddings import BaseEmbedder
+from ..models.execution_context import ExecutionContext
+from ..types.events import Event
+
+
+def normalize_question(text: str) -> str:
+    """Case, width and whitespace folded, trailing punctuation dropped."""
+    text = unicodedata.normalize("NFKC", text).lower()
+    return " ".join(text.split()).rstrip("?.! ")
+
+
+def _digest(value: Any) -> str:
+    payload = json.dumps(value, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def agent_fingerprint(agent) -> Dict[str, str]:
+    """Hashes of what an agent's answers depend on besides the question."""
+    return {
+        "model": agent.model.model,
+        "instructions_hash": _digest(agent.instructions),
+        "tools_hash": _digest(
+            sorted((tool.name, tool.tool_definition) for tool in agent.tools)
+        ),
+    }
+
+
+def _dump_result(result: AgentResult) -> str:
+    output = result.output
+    if isinstance(output, BaseModel):
+        output = output.model_dump(mode="json")
+    context = result.context
+    return json.dumps(
+        {
+            "output": output,
+            "current_step": context.current_step,
+            "events": [event.model_dump(mode="json") for event in context.events],
+            "state": context.state,
+        },
+        default=str,
+    )
+
+
+def _load_result(payload: str) -> AgentResult:
+    data = json.loads(payload)
+    context = ExecutionContext(
+        events=[Event.model_validate(event) for event in data["events"]],
+        current_step=data["current_step"],
+        state=data["state"],
+        final_result=data["output"],
+    )
+    return AgentResult(output=data["output"], context=context)
+
+
+@dataclass
+class CacheHit:
+    """A stored answer returned for a question."""
+
+    id: str
+    question: str
+    similarity: float
+    exact: bool
+    created_at: float
+    result: AgentResult
+
+
+class SemanticAnswerCache:
+    """Whole-run answers looked up by question similarity.
+
+    Questions are normalized and embedded into a chromadb collection (kept
+    under `path`, or in memory when no path is given). A lookup returns a
+    stored answer when the nearest question under the same agent
+    fingerprint is at least `threshold` cosine-similar and younger than
+    `ttl` seconds. Exact matches after normalization skip the vector search.
+
+    Validators added with `add_validator(fn)` can reject a hit, which also
+    deletes it; `invalidate` removes entries explicitly. A share
+    `audit_rate` of semantic hits is re-run and compared with the stored
+    answer to estimate the false-hit rate, and the most recent semantic hits
+    are kept in `samples` for manual review.
+    """
+
+    def __init__(
+        self,
+        embedder: BaseEmbedder,
+        path: Optional[str] = None,
+        collection: str = "answer_cache",
+        threshold: float = 0.92,
+        ttl: Optional[float] = None,
+        audit_rate: float = 0.0,
+        sample_size: int = 100,
+        seed: Optional[int] = None,
+    ):
+        self.embedder = embedder
+        self.threshold = threshold
+        self.ttl = ttl
+        self.audit_rate = audit_rate
+        client = chromadb.PersistentClient(path) if path else chromadb.EphemeralClient()
+        self._collection = client.get_or_create_collection(
+            collection,
+            configuration={"hnsw": {"space": "cosine"}},
+            embedding_function=None,
+        )
+        self._validators: List[Callable[[CacheHit], bool]] = []
+        self._random = random.Random(seed)
+        self.samples: deque = deque(maxlen=sample_size)
+        self.audits: List[Dict[str, Any]] = []
+        self.counts = {"lookups": 0, "exact_hits": 0, "semantic_hits": 0, "rejected": 0}
+
+    def add_validator(self, validator: Callable[[CacheHit], bool]):
+        """Register `validator(hit) -> bool`; a False result invalidates the hit."""
+        self._validators.append(validator)
+
+    def _where(self, fingerprint: Dict[str, str]) -> dict:
+        clauses = [{key: value} for key, value in sorted(fingerprint.items())]
+        if self.ttl is not None:
+            clauses.append({"created_at": {"$gte": time.time() - self.ttl}})
+        return {"$and": clauses}
+
+    def _entry_id(self, question: str, fingerprint: Dict[str, str]) -> str:
+        return _digest([normalize_question(question), fingerprint])
+
+    async def lookup(
+        self, question: str, fingerprint: Dict[str, str]
+    ) -> Optional[CacheHit]:
+        """The stored answer for a question, or None on a miss."""
+        self.counts["lookups"] += 1
+        hit = await asyncio.to_thread(self._exact, question, fingerprint)
+        if hit is None:
+            [vector] = await self.embedder.embed([normalize_question(question)])
+            hit = await asyncio.to_thread(self._nearest, vector, fingerprint)
+        if hit is None:
+            return None
+
+        if not all(validator(hit) for validator in self._validators):
+            self.counts["rejected"] += 1
+            self.invalidate(ids=[hit.id])
+            return None
+
+        if hit.exact:
+            self.counts["exact_hits"] += 1
+        else:
+            self.counts["semantic_hits"] += 1
+            self.samples.append(
+                {
+                    "question": question,
+                    "cached_question": hit.question,
+                    "similarity": hit.similarity,
+                    "cached_output": hit.result.output,
+                }
+            )
+        return hit
+
+    def _exact(self, question: str, fingerprint: Dict[str, str]) -> Optional[CacheHit]:
+        found = self._collection.get(
+            ids=[self._entry_id(question, fingerprint)],
+            include=["documents", "metadatas"],
+        )
+        if not found["ids"]:
+            return None
+        metadata = found["metadatas"][0]
+        if self.ttl is not None and metadata["created_at"] < time.time() - self.ttl:
+            return None
+        return CacheHit(
+            id=found["ids"][0],
+            question=found["documents"][0],
+            similarity=1.0,
+            exact=True,
+            created_at=metadata["created_at"],
+            result=_load_result(metadata["result"]),
+        )
+
+    def _nearest(self, vector, fingerprint: Dict[str, str]) -> Optional[CacheHit]:
+        found = self._collection.query(
+            query_embeddings=[vector],
+            n_results=1,
+            where=self._where(fingerprint),
+            include=["documents", "metadatas", "distances"],
+        )
+        if not found["ids"] or not found["ids"][0]:
+            return None
+        similarity = 1.0 - found["distances"][0][0]
+        if similarity < self.threshold:
+            return None
+        metadata = found["metadatas"][0][0]
+        return CacheHit(
+            id=found["ids"][0][0],
+            question=found["documents"][0][0],
+            similarity=similarity,
+            exact=False,
+            created_at=metadata["created_at"],
+            result=_load_result(metadata["result"]),
+        )
+
+    async def store(
+        self, question: str, fingerprint: Dict[str, str], result: AgentResult
+    ):
+        normalized = normalize_question(question)
+        [vector] = await self.embedder.embed([normalized])
+        await asyncio.to_thread(
+            self._collection.upsert,
+            ids=[self._entry_id(question, fingerprint)],
+            embeddings=[vector],
+            documents=[normalized],
+            metadatas=[
+                {
+                    **fingerprint,
+                    "created_at": time.time(),
+                    "result": _dump_result(result),
+                }
+            ],
+        )
+
+    def invalidate(
+        self,
+        ids: Optional[List[str]] = None,
+        fingerprint: Optional[Dict[str, str]] = None,
+        older_than: Optional[float] = None,
+    ):
+        """Delete entries by id, by agent fingerprint, or older than N seconds."""
+        if ids:
+            self._collection.delete(ids=ids)
+        clauses = [{key: value} for key, value in sorted((fingerprint or {}).items())]
+        if older_than is not None:
+            clauses.append({"created_at": {"$lt": time.time() - older_than}})
+        if clauses:
+            where = clauses[0] if len(clauses) == 1 else {"$and": clauses}
+            self._collection.delete(where=where)
+
+    def should_audit(self, hit: CacheHit) -> bool:
+        return not hit.exact and self._random.random() < self.audit_rate
+
+    def record_audit(self, question: str, hit: CacheHit, fresh: AgentResult):
+        """Compare a re-run with the hit it would have been served."""
+        cached, current = hit.result.output, fresh.output
+        agreed = normalize_question(str(cached)) == normalize_question(str(current))
+        self.audits.append(
+            {
+                "question": question,
+                "cached_question": hit.question,
+                "similarity": hit.similarity,
+                "cached_output": cached,
+                "fresh_output": current,
+                "agreed": agreed,
+            }
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit rate, and false-hit rate among audited semantic hits."""
+        hits = self.counts["exact_hits"] + self.counts["semantic_hits"]
+        false_hits = sum(not audit["agreed"] for audit in self.audits)
+        return {
+            **self.counts,
+            "entries": self._collection.count(),
+            "hit_rate": hits / self.counts["lookups"]
+            if self.counts["lookups"]
+            else 0.0,
+            "audits": len(self.audits),
+            "false_hits": false_hits,
+            "false_hit_rate": false_hits / len(self.audits) if self.audits else None,
+        }
+
+
+class CachedAgent:
+    """Puts a SemanticAnswerCache in front of an agent's `run`.
+
+    Only fresh runs are cached: a call that continues an existing context
+    goes straight to the agent, and runs without an output are not stored.
+    """
+
+    def __init__(self, agent, cache: SemanticAnswerCache):
+        self.agent = agent
+        self.cache = cache
+
+    async def run(
+        self, user_input: str, context: ExecutionContext = None
+    ) -> AgentResult:
+        if context is not None:
+            return await self.agent.run(user_input, context)
+
+        fingerprint = agent_fingerprint(self.agent)
+        hit = await self.cache.lookup(user_input, fingerprint)
+        if hit is not None:
+            if not self.cache.should_audit(hit):
+                return hit.result
+            result = await self.agent.run(user_input)
+            self.cache.record_audit(user_input, hit, result)
+            return result
+
+        result = await self.agent.run(user_input)
+        if result.output is not None:
+            await self.cache.store(user_input, fingerprint, result)
+        return result
@@ -0,0 +1,204 @@
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Dict, Optional, Tuple
+from ..models.execution_context import ExecutionContext
+from ..tools.base_tool import BaseTool
+
+
+def memo_key(
+    tool_name: str, arguments: Dict[str, Any], version: Optional[str] = None
+) -> str:
+    """Key for a call: the tool name and version plus its arguments in canonical JSON."""
+    canonical = json.dumps(
+        arguments, sort_keys=True, separators=(",", ":"), default=str
+    )
+    return hashlib.sha256(
+        f"{tool_name}\0{version or ''}\0{canonical}".encode()
+    ).hexdigest()
+
+
+class _InFlight:
+    """One shared execution and the number of callers waiting on it."""
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class DiskMemo:
+    """SQLite tier shared by every process that opens the same file."""
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS memo ("
+            "key TEXT PRIMARY KEY, tool TEXT, value TEXT, expires_at REAL)"
+        )
+
+    def get(self, key: str) -> Tuple[bool, Any, Optional[float]]:
+        row = self._db.execute(
+            "SELECT value, expires_at FROM memo WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None or (row[1] is not None and row[1] < time.time()):
+            return False, None, None
+        return True, json.loads(row[0]), row[1]
+
+    def put(self, key: str, tool: str, value: Any, expires_at: Optional[float]):
+        try:
+            payload = json.dumps(value)
+        except TypeError:
+            # Only JSON outputs can be shared; others stay in memory
+            return
+        self._db.execute(
+            "INSERT OR REPLACE INTO memo VALUES (?, ?, ?, ?)",
+            (key, tool, payload, expires_at),
+        )
+
+    def clear(self, tool: Optional[str] = None):
+        if tool is None:
+            self._db.execute("DELETE FROM memo")
+        else:
+            self._db.execute("DELETE FROM memo WHERE tool = ?", (tool,))
+
+    def close(self):
+        self._db.close()
+
+
+def _consume_exception(task: asyncio.Task):
+    # Every waiter may have left; don't warn about an unretrieved exception
+    if not task.cancelled():
+        task.exception()
+
+
+class ToolMemo:
+    """Memoizes tool calls according to each tool's `cache_policy`.
+
+    Results live in an in-process LRU of `max_entries` and, when `disk_path`
+    is given, in a SQLite file other runs and processes can share. Calls to
+    "side_effect" tools always execute; failed calls are never cached; and
+    identical calls in flight at the same time share one execution.
+    """
+
+    def __init__(self, max_entries: int = 1024, disk_path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.disk = DiskMemo(disk_path) if disk_path else None
+        self._entries: OrderedDict = OrderedDict()
+        self._in_flight: Dict[str, _InFlight] = {}
+        self._stats: Dict[str, Dict[str, int]] = defaultdict(
+            lambda: {
+                "calls": 0,
+                "memory_hits": 0,
+                "disk_hits": 0,
+                "misses": 0,
+                "bypassed": 0,
+            }
+        )
+
+    def _get(self, key: str, tool: str) -> Tuple[bool, Any, str]:
+        if key in self._entries:
+            _, value, expires_at = self._entries[key]
+            if expires_at is None or expires_at >= time.time():
+                self._entries.move_to_end(key)
+                return True, value, "memory_hits"
+            del self._entries[key]
+        if self.disk is not None:
+            found, value, expires_at = self.disk.get(key)
+            if found:
+                self._put_memory(key, tool, value, expires_at)
+                return True, value, "disk_hits"
+        return False, None, "misses"
+
+    def _put_memory(self, key: str, tool: str, value: Any, expires_at: Optional[float]):
+        self._entries[key] = (tool, value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def call(
+        self, tool: BaseTool, context: ExecutionContext, arguments: Dict[str, Any]
+    ) -> Any:
+        """Run `tool(context, **arguments)`, or return its memoized output."""
+        stats = self._stats[tool.name]
+        stats["calls"] += 1
+        if tool.cache_policy == "side_effect":
+            stats["bypassed"] += 1
+            return await tool(context, **arguments)
+
+        key = memo_key(tool.name, arguments, tool.cache_version)
+        found, value, tier = self._get(key, tool.name)
+        if found:
+            stats[tier] += 1
+            return value
+
+        if key in self._in_flight:
+            stats["memory_hits"] += 1
+        else:
+            stats["misses"] += 1
+            # The execution gets its own task (with the first caller's
+            # context), so one caller being cancelled does not fail the rest
+            task = asyncio.create_task(self._execute(tool, context, arguments, key))
+            task.add_done_callback(_consume_exception)
+            self._in_flight[key] = _InFlight(task)
+        return await self._join(key)
+
+    async def _join(self, key: str) -> Any:
+        entry = self._in_flight[key]
+        entry.waiters += 1
+        try:
+            return await asyncio.shield(entry.task)
+        finally:
+            entry.waiters -= 1
+            if entry.waiters == 0 and not entry.task.done():
+                # Nobody wants the result any more
+                entry.task.cancel()
+                if self._in_flight.get(key) is entry:
+                    del self._in_flight[key]
+
+    async def _execute(
+        self,
+        tool: BaseTool,
+        context: ExecutionContext,
+        arguments: Dict[str, Any],
+        key: str,
+    ) -> Any:
+        entry = self._in_flight.get(key)
+        try:
+            value = await tool(context, **arguments)
+        finally:
+            if entry is not None and self._in_flight.get(key) is entry:
+                del self._in_flight[key]
+
+        expires_at = (
+            time.time() + tool.cache_ttl if tool.cache_policy == "ttl" else None
+        )
+        self._put_memory(key, tool.name, value, expires_at)
+        if self.disk is not None:
+            self.disk.put(key, tool.name, value, expires_at)
+        return value
+
+    def invalidate(self, tool_name: Optional[str] = None):
+        """Forget every memoized result, or only those of one tool."""
+        if tool_name is None:
+            self._entries.clear()
+        else:
+            self._entries = OrderedDict(
+                (k, v) for k, v in self._entries.items() if v[0] != tool_name
+            )
+        if self.disk is not None:
+            self.disk.clear(tool_name)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-tool calls, hits by tier, misses, bypassed calls and hit rate."""
+        report = {}
+        for name, stats in self._stats.items():
+            hits = stats["memory_hits"] + stats["disk_hits"]
+            cacheable = stats["calls"] - stats["bypassed"]
+            report[name] = {**stats, "hit_rate": hits / cacheable if cacheable else 0.0}
+        return report
@@ -0,0 +1,4 @@
+from .embedding_queue import EmbeddingQueue
+from .long_term import Memory, MemoryStore
+
+__all__ = ["EmbeddingQueue", "Memory", "MemoryStore"]
@@ -0,0 +1,94 @@
+import asyncio
+from typing import Any, Awaitable, Callable, List, Optional
+import numpy as np
+from ..models.embeddings import BaseEmbedder
+
+BatchSink = Callable[[List[Any], np.ndarray], Awaitable[None]]
+
+
+class EmbeddingQueue:
+    """Coalesces embedding requests into batches.
+
+    `submit(text, payload)` queues a text and returns a future for its vector.
+    A background task sends up to `batch_size` queued texts per call to the
+    embedder, waiting at most `max_delay` seconds for a batch to fill. When a
+    `sink` is given, each batch's payloads and vectors are passed to it (e.g.
+    to upsert them into a vector store) before the futures resolve.
+    """
+
+    def __init__(
+        self,
+        embedder: BaseEmbedder,
+        batch_size: int = 64,
+        max_delay: float = 0.02,
+        sink: Optional[BatchSink] = None,
+    ):
+        self.embedder = embedder
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.sink = sink
+        self.batches = 0
+        self.embedded = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    def submit(self, text: str, payload: Any = None) -> asyncio.Future:
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((text, payload, future))
+        return future
+
+    async def embed(self, text: str) -> np.ndarray:
+        return await self.submit(text)
+
+    async def _next_batch(self) -> list:
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_delay
+        while len(batch) < self.batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._next_batch()
+            try:
+                vectors = await self.embedder.embed([text for text, _, _ in batch])
+                if self.sink is not None:
+                    await self.sink([payload for _, payload, _ in batch], vectors)
+            except Exception as e:
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            else:
+                self.batches += 1
+                self.embedded += len(batch)
+                for (_, _, future), vector in zip(batch, vectors):
+                    if not future.done():
+                        future.set_result(vector)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def flush(self):
+        """Wait until everything submitted so far has been embedded and sunk."""
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def close(self):
+        await self.flush()
+        if self._worker is not None:
+            self._worker.cancel()
+            await asyncio.gather(self._worker, return_exceptions=True)
+            self._worker = None
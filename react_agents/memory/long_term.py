@@ -0,0 +1,165 @@
+import asyncio
+import hashlib
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+import chromadb
+import numpy as np
+from .embedding_queue import EmbeddingQueue
+from ..models.embeddings import BaseEmbedder
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Memory:
+    """A remembered fact returned by `MemoryStore.recall`."""
+
+    id: str
+    text: str
+    kind: str
+    similarity: float
+    created_at: float
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+def _log_failed_write(future: asyncio.Future):
+    # Callers usually drop the future, so a failed write would go unnoticed
+    if not future.cancelled() and future.exception() is not None:
+        logger.error("Failed to write memory", exc_info=future.exception())
+
+
+def _scalar(value: Any):
+    # chromadb metadata values must be scalars
+    return value if isinstance(value, (str, int, float, bool)) else str(value)
+
+
+class MemoryStore:
+    """Long-term agent memory in a persistent chromadb collection.
+
+    `remember` returns at once: texts go through a batched EmbeddingQueue and
+    are upserted a batch at a time in the background. Ids are content hashes,
+    so remembering the same fact twice keeps one copy. `recall` embeds the
+    query directly and searches the collection's HNSW index, whose
+    `ef_search` trades recall quality for latency.
+    """
+
+    def __init__(
+        self,
+        embedder: BaseEmbedder,
+        path: Optional[str] = None,
+        collection: str = "agent_memory",
+        batch_size: int = 64,
+        max_delay: float = 0.02,
+        ef_search: Optional[int] = None,
+    ):
+        self.embedder = embedder
+        client = chromadb.PersistentClient(path) if path else chromadb.EphemeralClient()
+        hnsw: Dict[str, Any] = {"space": "cosine"}
+        if ef_search is not None:
+            hnsw["ef_search"] = ef_search
+        self._collection = client.get_or_create_collection(
+            collection, configuration={"hnsw": hnsw}, embedding_function=None
+        )
+        self.queue = EmbeddingQueue(embedder, batch_size, max_delay, sink=self._upsert)
+        self.recall_latencies: deque = deque(maxlen=1000)
+
+    def remember(self, text: str, kind: str = "fact", **metadata) -> asyncio.Future:
+        """Queue a memory for writing; await the result only to wait for the write."""
+        memory_id = hashlib.sha256(f"{kind}\0{text}".encode()).hexdigest()[:24]
+        future = self.queue.submit(
+            text,
+            {
+                "id": memory_id,
+                "text": text,
+                "metadata": {
+                    **{key: _scalar(value) for key, value in metadata.items()},
+                    "kind": kind,
+                    "created_at": time.time(),
+                },
+            },
+        )
+        future.add_done_callback(_log_failed_write)
+        return future
+
+    async def _upsert(self, payloads: List[dict], vectors: np.ndarray):
+        await asyncio.to_thread(
+            self._collection.upsert,
+            ids=[p["id"] for p in payloads],
+            embeddings=vectors,
+            documents=[p["text"] for p in payloads],
+            metadatas=[p["metadata"] for p in payloads],
+        )
+
+    async def recall(
+        self,
+        query: str,
+        k: int = 5,
+        kind: Optional[str] = None,
+        min_similarity: float = 0.0,
+    ) -> List[Memory]:
+        """The `k` memories most similar to `query`."""
+        start = time.perf_counter()
+        [vector] = await self.embedder.embed([query])
+        # The HNSW search is CPU-bound; keep it off the event loop
+        found = await asyncio.to_thread(
+            self._collection.query,
+            query_embeddings=[vector],
+            n_results=k,
+            where={"kind": kind} if kind else None,
+            include=["documents", "metadatas", "distances"],
+        )
+        self.recall_latencies.append(time.perf_counter() - start)
+
+        memories = []
+        for memory_id, text, metadata, distance in zip(
+            found["ids"][0],
+            found["documents"][0],
+            found["metadatas"][0],
+            found["distances"][0],
+        ):
+            if 1.0 - distance < min_similarity:
+                continue
+            metadata = dict(metadata)
+            memories.append(
+                Memory(
+                    id=memory_id,
+                    text=text,
+                    kind=metadata.pop("kind"),
+                    similarity=1.0 - distance,
+                    created_at=metadata.pop("created_at"),
+                    metadata=metadata,
+                )
+            )
+        return memories
+
+    def forget(self, ids: Optional[List[str]] = None, kind: Optional[str] = None):
+        """Delete memories by id or by kind."""
+        if ids:
+            self._collection.delete(ids=ids)
+        if kind:
+            self._collection.delete(where={"kind": kind})
+
+    def count(self) -> int:
+        return self._collection.count()
+
+    async def flush(self):
+        """Wait for every queued memory to be written."""
+        await self.queue.flush()
+
+    async def close(self):
+        await self.queue.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """Size, embedding batches and recall latency percentiles (ms)."""
+        latencies = np.array(self.recall_latencies) * 1000
+        p50, p95 = np.percentile(latencies, [50, 95]) if len(latencies) else (0.0, 0.0)
+        return {
+            "memories": self.count(),
+            "embedded": self.queue.embedded,
+            "embedding_batches": self.queue.batches,
+            "recall_p50_ms": float(p50),
+            "recall_p95_ms": float(p95),
+        }
@@ -0,0 +1,367 @@
+import asyncio
+import json
+import os
+import time
+import uuid
+from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional
+from openai import AsyncOpenAI
+from openai.types.chat import ChatCompletion
+from pydantic import PrivateAttr
+from .base_llm import BaseLlm
+from .llm_request import LlmRequest
+from .llm_response import LlmResponse
+from .openai import OpenAILlm
+from ..types.contents import Message, ToolCall, ToolResult
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+TERMINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+
+class BatchBackend(ABC):
+    """A batch endpoint: takes a list of request lines, later returns their results.
+
+    Lines and results use the OpenAI batch file format, so results are keyed
+    by each line's `custom_id`.
+    """
+
+    @abstractmethod
+    async def submit(self, lines: List[dict]) -> str:
+        """Submit request lines and return the batch id."""
+
+    @abstractmethod
+    async def status(self, batch_id: str) -> str:
+        """Current status; one of TERMINAL_STATUSES once the batch is over."""
+
+    @abstractmethod
+    async def results(self, batch_id: str) -> Dict[str, dict]:
+        """Result lines of a finished batch by custom_id."""
+
+
+class OpenAIBatchBackend(BatchBackend):
+    """The OpenAI Batch API: upload a JSONL file, create a batch, download results."""
+
+    def __init__(self, client: Optional[AsyncOpenAI] = None):
+        self._client = client
+
+    @property
+    def client(self) -> AsyncOpenAI:
+        if self._client is None:
+            self._client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        return self._client
+
+    async def submit(self, lines: List[dict]) -> str:
+        data = "\n".join(json.dumps(line) for line in lines).encode()
+        upload = await self.client.files.create(
+            file=("batch.jsonl", data), purpose="batch"
+        )
+        batch = await self.client.batches.create(
+            input_file_id=upload.id,
+            endpoint=BATCH_ENDPOINT,
+            completion_window="24h",
+        )
+        return batch.id
+
+    async def status(self, batch_id: str) -> str:
+        return (await self.client.batches.retrieve(batch_id)).status
+
+    async def results(self, batch_id: str) -> Dict[str, dict]:
+        batch = await self.client.batches.retrieve(batch_id)
+        results = {}
+        # Successful lines go to the output file, failed ones to the error file
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            content = await self.client.files.content(file_id)
+            for line in content.text.splitlines():
+                if line.strip():
+                    record = json.loads(line)
+                    results[record["custom_id"]] = record
+        return results
+
+
+def _response_format(output_type) -> dict:
+    """A pydantic model as a JSON `response_format` that a batch line can carry."""
+    # Imported here: litellm is slow to import and only needed for schemas
+    from litellm.utils import type_to_response_format_param
+
+    return type_to_response_format_param(output_type)
+
+
+def request_from_body(body: dict) -> LlmRequest:
+    """Rebuild an LlmRequest from a chat completions request body."""
+    instructions, contents, tool_names = [], [], {}
+    for message in body.get("messages", []):
+        role = message["role"]
+        if role == "system":
+            instructions.append(message["content"])
+        elif role == "tool":
+            contents.append(
+                ToolResult(
+                    tool_call_id=message["tool_call_id"],
+                    name=tool_names.get(message["tool_call_id"], ""),
+                    status="success",
+                    content=[message["content"]],
+                )
+            )
+        elif message.get("tool_calls"):
+            for call in message["tool_calls"]:
+                tool_names[call["id"]] = call["function"]["name"]
+                contents.append(
+                    ToolCall(
+                        tool_call_id=call["id"],
+                        name=call["function"]["name"],
+                        arguments=json.loads(call["function"]["arguments"]),
+                    )
+                )
+        else:
+            contents.append(Message(role=role, content=message.get("content") or ""))
+
+    tools = body.get("tools") or []
+    return LlmRequest(
+        instructions=instructions,
+        contents=contents,
+        tools_dict={tool["function"]["name"]: tool for tool in tools},
+        tool_choice=body.get("tool_choice"),
+        metadata={"model": body.get("model")},
+    )
+
+
+def completion_from_response(response: LlmResponse, model: str) -> dict:
+    """Render an LlmResponse as a chat completion response body."""
+    text = [c.content for c in response.content if isinstance(c, Message)]
+    tool_calls = [
+        {
+            "id": c.tool_call_id,
+            "type": "function",
+            "function": {"name": c.name, "arguments": json.dumps(c.arguments)},
+        }
+        for c in response.content
+        if isinstance(c, ToolCall)
+    ]
+    message = {"role": "assistant", "content": "\n".join(text) or None}
+    if tool_calls:
+        message["tool_calls"] = tool_calls
+    usage = response.usage_metadata or {}
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [
+            {
+                "index": 0,
+                "message": message,
+                "finish_reason": "tool_calls" if tool_calls else "stop",
+            }
+        ],
+        "usage": {
+            "prompt_tokens": usage.get("prompt_tokens", 0),
+            "completion_tokens": usage.get("completion_tokens", 0),
+            "total_tokens": usage.get("total_tokens", 0),
+        },
+    }
+
+
+class LocalBatchBackend(BatchBackend):
+    """In-process stand-in for a batch endpoint, for tests and offline runs.
+
+    Each line is answered by `responder` (e.g. MockLlm) and the batch
+    completes `turnaround` seconds after submission. Every submitted batch is
+    kept in `submitted` so tests can check how requests were grouped.
+    """
+
+    def __init__(self, responder: BaseLlm, turnaround: float = 0.0):
+        self.responder = responder
+        self.turnaround = turnaround
+        self.submitted: List[List[dict]] = []
+        self._jobs: Dict[str, dict] = {}
+
+    async def submit(self, lines: List[dict]) -> str:
+        batch_id = f"batch_{uuid.uuid4().hex[:12]}"
+        self.submitted.append(lines)
+        job = {"status": "in_progress", "results": {}}
+        job["task"] = asyncio.create_task(self._process(job, lines))
+        self._jobs[batch_id] = job
+        return batch_id
+
+    async def _process(self, job: dict, lines: List[dict]):
+        async def answer(line: dict) -> dict:
+            body = line["body"]
+            response = await self.responder.generate(request_from_body(body))
+            if response.error_message:
+                return {
+                    "id": f"batch_req_{uuid.uuid4().hex[:12]}",
+                    "custom_id": line["custom_id"],
+                    "response": None,
+                    "error": {"code": "error", "message": response.error_message},
+                }
+            return {
+                "id": f"batch_req_{uuid.uuid4().hex[:12]}",
+                "custom_id": line["custom_id"],
+                "response": {
+                    "status_code": 200,
+                    "body": completion_from_response(response, body["model"]),
+                },
+                "error": None,
+            }
+
+        started = time.monotonic()
+        records = await asyncio.gather(*(answer(line) for line in lines))
+        await asyncio.sleep(max(0.0, self.turnaround - (time.monotonic() - started)))
+        job["results"] = {record["custom_id"]: record for record in records}
+        job["status"] = "completed"
+
+    async def status(self, batch_id: str) -> str:
+        return self._jobs[batch_id]["status"]
+
+    async def results(self, batch_id: str) -> Dict[str, dict]:
+        return self._jobs.pop(batch_id)["results"]
+
+
+class BatchLlm(OpenAILlm):
+    """Sends chat completions through a batch endpoint instead of one call each.
+
+    Calls to `generate` wait in a queue and go out together as one batch job.
+    The queue is flushed when it reaches `max_batch_size`, when every
+    registered participant is waiting on a call, or `max_wait` seconds after
+    the first call queued, whichever comes first. The job is then polled
+    every `poll_interval` seconds and each caller gets its own result.
+
+    Multi-step agents advance in waves by running each one inside
+    `participant()`, or by calling `join(n)` up front and `leave()` as each
+    finishes: step N of every agent goes out as one batch, and step N + 1 is
+    only submitted once all agents still running have asked for it.
+
+    A request's `output_type` goes out as a JSON schema `response_format`,
+    overriding the instance-wide `response_format`.
+    """
+
+    max_batch_size: int = 50_000
+    max_wait: Optional[float] = 10.0
+    poll_interval: float = 30.0
+    response_format: Optional[Dict[str, Any]] = None
+
+    _backend: BatchBackend = PrivateAttr()
+    _pending: list = PrivateAttr(default_factory=list)
+    _participants: int = PrivateAttr(default=0)
+    _timer: Optional[asyncio.TimerHandle] = PrivateAttr(default=None)
+    _tasks: set = PrivateAttr(default_factory=set)
+    _batches: list = PrivateAttr(default_factory=list)
+
+    def __init__(
+        self,
+        model: str = "gpt-4o-mini",
+        backend: Optional[BatchBackend] = None,
+        **kwargs,
+    ):
+        super().__init__(model=model, **kwargs)
+        self._backend = backend or OpenAIBatchBackend()
+
+    @property
+    def batches(self) -> List[dict]:
+        """Id, size, status and wall time of every batch submitted so far."""
+        return list(self._batches)
+
+    def join(self, count: int = 1):
+        """Register runs that will take part in each wave until they `leave`."""
+        self._participants += count
+
+    def leave(self):
+        self._participants -= 1
+        self._maybe_flush()
+
+    @asynccontextmanager
+    async def participant(self):
+        """Count the enclosed run as one member of each wave."""
+        self.join()
+        try:
+            yield
+        finally:
+            self.leave()
+
+    async def generate(self, request: LlmRequest) -> LlmResponse:
+        body = {"model": self.model, "messages": self._build_messages(request)}
+        tools = self._build_tools(request)
+        if tools:
+            body["tools"] = tools
+            body["tool_choice"] = request.tool_choice
+        if request.output_type is not None:
+            body["response_format"] = _response_format(request.output_type)
+        elif self.response_format:
+            body["response_format"] = self.response_format
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append(
+            (
+                {
+                    "custom_id": uuid.uuid4().hex,
+                    "method": "POST",
+                    "url": BATCH_ENDPOINT,
+                    "body": body,
+                },
+                future,
+            )
+        )
+        self._maybe_flush()
+        return await future
+
+    def _maybe_flush(self):
+        if not self._pending:
+            return
+        wave_ready = self._participants and len(self._pending) >= self._participants
+        if wave_ready or len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None and self.max_wait is not None:
+            self._timer = asyncio.get_running_loop().call_later(
+                self.max_wait, self._flush
+            )
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._pending:
+            items = self._pending[: self.max_batch_size]
+            self._pending = self._pending[self.max_batch_size :]
+            task = asyncio.create_task(self._run_batch(items))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, items: list):
+        record = {"batch_id": None, "requests": len(items), "status": "submitting"}
+        self._batches.append(record)
+        start = time.perf_counter()
+        try:
+            batch_id = await self._backend.submit([line for line, _ in items])
+            record["batch_id"] = batch_id
+            while (
+                status := await self._backend.status(batch_id)
+            ) not in TERMINAL_STATUSES:
+                record["status"] = status
+                await asyncio.sleep(self.poll_interval)
+            record["status"] = status
+            results = await self._backend.results(batch_id)
+            for line, future in items:
+                if not future.done():
+                    future.set_result(
+                        self._parse_result(results.get(line["custom_id"]), status)
+                    )
+        except Exception as e:
+            record["status"] = "error"
+            for _, future in items:
+                if not future.done():
+                    future.set_result(LlmResponse(error_message=str(e)))
+        finally:
+            record["wall_s"] = time.perf_counter() - start
+
+    def _parse_result(self, result: Optional[dict], status: str) -> LlmResponse:
+        if result is None:
+            return LlmResponse(error_message=f"No result in batch (status: {status})")
+        if result.get("error"):
+            return LlmResponse(error_message=str(result["error"]))
+        response = result["response"]
+        if response["status_code"] != 200:
+            return LlmResponse(error_message=json.dumps(response.get("body")))
+        return self._parse_response(ChatCompletion.model_validate(response["body"]))
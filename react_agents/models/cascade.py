@@ -0,0 +1,176 @@
+import asyncio
+import json
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional
+from pydantic import PrivateAttr, ValidationError
+from .base_llm import BaseLlm
+from .llm_request import LlmRequest
+from .llm_response import LlmResponse
+from .replay import request_key
+from ..types.contents import Message, ToolCall, ToolResult
+
+
+def recent_tool_errors(request: LlmRequest) -> int:
+    """Consecutive failed tool results at the end of the conversation."""
+    errors = 0
+    for item in reversed(request.contents):
+        if isinstance(item, ToolResult):
+            if item.status != "error":
+                break
+            errors += 1
+        elif isinstance(item, Message) and item.role == "user":
+            break
+    return errors
+
+
+def _text(response: LlmResponse) -> Optional[str]:
+    return next((c.content for c in response.content if isinstance(c, Message)), None)
+
+
+class CascadeLlm(BaseLlm):
+    """Tries the cheapest model first and escalates on low-confidence signals.
+
+    `tiers` go from cheapest to strongest. A tier's answer is accepted unless
+    one of these signals fires, in which case the next tier is asked:
+
+    - "error": the call failed
+    - "schema_invalid": the reply does not parse as `request.output_type`
+    - "unsolvable": the parsed reply has `is_solvable` set to false
+    - "disagreement": with `samples` > 1, the samples gave different answers
+    - "tool_error_loop": the last `max_tool_errors` tool calls all failed, so
+      the cheap tier is skipped for this step
+
+    The strongest tier's answer is always accepted. Every decision is appended
+    to `log_path` as JSONL so thresholds can be tuned against evaluation results.
+    """
+
+    tiers: List[BaseLlm]
+    samples: int = 1
+    max_tool_errors: int = 2
+    log_path: Optional[str] = None
+
+    _answered_by: Counter = PrivateAttr(default_factory=Counter)
+    _signals: Counter = PrivateAttr(default_factory=Counter)
+
+    def __init__(self, tiers: List[BaseLlm], **kwargs):
+        super().__init__(
+            model=" > ".join(tier.model for tier in tiers), tiers=tiers, **kwargs
+        )
+
+    async def generate(self, request: LlmRequest) -> LlmResponse:
+        start = time.perf_counter()
+        attempts: List[Dict[str, Any]] = []
+        first = 0
+        if len(self.tiers) > 1 and recent_tool_errors(request) >= self.max_tool_errors:
+            attempts.append(
+                {
+                    "model": self.tiers[0].model,
+                    "signals": ["tool_error_loop"],
+                    "skipped": True,
+                }
+            )
+            first = 1
+
+        for index in range(first, len(self.tiers)):
+            tier = self.tiers[index]
+            last = index == len(self.tiers) - 1
+            tier_start = time.perf_counter()
+            responses = await asyncio.gather(
+                *(tier.generate(request) for _ in range(1 if last else self.samples))
+            )
+            signals = self.signals(request, responses)
+            attempts.append(
+                {
+                    "model": tier.model,
+                    "signals": signals,
+                    "latency_s": time.perf_counter() - tier_start,
+                    "prompt_tokens": sum(
+                        r.usage_metadata.get("prompt_tokens", 0) for r in responses
+                    ),
+                    "completion_tokens": sum(
+                        r.usage_metadata.get("completion_tokens", 0) for r in responses
+                    ),
+                }
+            )
+            if not signals:
+                break
+
+        response = responses[0]
+        self._record(request, attempts, time.perf_counter() - start)
+        return response
+
+    def signals(self, request: LlmRequest, responses: List[LlmResponse]) -> List[str]:
+        """Low-confidence signals raised by one tier's samples."""
+        if any(r.error_message for r in responses):
+            return ["error"]
+
+        signals = []
+        answers = []
+        for response in responses:
+            tool_calls = [c for c in response.content if isinstance(c, ToolCall)]
+            if tool_calls:
+                answers.append(
+                    json.dumps(
+                        [[c.name, c.arguments] for c in tool_calls], sort_keys=True
+                    )
+                )
+                continue
+
+            text = _text(response) or ""
+            if request.output_type is None:
+                answers.append(text.strip().lower())
+                continue
+            try:
+                parsed = request.output_type.model_validate_json(text)
+            except ValidationError:
+                signals.append("schema_invalid")
+                continue
+            if getattr(parsed, "is_solvable", True) is False:
+                signals.append("unsolvable")
+            answer = getattr(parsed, "final_answer", None)
+            answers.append(
+                str(answer).strip().lower()
+                if answer is not None
+                else parsed.model_dump_json()
+            )
+
+        if len(set(answers)) > 1:
+            signals.append("disagreement")
+        return sorted(set(signals))
+
+    def _record(self, request: LlmRequest, attempts: List[dict], latency: float):
+        answered_by = attempts[-1]["model"]
+        escalations = [s for a in attempts[:-1] for s in a["signals"]]
+        self._answered_by[answered_by] += 1
+        self._signals.update(escalations)
+        if not self.log_path:
+            return
+
+        question = next(
+            (
+                item.content
+                for item in request.contents
+                if isinstance(item, Message) and item.role == "user"
+            ),
+            "",
+        )
+        record = {
+            "timestamp": time.time(),
+            "request": request_key(self.model, request),
+            "question": question,
+            "step": sum(isinstance(item, ToolCall) for item in request.contents),
+            "answered_by": answered_by,
+            "escalations": escalations,
+            "attempts": attempts,
+            "latency_s": latency,
+        }
+        with open(self.log_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Requests answered by each tier and escalations by signal."""
+        return {
+            "answered_by": dict(self._answered_by),
+            "escalations": dict(self._signals),
+        }
@@ -0,0 +1,252 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Optional
+from pydantic import PrivateAttr
+from .base_llm import BaseLlm
+from .llm_request import LlmRequest
+from .llm_response import LlmResponse
+
+_OVERLOAD_MARKERS = (
+    "429",
+    "rate limit",
+    "ratelimit",
+    "timed out",
+    "timeout",
+    "overloaded",
+)
+
+
+def provider_for(model: str) -> str:
+    """Provider of a LiteLLM-style model string ("anthropic/claude-..." -> "anthropic")."""
+    return model.split("/", 1)[0] if "/" in model else "openai"
+
+
+def is_overload(error: BaseException | str) -> bool:
+    """Whether an error means the provider wants us to slow down (429s, timeouts)."""
+    if isinstance(error, BaseException):
+        status = getattr(error, "status_code", None)
+        if status in (429, 503, 529):
+            return True
+        if isinstance(error, (asyncio.TimeoutError, TimeoutError)):
+            return True
+        name = type(error).__name__.lower()
+        if "ratelimit" in name or "timeout" in name:
+            return True
+        error = str(error)
+    message = error.lower()
+    return any(marker in message for marker in _OVERLOAD_MARKERS)
+
+
+class Permit:
+    """A held slot. Call `fail` when the call failed without raising."""
+
+    def __init__(self):
+        self.error: BaseException | str | None = None
+
+    def fail(self, error: BaseException | str):
+        self.error = error
+
+
+class AimdLimiter:
+    """Concurrency limit tuned by additive increase / multiplicative decrease.
+
+    Every healthy completion (no error, latency under `latency_target`) adds
+    roughly `increase` permits per `limit` completions. A 429 or timeout
+    multiplies the limit by `backoff`, at most once per `cooldown` seconds so
+    a burst of failures from requests already in flight counts as one signal.
+    """
+
+    def __init__(
+        self,
+        initial: float = 4,
+        min_limit: float = 1,
+        max_limit: float = 256,
+        increase: float = 1.0,
+        backoff: float = 0.5,
+        latency_target: Optional[float] = None,
+        cooldown: float = 1.0,
+    ):
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.backoff = backoff
+        self.latency_target = latency_target
+        self.cooldown = cooldown
+
+        self.in_flight = 0
+        self.waiting = 0
+        self.successes = 0
+        self.errors = 0
+        self.overloads = 0
+        self.history: deque = deque(maxlen=1000)
+        self._last_cut = float("-inf")
+        self._condition: asyncio.Condition | None = None
+
+    @property
+    def permits(self) -> int:
+        return max(1, int(self.limit))
+
+    def _cond(self) -> asyncio.Condition:
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    async def acquire(self):
+        cond = self._cond()
+        async with cond:
+            self.waiting += 1
+            try:
+                await cond.wait_for(lambda: self.in_flight < self.permits)
+            finally:
+                self.waiting -= 1
+            self.in_flight += 1
+
+    async def release(self, latency: float, error: BaseException | str | None = None):
+        self._settle(latency, error)
+        await self._wake()
+
+    def _settle(self, latency: float, error: BaseException | str | None):
+        """Record the outcome and free the slot, without awaiting anything."""
+        if isinstance(error, asyncio.CancelledError):
+            # A call we abandoned (e.g. a lost race) says nothing about capacity
+            pass
+        elif error is None:
+            self.successes += 1
+            if self.latency_target is None or latency <= self.latency_target:
+                self.limit = min(
+                    self.max_limit, self.limit + self.increase / self.limit
+                )
+        elif is_overload(error):
+            self.overloads += 1
+            now = time.monotonic()
+            if now - self._last_cut >= self.cooldown:
+                self.limit = max(self.min_limit, self.limit * self.backoff)
+                self._last_cut = now
+        else:
+            # Other errors say nothing about capacity: hold the limit
+            self.errors += 1
+
+        self.history.append((time.time(), self.limit, self.in_flight - 1, self.waiting))
+        # Count the slot as free before taking the lock, so a cancellation
+        # while waiting for it cannot leak the permit
+        self.in_flight -= 1
+
+    async def _wake(self):
+        cond = self._cond()
+        async with cond:
+            cond.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "queue_depth": self.waiting,
+            "successes": self.successes,
+            "errors": self.errors,
+            "overloads": self.overloads,
+        }
+
+
+class ConcurrencyController:
+    """AIMD limiters per provider and per model.
+
+    A call holds a permit from its provider's limiter and from its model's
+    limiter. `initial_limits` sets starting limits by provider ("openai") or
+    model ("anthropic/claude-haiku-4-5"); keys not listed start at `default_initial`.
+    """
+
+    def __init__(
+        self,
+        initial_limits: Optional[Dict[str, float]] = None,
+        default_initial: float = 4,
+        **limiter_options,
+    ):
+        self.initial_limits = initial_limits or {}
+        self.default_initial = default_initial
+        self.limiter_options = limiter_options
+        self.limiters: Dict[str, AimdLimiter] = {}
+
+    def limiter(self, key: str) -> AimdLimiter:
+        if key not in self.limiters:
+            initial = self.initial_limits.get(key, self.default_initial)
+            self.limiters[key] = AimdLimiter(initial=initial, **self.limiter_options)
+        return self.limiters[key]
+
+    @asynccontextmanager
+    async def limit(self, model: str):
+        """Hold provider and model permits for one call to `model`."""
+        limiters = [self.limiter(provider_for(model)), self.limiter(model)]
+        acquired = []
+        permit = Permit()
+        start = time.perf_counter()
+        try:
+            # Acquired inside the try: a call cancelled while waiting for the
+            # model permit must still give back the provider permit it holds
+            for limiter in limiters:
+                await limiter.acquire()
+                acquired.append(limiter)
+            start = time.perf_counter()
+            yield permit
+        except BaseException as e:
+            permit.fail(e)
+            raise
+        finally:
+            latency = time.perf_counter() - start
+            # Free every slot before the first await, then wake waiters; a
+            # cancellation while waking one limiter must not skip the rest
+            for limiter in reversed(acquired):
+                limiter._settle(latency, permit.error)
+            cancelled = None
+            for limiter in reversed(acquired):
+                try:
+                    await limiter._wake()
+                except asyncio.CancelledError as e:
+                    cancelled = e
+            if cancelled is not None:
+                raise cancelled
+
+    def wrap(self, solve_fn):
+        """Wrap a `solve_fn(model, question)` so each call goes through `limit`."""
+
+        async def limited(model: str, question: str):
+            async with self.limit(model):
+                return await solve_fn(model, question)
+
+        return limited
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Current limit, in-flight count and queue depth for every key."""
+        return {key: limiter.stats() for key, limiter in self.limiters.items()}
+
+
+class LimitedLlm(BaseLlm):
+    """Runs another LLM's calls through a ConcurrencyController.
+
+    Give the inner model no retries of its own (e.g. `LiteLlm(num_retries=0)`)
+    so 429s reach the controller; overloaded calls are retried here, up to
+    `retries` times with exponential backoff, after giving back their permits.
+    """
+
+    inner: BaseLlm
+    retries: int = 2
+    retry_delay: float = 1.0
+    _controller: ConcurrencyController = PrivateAttr()
+
+    def __init__(self, inner: BaseLlm, controller: ConcurrencyController, **kwargs):
+        super().__init__(model=inner.model, inner=inner, **kwargs)
+        self._controller = controller
+
+    async def generate(self, request: LlmRequest) -> LlmResponse:
+        for attempt in range(self.retries + 1):
+            async with self._controller.limit(self.model) as permit:
+                response = await self.inner.generate(request)
+                if response.error_message:
+                    permit.fail(response.error_message)
+            if not (response.error_message and is_overload(response.error_message)):
+                return response
+            if attempt < self.retries:
+                await asyncio.sleep(self.retry_delay * 2**attempt)
+        return response
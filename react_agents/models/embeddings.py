@@ -0,0 +1,77 @@
+import re
+import zlib
+from abc import abstractmethod
+from typing import List
+import numpy as np
+from pydantic import BaseModel
+
+_WORD = re.compile(r"\w+")
+
+
+class BaseEmbedder(BaseModel):
+    """Abstract base class for text embedding models."""
+
+    model: str
+    dimensions: int
+
+    @abstractmethod
+    async def embed(self, texts: List[str]) -> np.ndarray:
+        """Unit-length float32 vectors, one row per text."""
+
+
+def _normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+class HashingEmbedder(BaseEmbedder):
+    """Offline stand-in embedder for tests and local runs.
+
+    Words and character trigrams are hashed into `dimensions` signed buckets,
+    so texts sharing most of their words or spelling land close together.
+    It knows nothing about meaning, but it is deterministic and needs no
+    network or model weights.
+    """
+
+    model: str = "hashing"
+    dimensions: int = 384
+
+    def _features(self, text: str) -> List[str]:
+        words = _WORD.findall(text.lower())
+        grams = [
+            padded[i : i + 3]
+            for word in words
+            for padded in [f"#{word}#"]
+            for i in range(len(padded) - 2)
+        ]
+        return words + grams
+
+    def embed_sync(self, texts: List[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                h = zlib.crc32(feature.encode())
+                vectors[row, h % self.dimensions] += 1.0 if h & 0x80000000 else -1.0
+        return _normalize_rows(vectors)
+
+    async def embed(self, texts: List[str]) -> np.ndarray:
+        return self.embed_sync(texts)
+
+
+class LiteLlmEmbedder(BaseEmbedder):
+    """Any LiteLLM embedding model, called in batches of `batch_size`."""
+
+    model: str = "text-embedding-3-small"
+    dimensions: int = 1536
+    batch_size: int = 256
+
+    async def embed(self, texts: List[str]) -> np.ndarray:
+        from litellm import aembedding
+
+        rows = []
+        for start in range(0, len(texts), self.batch_size):
+            response = await aembedding(
+                model=self.model, input=texts[start : start + self.batch_size]
+            )
+            rows.extend(item["embedding"] for item in response.data)
+        return _normalize_rows(np.asarray(rows, dtype=np.float32))
@@ -3,25 +3,41 @@ from typing import List, Dict, Any, Optional
 from ..types.events import Event
 from ..types.contents import Message
 from pydantic import BaseModel
+import time
 import uuid
 
+
 @dataclass
 class ExecutionContext:
     """Manages the execution state of an agent throughout its lifecycle."""
-    
+
     execution_id: str = field(default_factory=lambda: str(uuid.uuid4()))
-    
+    # Set on sub-agent runs to the execution that spawned them
+    parent_id: Optional[str] = None
+
     events: List[Event] = field(default_factory=list)
     user_input: Optional[Message] = None
     current_step: int = 0
-    
+
     state: Dict[str, Any] = field(default_factory=dict)
-    
+
+    # DagRun records from plan-and-execute mode, one per plan or replan
+    plans: List[Any] = field(default_factory=list)
+
+    # time.monotonic() by which LLM calls and tools must finish (None: no limit)
+    deadline: Optional[float] = None
+
     final_result: str | BaseModel = None
-    
+
     def add_event(self, event: Event):
         """Add an event to the history"""
         self.events.append(event)
-    
+
     def increment_step(self):
-        self.current_step += 1
\ No newline at end of file
+        self.current_step += 1
+
+    def time_left(self) -> Optional[float]:
+        """Seconds until the deadline (negative once it has passed), or None."""
+        if self.deadline is None:
+            return None
+        return self.deadline - time.monotonic()
@@ -0,0 +1,125 @@
+import asyncio
+from typing import Any, Dict, Optional
+import aiohttp
+from litellm import acompletion
+from pydantic import Field, PrivateAttr
+from .concurrency import provider_for
+from .llm_request import LlmRequest
+from .llm_response import LlmResponse
+from .openai import OpenAILlm
+
+
+class ClientPool:
+    """One keep-alive HTTP session per provider, shared by every LiteLlm using it.
+
+    Sessions belong to the event loop that created them, so a new one is made
+    when the pool is used from a different loop.
+    """
+
+    def __init__(self, limit_per_host: int = 100, keepalive_timeout: float = 30.0):
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self._sessions: Dict[str, tuple] = {}
+
+    def session(self, provider: str) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        owner, session = self._sessions.get(provider, (None, None))
+        if session is None or session.closed or owner is not loop:
+            session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit_per_host=self.limit_per_host,
+                    keepalive_timeout=self.keepalive_timeout,
+                )
+            )
+            self._sessions[provider] = (loop, session)
+        return session
+
+    async def close(self):
+        loop = asyncio.get_running_loop()
+        for owner, session in self._sessions.values():
+            if owner is loop and not session.closed:
+                await session.close()
+        self._sessions.clear()
+
+
+DEFAULT_POOL = ClientPool()
+
+
+def _field(obj, name: str):
+    if obj is None:
+        return None
+    if isinstance(obj, dict):
+        return obj.get(name)
+    return getattr(obj, name, None)
+
+
+def normalize_usage(usage) -> Dict[str, int]:
+    """Token counts under the same keys whatever the provider reported."""
+    prompt = _field(usage, "prompt_tokens") or 0
+    completion = _field(usage, "completion_tokens") or 0
+    # OpenAI reports cache hits in prompt_tokens_details, Anthropic at the top level
+    cached = _field(_field(usage, "prompt_tokens_details"), "cached_tokens")
+    if cached is None:
+        cached = _field(usage, "cache_read_input_tokens")
+    reasoning = _field(_field(usage, "completion_tokens_details"), "reasoning_tokens")
+    return {
+        "prompt_tokens": prompt,
+        "completion_tokens": completion,
+        "total_tokens": _field(usage, "total_tokens") or prompt + completion,
+        "cached_tokens": cached or 0,
+        "cache_write_tokens": _field(usage, "cache_creation_input_tokens") or 0,
+        "reasoning_tokens": reasoning or 0,
+    }
+
+
+class LiteLlm(OpenAILlm):
+    """Any LiteLLM model string ("gpt-5", "anthropic/claude-sonnet-4-5", ...).
+
+    Requests are built in the OpenAI chat format, which LiteLLM translates
+    for each provider. `request.output_type` is sent as the response format
+    so providers with native structured output enforce the schema.
+    `completion_kwargs` are passed through to every call (e.g. temperature).
+    """
+
+    num_retries: int = 2
+    timeout: Optional[float] = None
+    completion_kwargs: Dict[str, Any] = Field(default_factory=dict)
+
+    _pool: ClientPool = PrivateAttr()
+
+    def __init__(self, model: str, pool: Optional[ClientPool] = None, **kwargs):
+        super().__init__(model=model, **kwargs)
+        self._pool = pool or DEFAULT_POOL
+
+    @property
+    def provider(self) -> str:
+        return provider_for(self.model)
+
+    async def generate(self, request: LlmRequest) -> LlmResponse:
+        """Generate a response through LiteLLM."""
+        kwargs = dict(self.completion_kwargs)
+        tools = self._build_tools(request)
+        if tools:
+            kwargs["tools"] = tools
+            kwargs["tool_choice"] = request.tool_choice
+        if request.output_type is not None:
+            kwargs["response_format"] = request.output_type
+        if self.timeout is not None:
+            kwargs["timeout"] = self.timeout
+
+        try:
+            response = await acompletion(
+                model=self.model,
+                messages=self._build_messages(request),
+                num_retries=self.num_retries,
+                shared_session=self._pool.session(self.provider),
+                **kwargs,
+            )
+            return self._parse_response(response)
+        except Exception as e:
+            return LlmResponse(error_message=str(e))
+
+    def _parse_response(self, response) -> LlmResponse:
+        parsed = super()._parse_response(response)
+        parsed.usage_metadata = normalize_usage(response.usage)
+        return parsed
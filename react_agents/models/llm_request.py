@@ -1,11 +1,16 @@
 from ..types.contents import ContentItem
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Type
 
 
 class LlmRequest(BaseModel):
     """Request object for LLM calls."""
+
     instructions: List[str] = Field(default_factory=list)
     contents: List[ContentItem] = Field(default_factory=list)
     tools_dict: Dict[str, Any] = Field(default_factory=dict)
-    tool_choice: Optional[str] = None
\ No newline at end of file
+    tool_choice: Optional[str] = None
+    # Ask for a reply matching this schema; backends without support ignore it
+    output_type: Optional[Type[BaseModel]] = Field(default=None, exclude=True)
+    # Hints for wrapping LLMs (e.g. a racing budget); never sent to providers
+    metadata: Dict[str, Any] = Field(default_factory=dict, exclude=True)
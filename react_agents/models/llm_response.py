@@ -5,6 +5,8 @@ from ..types.contents import ContentItem
 
 class LlmResponse(BaseModel):
     """Response object from LLM calls"""
+
     content: List[ContentItem] = Field(default_factory=list)
     error_message: Optional[str] = None
-    usage_metadata: Dict[str, Any] = Field(default_factory=dict)
\ No newline at end of file
+    usage_metadata: Dict[str, Any] = Field(default_factory=dict)
+    finish_reason: Optional[str] = None
@@ -0,0 +1,118 @@
+import asyncio
+import json
+import re
+import uuid
+from .base_llm import BaseLlm
+from .llm_request import LlmRequest
+from .llm_response import LlmResponse
+from ..planning.plan import Plan
+from ..types.contents import Message, ToolCall, ToolResult
+
+_EXPRESSION = re.compile(r"what is (.+?)\??$", re.IGNORECASE)
+_SUM_OF = re.compile(r"what is the sum of (.+?)\??$", re.IGNORECASE)
+
+
+def _parts(question: str) -> list[str]:
+    """Sub-expressions of "What is the sum of A, B and C?", or the one expression."""
+    match = _SUM_OF.search(question.strip())
+    if match:
+        return re.split(r",\s*|\s+and\s+", match.group(1))
+    match = _EXPRESSION.search(question.strip())
+    return [match.group(1) if match else question]
+
+
+def _plan(parts: list[str]) -> Plan:
+    ids = [f"p{i}" for i in range(1, len(parts) + 1)]
+    steps = [
+        {"id": i, "tool": "calculator", "arguments": json.dumps({"expression": part})}
+        for i, part in zip(ids, parts)
+    ]
+    if len(parts) > 1:
+        total = " + ".join(f"${i}" for i in ids)
+        steps.append(
+            {
+                "id": "total",
+                "tool": "calculator",
+                "arguments": json.dumps({"expression": total}),
+                "depends_on": ids,
+            }
+        )
+    return Plan.model_validate({"steps": steps})
+
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+class MockLlm(BaseLlm):
+    """Offline stand-in LLM for tests and benchmarks.
+
+    Answers "What is <expression>?" and "What is the sum of A, B and C?"
+    questions. When a calculator tool is offered it calls the tool for every
+    part at once, as parallel tool calls in one response, then once more to
+    add the parts up before replying with the last result; otherwise it
+    answers directly. Asked for a `Plan`, it returns the same calls as a DAG.
+    Token usage is estimated from text length.
+    """
+
+    model: str = "mock"
+    latency: float = 0.0
+
+    async def generate(self, request: LlmRequest) -> LlmResponse:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        question = next(
+            (
+                item.content
+                for item in reversed(request.contents)
+                if isinstance(item, Message) and item.role == "user"
+            ),
+            "",
+        )
+        parts = _parts(question)
+        results = [item for item in request.contents if isinstance(item, ToolResult)]
+        # One call per part, then one to add them up (none to add for one part)
+        needed = len(parts) + 1 if len(parts) > 1 else 1
+
+        if request.output_type is Plan:
+            plan = _plan(parts).model_dump_json()
+            content = [Message(role="assistant", content=plan)]
+        elif results and len(results) >= needed:
+            content = [Message(role="assistant", content=str(results[-1].content[0]))]
+        elif "calculator" in request.tools_dict:
+            if len(results) < len(parts):
+                # The parts are independent, so they are all requested together
+                expressions = parts[len(results) :]
+            else:
+                expressions = [" + ".join(str(r.content[0]) for r in results)]
+            content = [
+                ToolCall(
+                    tool_call_id=f"call_{uuid.uuid4().hex[:12]}",
+                    name="calculator",
+                    arguments={"expression": expression},
+                )
+                for expression in expressions
+            ]
+        else:
+            try:
+                expression = " + ".join(f"({part})" for part in parts)
+                answer = str(eval(expression, {"__builtins__": {}}))
+            except Exception:
+                answer = "I don't know"
+            content = [Message(role="assistant", content=answer)]
+
+        prompt_text = "\n".join(request.instructions) + "".join(
+            str(item.model_dump()) for item in request.contents
+        )
+        completion_text = "".join(str(item.model_dump()) for item in content)
+        prompt_tokens = _estimate_tokens(prompt_text)
+        completion_tokens = _estimate_tokens(completion_text)
+        return LlmResponse(
+            content=content,
+            usage_metadata={
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        )
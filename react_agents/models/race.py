@@ -0,0 +1,116 @@
+import asyncio
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+from pydantic import PrivateAttr, ValidationError
+from .base_llm import BaseLlm
+from .llm_request import LlmRequest
+from .llm_response import LlmResponse
+from ..types.contents import Message, ToolCall
+
+
+def is_valid(request: LlmRequest, response: LlmResponse) -> bool:
+    """Whether a response can be used as is.
+
+    It must not be an error, its tool calls must name offered tools, and a
+    reply without tool calls must have text that parses as `output_type`.
+    """
+    if response.error_message:
+        return False
+    tool_calls = [c for c in response.content if isinstance(c, ToolCall)]
+    if tool_calls:
+        return all(call.name in request.tools_dict for call in tool_calls)
+    text = next((c.content for c in response.content if isinstance(c, Message)), None)
+    if not text:
+        return False
+    if request.output_type is not None:
+        try:
+            request.output_type.model_validate_json(text)
+        except ValidationError:
+            return False
+    return True
+
+
+class RaceLlm(BaseLlm):
+    """Sends each request to several models and returns the first valid reply.
+
+    Racers are started in order of preference, `stagger` seconds apart (0
+    starts them together), and the next one is also started early whenever a
+    racer returns an invalid reply. Once a valid reply arrives the others are
+    cancelled. At most `max_racers` are used per request; a request can lower
+    or raise that with `request.metadata["max_racers"]`.
+
+    If no racer produces a valid reply, the last reply received is returned.
+    """
+
+    racers: List[BaseLlm]
+    max_racers: int = 2
+    stagger: float = 0.0
+
+    _wins: Counter = PrivateAttr(default_factory=Counter)
+    _invalid: Counter = PrivateAttr(default_factory=Counter)
+    _cancelled: Counter = PrivateAttr(default_factory=Counter)
+
+    def __init__(self, racers: List[BaseLlm], **kwargs):
+        super().__init__(
+            model=" | ".join(racer.model for racer in racers), racers=racers, **kwargs
+        )
+
+    def budget(self, request: LlmRequest) -> int:
+        budget = request.metadata.get("max_racers", self.max_racers)
+        return max(1, min(int(budget), len(self.racers)))
+
+    async def generate(self, request: LlmRequest) -> LlmResponse:
+        waiting = list(self.racers[: self.budget(request)])
+        running: Dict[asyncio.Task, BaseLlm] = {}
+        last: Optional[LlmResponse] = None
+
+        def launch():
+            racer = waiting.pop(0)
+            running[asyncio.create_task(racer.generate(request))] = racer
+
+        launch()
+        next_start = time.monotonic() + self.stagger
+        try:
+            while running:
+                timeout = None
+                if waiting:
+                    timeout = max(0.0, next_start - time.monotonic())
+                done, _ = await asyncio.wait(
+                    running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    # Nobody answered within the stagger: start the next racer
+                    launch()
+                    next_start = time.monotonic() + self.stagger
+                    continue
+
+                for task in done:
+                    racer = running.pop(task)
+                    try:
+                        response = task.result()
+                    except Exception as e:
+                        response = LlmResponse(error_message=str(e))
+                    if is_valid(request, response):
+                        self._wins[racer.model] += 1
+                        return response
+                    self._invalid[racer.model] += 1
+                    last = response
+                    if waiting:
+                        launch()
+                        next_start = time.monotonic() + self.stagger
+        finally:
+            for task, racer in running.items():
+                task.cancel()
+                self._cancelled[racer.model] += 1
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+        return last
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Wins, invalid replies and cancellations per model."""
+        return {
+            "wins": dict(self._wins),
+            "invalid": dict(self._invalid),
+            "cancelled": dict(self._cancelled),
+        }
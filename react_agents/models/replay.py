@@ -0,0 +1,75 @@
+import asyncio
+import hashlib
+import json
+import time
+from typing import Dict
+from pydantic import PrivateAttr
+from .base_llm import BaseLlm
+from .llm_request import LlmRequest
+from .llm_response import LlmResponse
+
+
+def request_key(model: str, request: LlmRequest) -> str:
+    """Stable key for a request, used to match recordings on replay."""
+    # Tool call ids are generated fresh by some providers, so leave them out
+    payload = model + request.model_dump_json(
+        exclude={"contents": {"__all__": {"tool_call_id"}}}
+    )
+    if request.output_type is not None:
+        payload += json.dumps(request.output_type.model_json_schema(), sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class RecordingLlm(BaseLlm):
+    """Wraps another LLM and appends every request/response pair to a JSONL file."""
+
+    inner: BaseLlm
+    path: str
+
+    def __init__(self, inner: BaseLlm, path: str, **kwargs):
+        super().__init__(model=inner.model, inner=inner, path=path, **kwargs)
+
+    async def generate(self, request: LlmRequest) -> LlmResponse:
+        start = time.perf_counter()
+        response = await self.inner.generate(request)
+        record = {
+            "key": request_key(self.model, request),
+            "latency_s": time.perf_counter() - start,
+            "response": response.model_dump(mode="json"),
+        }
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+        return response
+
+
+class ReplayLlm(BaseLlm):
+    """Serves responses recorded by RecordingLlm without calling a provider.
+
+    With `simulate_latency` each response is delayed by the latency measured
+    when it was recorded (multiplied by `latency_scale`), which keeps
+    benchmark timings realistic while staying offline and deterministic.
+    """
+
+    path: str
+    simulate_latency: bool = True
+    latency_scale: float = 1.0
+
+    _records: Dict[str, list] = PrivateAttr(default_factory=dict)
+
+    def __init__(self, path: str, model: str, **kwargs):
+        super().__init__(model=model, path=path, **kwargs)
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                record = json.loads(line)
+                self._records.setdefault(record["key"], []).append(record)
+
+    async def generate(self, request: LlmRequest) -> LlmResponse:
+        records = self._records.get(request_key(self.model, request))
+        if not records:
+            return LlmResponse(error_message="No recorded response for this request")
+        # Rotate through repeated recordings of the same request
+        record = records.pop(0)
+        records.append(record)
+        if self.simulate_latency:
+            await asyncio.sleep(record["latency_s"] * self.latency_scale)
+        return LlmResponse.model_validate(record["response"])
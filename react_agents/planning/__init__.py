@@ -0,0 +1,12 @@
+from .plan import Plan, PlanStep, resolve_references, validate_plan
+from .scheduler import DagRun, NodeRun, execute_dag
+
+__all__ = [
+    "DagRun",
+    "NodeRun",
+    "Plan",
+    "PlanStep",
+    "execute_dag",
+    "resolve_references",
+    "validate_plan",
+]
@@ -0,0 +1,136 @@
+import json
+import re
+from typing import Any, Dict, Iterable, List
+from pydantic import BaseModel, Field
+
+# "$s1" is step s1's output; "$s1.key" indexes into a dict or list output
+REFERENCE = re.compile(r"\$([A-Za-z_]\w*)((?:\.\w+)*)")
+
+PLANNER_PROMPT = """\
+Plan how to answer the user's question with the tools below before acting.
+Return a plan: a list of tool-call steps. Each step has
+- id: a short unique name such as "s1"
+- tool: the tool to call
+- arguments: the tool arguments as a JSON object string
+- depends_on: ids of the steps whose outputs this step needs
+An argument may refer to an earlier step's output as "$<id>" (or "$<id>.<key>"
+for one field of it); list that step in depends_on. Steps that do not depend on
+each other run at the same time, so only add dependencies that are real.
+Return an empty list of steps if no tool is needed.
+
+Tools:
+{tools}"""
+
+REPLAN_PROMPT = """\
+Some steps of the previous plan failed. Outputs of the steps that succeeded
+can still be referenced by id:
+{completed}
+
+Failed steps:
+{failed}
+
+Return a new plan with only the steps still needed to answer the question."""
+
+
+class PlanStep(BaseModel):
+    """One tool call in a plan."""
+
+    id: str = Field(description="Unique step id, e.g. s1")
+    tool: str = Field(description="Name of the tool to call")
+    arguments: str = Field(
+        description='Tool arguments as a JSON object; "$<id>" refers to a step output'
+    )
+    depends_on: List[str] = Field(
+        default_factory=list, description="Ids of steps that must finish first"
+    )
+
+    def parsed_arguments(self) -> Dict[str, Any]:
+        arguments = json.loads(self.arguments or "{}")
+        if not isinstance(arguments, dict):
+            raise ValueError(f"Step '{self.id}' arguments must be a JSON object")
+        return arguments
+
+    def references(self) -> set:
+        return {match.group(1) for match in REFERENCE.finditer(self.arguments)}
+
+
+class Plan(BaseModel):
+    """A dependency graph of tool calls, as emitted by the planner."""
+
+    steps: List[PlanStep] = Field(default_factory=list)
+
+
+def validate_plan(plan: Plan, tool_names: Iterable[str], completed: Iterable[str] = ()):
+    """Raise ValueError if the plan is not a runnable DAG.
+
+    Dependencies may name steps of this plan or already `completed` steps of
+    an earlier plan; references to this plan's steps are added to
+    `depends_on` when the planner forgot to list them.
+    """
+    tool_names, completed = set(tool_names), set(completed)
+    ids = [step.id for step in plan.steps]
+    duplicates = {i for i in ids if ids.count(i) > 1} | (set(ids) & completed)
+    if duplicates:
+        raise ValueError(f"Duplicate step ids: {sorted(duplicates)}")
+
+    for step in plan.steps:
+        if step.tool not in tool_names:
+            raise ValueError(f"Step '{step.id}' uses unknown tool '{step.tool}'")
+        try:
+            step.parsed_arguments()
+        except json.JSONDecodeError as e:
+            raise ValueError(
+                f"Step '{step.id}' arguments are not valid JSON: {e}"
+            ) from e
+        for reference in step.references() & set(ids):
+            if reference not in step.depends_on:
+                step.depends_on.append(reference)
+        unknown = set(step.depends_on) - set(ids) - completed
+        if unknown:
+            raise ValueError(
+                f"Step '{step.id}' depends on unknown steps {sorted(unknown)}"
+            )
+
+    # Kahn's algorithm: every step must become ready eventually
+    pending = {step.id: set(step.depends_on) - completed for step in plan.steps}
+    while pending:
+        ready = [i for i, deps in pending.items() if not deps]
+        if not ready:
+            raise ValueError(f"Plan has a dependency cycle among {sorted(pending)}")
+        for i in ready:
+            del pending[i]
+        for deps in pending.values():
+            deps.difference_update(ready)
+
+
+def _lookup(outputs: Dict[str, Any], step_id: str, path: str) -> Any:
+    value = outputs[step_id]
+    for key in filter(None, path.split(".")):
+        value = value[int(key)] if isinstance(value, list) else value[key]
+    return value
+
+
+def resolve_references(value: Any, outputs: Dict[str, Any]) -> Any:
+    """Substitute "$id" references in arguments with step outputs.
+
+    A string that is exactly one reference becomes the output itself; a
+    reference inside a longer string is replaced with the output's text.
+    """
+    if isinstance(value, dict):
+        return {k: resolve_references(v, outputs) for k, v in value.items()}
+    if isinstance(value, list):
+        return [resolve_references(v, outputs) for v in value]
+    if not isinstance(value, str):
+        return value
+
+    whole = REFERENCE.fullmatch(value)
+    if whole and whole.group(1) in outputs:
+        return _lookup(outputs, whole.group(1), whole.group(2))
+
+    def substitute(match):
+        if match.group(1) not in outputs:
+            return match.group(0)
+        found = _lookup(outputs, match.group(1), match.group(2))
+        return found if isinstance(found, str) else json.dumps(found, default=str)
+
+    return REFERENCE.sub(substitute, value)
@@ -0,0 +1,133 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Literal, Optional
+from .plan import Plan, PlanStep, resolve_references
+
+NodeStatus = Literal["pending", "running", "success", "error", "skipped"]
+
+# call(step, resolved_arguments) -> output; raising marks the step failed
+StepCall = Callable[[PlanStep, Dict[str, Any]], Awaitable[Any]]
+
+
+@dataclass
+class NodeRun:
+    """What happened to one plan step."""
+
+    id: str
+    tool: str
+    depends_on: List[str]
+    arguments: Dict[str, Any] = field(default_factory=dict)
+    status: NodeStatus = "pending"
+    output: Any = None
+    error: Optional[str] = None
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+
+@dataclass
+class DagRun:
+    """One executed plan, kept in `ExecutionContext.plans`."""
+
+    plan: Plan
+    attempt: int = 0
+    nodes: Dict[str, NodeRun] = field(default_factory=dict)
+    started_at: float = 0.0
+    finished_at: float = 0.0
+    max_parallel: int = 0
+
+    @property
+    def failed(self) -> List[NodeRun]:
+        return [n for n in self.nodes.values() if n.status in ("error", "skipped")]
+
+    @property
+    def outputs(self) -> Dict[str, Any]:
+        return {i: n.output for i, n in self.nodes.items() if n.status == "success"}
+
+    @property
+    def seconds(self) -> float:
+        return self.finished_at - self.started_at
+
+
+async def execute_dag(
+    plan: Plan,
+    call: StepCall,
+    prior_outputs: Optional[Dict[str, Any]] = None,
+    max_concurrency: Optional[int] = None,
+    attempt: int = 0,
+) -> DagRun:
+    """Run a validated plan, starting each step as soon as its dependencies succeed.
+
+    Steps whose dependencies failed are marked skipped rather than run.
+    `prior_outputs` holds outputs of earlier plans that this plan may reference.
+    """
+    outputs = dict(prior_outputs or {})
+    steps = {step.id: step for step in plan.steps}
+    run = DagRun(
+        plan=plan,
+        attempt=attempt,
+        nodes={
+            s.id: NodeRun(id=s.id, tool=s.tool, depends_on=list(s.depends_on))
+            for s in plan.steps
+        },
+        started_at=time.perf_counter(),
+    )
+    semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+    running: Dict[asyncio.Task, str] = {}
+    active = 0
+
+    async def execute(node: NodeRun):
+        nonlocal active
+        if semaphore is not None:
+            await semaphore.acquire()
+        active += 1
+        run.max_parallel = max(run.max_parallel, active)
+        try:
+            node.started_at = time.perf_counter()
+            node.arguments = resolve_references(
+                steps[node.id].parsed_arguments(), outputs
+            )
+            node.output = await call(steps[node.id], node.arguments)
+            node.status = "success"
+            outputs[node.id] = node.output
+        except Exception as e:
+            node.status = "error"
+            node.error = str(e) or type(e).__name__
+        finally:
+            node.finished_at = time.perf_counter()
+            active -= 1
+            if semaphore is not None:
+                semaphore.release()
+
+    def settle():
+        """Skip steps behind a failure and start the ones that became ready."""
+        changed = True
+        while changed:
+            changed = False
+            for node in run.nodes.values():
+                if node.status != "pending":
+                    continue
+                deps = [run.nodes.get(d) for d in node.depends_on]
+                if any(
+                    d is not None and d.status in ("error", "skipped") for d in deps
+                ):
+                    node.status = "skipped"
+                    node.error = "a step it depends on failed"
+                    changed = True
+                elif all(d is None or d.status == "success" for d in deps):
+                    node.status = "running"
+                    running[asyncio.create_task(execute(node))] = node.id
+
+    try:
+        settle()
+        while running:
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                running.pop(task)
+            settle()
+    finally:
+        for task in running:
+            task.cancel()
+        await asyncio.gather(*running, return_exceptions=True)
+    run.finished_at = time.perf_counter()
+    return run
@@ -0,0 +1,17 @@
+from .ingest import Chunk, IngestReport, KnowledgeBase, chunk_text, iter_chunks
+from .search_tool import KnowledgeBaseSearch
+from .wikipedia_index import WikipediaIndex, build_index
+from .wikipedia_tool import WikipediaRead, WikipediaSearch
+
+__all__ = [
+    "Chunk",
+    "IngestReport",
+    "KnowledgeBase",
+    "KnowledgeBaseSearch",
+    "WikipediaIndex",
+    "WikipediaRead",
+    "WikipediaSearch",
+    "build_index",
+    "chunk_text",
+    "iter_chunks",
+]
@@ -0,0 +1,329 @@
+import asyncio
+import fnmatch
+import hashlib
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+import chromadb
+from ..models.embeddings import BaseEmbedder
+
+DEFAULT_PATTERNS = ("*.md", "*.txt", "*.rst", "*.html")
+DEFAULT_CHUNK_CHARS = 1500
+DEFAULT_OVERLAP_CHARS = 200
+
+
+@dataclass
+class Chunk:
+    """A piece of a document, identified by its source, position and content.
+
+    `source` is relative to `root`, the corpus directory it was ingested
+    from. `digest` hashes only the root, source and text, so a chunk that
+    moved within its document can be recognised and its embedding reused.
+    """
+
+    id: str
+    root: str
+    source: str
+    index: int
+    text: str
+    digest: str
+
+
+def iter_files(root: str, patterns: Iterable[str] = DEFAULT_PATTERNS) -> Iterator[str]:
+    """Paths under `root` matching any pattern, in a stable order."""
+    patterns = tuple(patterns)
+    for directory, subdirs, files in os.walk(root):
+        subdirs.sort()
+        for name in sorted(files):
+            if any(fnmatch.fnmatch(name, pattern) for pattern in patterns):
+                yield os.path.join(directory, name)
+
+
+def iter_paragraphs(lines: Iterable[str]) -> Iterator[str]:
+    """Blank-line separated paragraphs from a stream of lines."""
+    paragraph: List[str] = []
+    for line in lines:
+        if line.strip():
+            paragraph.append(line.rstrip("\n"))
+        elif paragraph:
+            yield "\n".join(paragraph)
+            paragraph = []
+    if paragraph:
+        yield "\n".join(paragraph)
+
+
+def chunk_text(
+    paragraphs: Iterable[str],
+    max_chars: int = DEFAULT_CHUNK_CHARS,
+    overlap_chars: int = DEFAULT_OVERLAP_CHARS,
+) -> Iterator[str]:
+    """Pack paragraphs into chunks of about `max_chars`.
+
+    Consecutive chunks share up to `overlap_chars` of trailing text so facts
+    split across a boundary can still be retrieved. Paragraphs longer than a
+    chunk are cut into windows.
+    """
+    if max_chars <= 0:
+        raise ValueError(f"max_chars must be positive, got {max_chars}")
+    if not 0 <= overlap_chars < max_chars:
+        # Windows would not advance through a long paragraph
+        raise ValueError(
+            f"overlap_chars must be in [0, max_chars), got {overlap_chars} "
+            f"with max_chars={max_chars}"
+        )
+    return _pack(paragraphs, max_chars, overlap_chars)
+
+
+def _pack(
+    paragraphs: Iterable[str], max_chars: int, overlap_chars: int
+) -> Iterator[str]:
+    buffer = ""
+    for paragraph in paragraphs:
+        while len(paragraph) > max_chars:
+            if buffer:
+                yield buffer
+                buffer = ""
+            yield paragraph[:max_chars]
+            paragraph = paragraph[max_chars - overlap_chars :]
+        if buffer and len(buffer) + len(paragraph) + 2 > max_chars:
+            yield buffer
+            tail = buffer[-overlap_chars:] if overlap_chars else ""
+            buffer = f"{tail}\n\n{paragraph}" if tail else paragraph
+        else:
+            buffer = f"{buffer}\n\n{paragraph}" if buffer else paragraph
+    if buffer:
+        yield buffer
+
+
+def iter_chunks(
+    path: str,
+    root: str,
+    max_chars: int = DEFAULT_CHUNK_CHARS,
+    overlap_chars: int = DEFAULT_OVERLAP_CHARS,
+) -> Iterator[Chunk]:
+    """Stream a file's chunks without reading it into memory at once."""
+    source = os.path.relpath(path, root)
+    root = os.path.realpath(root)
+    with open(path, encoding="utf-8", errors="replace") as f:
+        for index, text in enumerate(
+            chunk_text(iter_paragraphs(f), max_chars, overlap_chars)
+        ):
+            key = f"{root}\0{source}\0{text}"
+            digest = hashlib.sha256(key.encode()).hexdigest()[:32]
+            chunk_id = hashlib.sha256(f"{digest}\0{index}".encode()).hexdigest()[:32]
+            yield Chunk(
+                id=chunk_id,
+                root=root,
+                source=source,
+                index=index,
+                text=text,
+                digest=digest,
+            )
+
+
+def _metadata(chunk: Chunk) -> Dict[str, Any]:
+    return {
+        "root": chunk.root,
+        "source": chunk.source,
+        "index": chunk.index,
+        "digest": chunk.digest,
+    }
+
+
+@dataclass
+class IngestReport:
+    """What an ingestion run did and how fast."""
+
+    documents: int = 0
+    chunks: int = 0
+    embedded: int = 0
+    skipped: int = 0
+    moved: int = 0
+    deleted: int = 0
+    seconds: float = 0.0
+
+    @property
+    def chunks_per_s(self) -> float:
+        return self.chunks / self.seconds if self.seconds else 0.0
+
+    @property
+    def embedded_per_s(self) -> float:
+        return self.embedded / self.seconds if self.seconds else 0.0
+
+
+class KnowledgeBase:
+    """Chunks of a document corpus in a chromadb collection.
+
+    Chunk ids hash the source path, position and chunk text. Re-ingesting a
+    corpus only embeds chunks whose text changed: unchanged chunks cost a hash
+    and an id lookup, chunks that only moved are re-keyed with their stored
+    embedding, and chunks of edited or deleted files that are gone are
+    deleted. Chunks record the root they were ingested from, so several
+    corpora can share a collection without one run deleting another's.
+    """
+
+    def __init__(
+        self,
+        embedder: BaseEmbedder,
+        path: Optional[str] = None,
+        collection: str = "knowledge_base",
+    ):
+        self.embedder = embedder
+        client = chromadb.PersistentClient(path) if path else chromadb.EphemeralClient()
+        self._collection = client.get_or_create_collection(
+            collection,
+            configuration={"hnsw": {"space": "cosine"}},
+            embedding_function=None,
+        )
+
+    def count(self) -> int:
+        return self._collection.count()
+
+    def _existing(self, root: str, source: str) -> Dict[str, Optional[str]]:
+        """Ids of a source's stored chunks, mapped to their content digest."""
+        found = self._collection.get(
+            where={"$and": [{"root": root}, {"source": source}]},
+            include=["metadatas"],
+        )
+        return {
+            chunk_id: (metadata or {}).get("digest")
+            for chunk_id, metadata in zip(found["ids"], found["metadatas"])
+        }
+
+    def _ids_gone(self, root: str, patterns: tuple, sources: set) -> List[str]:
+        """Ids of chunks under `root` matching `patterns` whose file was not seen.
+
+        Chunks of other roots, or of files this run's patterns do not cover,
+        are left alone.
+        """
+        found = self._collection.get(
+            where={"$and": [{"root": root}, {"source": {"$nin": sorted(sources)}}]},
+            include=["metadatas"],
+        )
+        return [
+            chunk_id
+            for chunk_id, metadata in zip(found["ids"], found["metadatas"])
+            if any(
+                fnmatch.fnmatch(os.path.basename(metadata["source"]), pattern)
+                for pattern in patterns
+            )
+        ]
+
+    def _move(self, moves: List[tuple]):
+        """Store chunks under their new ids, reusing the old ids' embeddings."""
+        found = self._collection.get(
+            ids=[old_id for _, old_id in moves], include=["embeddings"]
+        )
+        vectors = dict(zip(found["ids"], found["embeddings"]))
+        self._collection.upsert(
+            ids=[chunk.id for chunk, _ in moves],
+            embeddings=[vectors[old_id] for _, old_id in moves],
+            documents=[chunk.text for chunk, _ in moves],
+            metadatas=[_metadata(chunk) for chunk, _ in moves],
+        )
+
+    async def ingest(
+        self,
+        root: str,
+        patterns: Iterable[str] = DEFAULT_PATTERNS,
+        workers: int = 4,
+        batch_size: int = 64,
+        max_chars: int = DEFAULT_CHUNK_CHARS,
+        overlap_chars: int = DEFAULT_OVERLAP_CHARS,
+    ) -> IngestReport:
+        """Index every matching file under `root`, embedding only new chunks.
+
+        Files are read and chunked lazily by one producer; `workers` tasks
+        take batches of up to `batch_size` new chunks from a bounded queue,
+        embed them and upsert them, so memory stays flat as the corpus grows.
+        """
+        report = IngestReport()
+        root, patterns = os.path.realpath(root), tuple(patterns)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=workers * batch_size * 2)
+        start = time.perf_counter()
+
+        async def produce():
+            sources = set()
+            for path in iter_files(root, patterns):
+                report.documents += 1
+                source = os.path.relpath(path, root)
+                sources.add(source)
+                existing = await asyncio.to_thread(self._existing, root, source)
+                by_digest = {d: i for i, d in existing.items() if d is not None}
+                seen, moves = set(), []
+                for chunk in iter_chunks(path, root, max_chars, overlap_chars):
+                    report.chunks += 1
+                    if chunk.id in seen or chunk.id in existing:
+                        report.skipped += 1
+                    elif chunk.digest in by_digest:
+                        moves.append((chunk, by_digest[chunk.digest]))
+                    else:
+                        await queue.put(chunk)
+                    seen.add(chunk.id)
+                if moves:
+                    await asyncio.to_thread(self._move, moves)
+                    report.moved += len(moves)
+                stale = list(existing.keys() - seen)
+                if stale:
+                    await asyncio.to_thread(self._collection.delete, ids=stale)
+                    report.deleted += len(stale)
+            # Chunks of files that were deleted since the last run. A walk
+            # that found nothing (a wrong root or pattern) deletes nothing
+            if sources:
+                gone = await asyncio.to_thread(self._ids_gone, root, patterns, sources)
+                if gone:
+                    await asyncio.to_thread(self._collection.delete, ids=gone)
+                    report.deleted += len(gone)
+            for _ in range(workers):
+                await queue.put(None)
+
+        async def consume():
+            done = False
+            while not done:
+                batch = []
+                item = await queue.get()
+                while item is not None:
+                    batch.append(item)
+                    if len(batch) >= batch_size or queue.empty():
+                        break
+                    item = queue.get_nowait()
+                done = item is None
+                if batch:
+                    await self._upsert(batch)
+                    report.embedded += len(batch)
+
+        await asyncio.gather(produce(), *(consume() for _ in range(workers)))
+        report.seconds = time.perf_counter() - start
+        return report
+
+    async def _upsert(self, chunks: List[Chunk]):
+        vectors = await self.embedder.embed([chunk.text for chunk in chunks])
+        await asyncio.to_thread(
+            self._collection.upsert,
+            ids=[chunk.id for chunk in chunks],
+            embeddings=vectors,
+            documents=[chunk.text for chunk in chunks],
+            metadatas=[_metadata(chunk) for chunk in chunks],
+        )
+
+    async def search(self, query: str, k: int = 5) -> List[Dict[str, Any]]:
+        """The `k` chunks most similar to `query`, best first."""
+        [vector] = await self.embedder.embed([query])
+        found = await asyncio.to_thread(
+            self._collection.query,
+            query_embeddings=[vector],
+            n_results=k,
+            include=["documents", "metadatas", "distances"],
+        )
+        return [
+            {
+                "source": metadata["source"],
+                "chunk": metadata["index"],
+                "score": round(1.0 - distance, 4),
+                "text": text,
+            }
+            for text, metadata, distance in zip(
+                found["documents"][0], found["metadatas"][0], found["distances"][0]
+            )
+        ]
@@ -0,0 +1,36 @@
+from typing import Any, Dict, List
+from pydantic import BaseModel, Field
+from .ingest import KnowledgeBase
+from ..models.execution_context import ExecutionContext
+from ..tools.base_tool import BaseTool
+
+
+class KnowledgeBaseSearchInput(BaseModel):
+    query: str = Field(description="What to look for in the knowledge base")
+    k: int = Field(default=5, description="Number of passages to return")
+
+
+class KnowledgeBaseSearch(BaseTool):
+    """Search an ingested document corpus for relevant passages."""
+
+    def __init__(
+        self, knowledge_base: KnowledgeBase, max_k: int = 10, cache_ttl: float = 300.0
+    ):
+        self.knowledge_base = knowledge_base
+        self.max_k = max_k
+        super().__init__(
+            name="search_knowledge_base",
+            description=(
+                "Search the knowledge base. Returns the most relevant passages "
+                "with their source file and a similarity score."
+            ),
+            pydantic_input_model=KnowledgeBaseSearchInput,
+            # Results only change when the corpus is re-ingested
+            cache_policy="ttl",
+            cache_ttl=cache_ttl,
+        )
+
+    async def execute(
+        self, context: ExecutionContext, query: str, k: int = 5
+    ) -> List[Dict[str, Any]]:
+        return await self.knowledge_base.search(query, k=max(1, min(k, self.max_k)))
@@ -0,0 +1,460 @@
+"""Offline Wikipedia search over a local dump.
+
+`build_index` streams a MediaWiki XML dump (optionally .bz2) or a JSONL file
+of {"title", "text"} records, strips the wikitext, and writes a directory of
+flat binary files:
+
+    text.bin / text_offsets.bin        cleaned article text and its offsets
+    titles.bin / title_offsets.bin     article titles
+    doc_lengths.bin                    tokens per article, for BM25
+    terms.bin / term_offsets.bin       sorted vocabulary
+    post_offsets.bin                   each term's slice of the postings
+    post_docs.bin / post_tfs.bin       postings: article ids and term counts
+    keys.bin / key_offsets.bin         sorted lowercased titles and redirects
+    key_docs.bin                       the article each title key points to
+
+Postings are accumulated in memory up to `block_postings` and spilled to
+sorted runs that are merged at the end, so building needs bounded memory.
+`WikipediaIndex` opens the files with `mmap`: nothing is loaded up front,
+and a query only touches the pages of the terms and articles it needs.
+
+    python -m react_agents.rag.wikipedia_index simplewiki.xml.bz2 wiki-index/
+"""
+
+import argparse
+import bz2
+import hashlib
+import heapq
+import json
+import math
+import mmap
+import os
+import re
+import shutil
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+from collections import Counter, defaultdict
+from typing import Dict, Iterator, List, Optional, Tuple
+import numpy as np
+
+FIXTURE_DUMP = os.path.join(
+    os.path.dirname(__file__), "fixtures", "wikipedia-fixture.xml"
+)
+
+_TOKEN = re.compile(r"\w+")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the "
+    "their this to was were which with".split()
+)
+TITLE_WEIGHT = 3
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in _TOKEN.findall(text.lower()) if t not in STOPWORDS]
+
+
+# ---------------------------------------------------------------------------
+# Wikitext cleanup
+# ---------------------------------------------------------------------------
+
+_COMMENT = re.compile(r"<!--.*?-->", re.S)
+_REF = re.compile(r"<ref[^>/]*/>|<ref[^>]*>.*?</ref>", re.S | re.I)
+_TEMPLATE = re.compile(r"\{\{[^{}]*\}\}")
+_TABLE = re.compile(r"\{\|.*?\|\}", re.S)
+_MEDIA_LINK = re.compile(r"\[\[(?:File|Image|Category|Media):[^\[\]]*\]\]", re.I)
+_LINK = re.compile(r"\[\[(?:[^\[\]|]*\|)?([^\[\]]*)\]\]")
+_EXTERNAL_LINK = re.compile(r"\[https?://[^\s\]]+\s*([^\]]*)\]")
+_TAG = re.compile(r"<[^>]+>")
+_EMPHASIS = re.compile(r"'{2,}")
+_BLANK_LINES = re.compile(r"\n{3,}")
+
+
+def _remove_nested(pattern: re.Pattern, text: str) -> str:
+    # Innermost first, until nothing nested is left
+    while True:
+        text, count = pattern.subn("", text)
+        if not count:
+            return text
+
+
+def clean_wikitext(text: str) -> str:
+    """Plain text with "== Section ==" headings kept."""
+    text = _COMMENT.sub("", text)
+    text = _REF.sub("", text)
+    text = _remove_nested(_TEMPLATE, text)
+    text = _TABLE.sub("", text)
+    text = _remove_nested(_MEDIA_LINK, text)
+    text = _LINK.sub(r"\1", text)
+    text = _EXTERNAL_LINK.sub(r"\1", text)
+    text = _TAG.sub("", text)
+    text = _EMPHASIS.sub("", text)
+    return _BLANK_LINES.sub("\n\n", text).strip()
+
+
+# ---------------------------------------------------------------------------
+# Dump readers
+# ---------------------------------------------------------------------------
+
+
+def _open(path: str):
+    return bz2.open(path, "rb") if path.endswith(".bz2") else open(path, "rb")
+
+
+def iter_xml_dump(path: str) -> Iterator[Tuple[str, Optional[str], str]]:
+    """(title, redirect target or None, wikitext) for main-namespace pages."""
+    with _open(path) as f:
+        root = None
+        for event, element in ET.iterparse(f, events=("start", "end")):
+            if root is None:
+                root = element
+            if event != "end" or element.tag.rsplit("}", 1)[-1] != "page":
+                continue
+            fields = {child.tag.rsplit("}", 1)[-1]: child for child in element}
+            namespace = fields.get("ns")
+            if namespace is None or namespace.text == "0":
+                redirect = fields.get("redirect")
+                text = ""
+                revision = fields.get("revision")
+                if revision is not None:
+                    for child in revision:
+                        if child.tag.rsplit("}", 1)[-1] == "text":
+                            text = child.text or ""
+                yield (
+                    fields["title"].text,
+                    redirect.get("title") if redirect is not None else None,
+                    text,
+                )
+            # Clearing the page alone leaves an empty element per page
+            # attached to the root; drop them so memory stays flat
+            root.clear()
+
+
+def iter_jsonl_dump(path: str) -> Iterator[Tuple[str, Optional[str], str]]:
+    with _open(path) as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                yield record["title"], record.get("redirect"), record.get("text", "")
+
+
+def iter_dump(path: str) -> Iterator[Tuple[str, Optional[str], str]]:
+    if path.endswith((".jsonl", ".jsonl.bz2")):
+        return iter_jsonl_dump(path)
+    return iter_xml_dump(path)
+
+
+# ---------------------------------------------------------------------------
+# Building
+# ---------------------------------------------------------------------------
+
+
+class _StringTableWriter:
+    """Appends strings to `<name>.bin` and their offsets to `<name>_offsets.bin`."""
+
+    def __init__(self, directory: str, name: str, offsets_name: Optional[str] = None):
+        self._data = open(os.path.join(directory, f"{name}.bin"), "wb")
+        self._offsets = [0]
+        self._offsets_path = os.path.join(
+            directory, f"{offsets_name or name.rstrip('s')}_offsets.bin"
+        )
+
+    def append(self, text: str):
+        data = text.encode("utf-8")
+        self._data.write(data)
+        self._offsets.append(self._offsets[-1] + len(data))
+
+    def close(self):
+        self._data.close()
+        np.asarray(self._offsets, dtype=np.int64).tofile(self._offsets_path)
+
+
+def _write_run(directory: str, index: int, postings: Dict[str, list]) -> str:
+    run = os.path.join(directory, f"run-{index:04d}")
+    os.makedirs(run)
+    terms = _StringTableWriter(run, "terms", "term")
+    post_offsets = [0]
+    docs, tfs = [], []
+    for term in sorted(postings):
+        terms.append(term)
+        entries = postings[term]
+        docs.extend(doc for doc, _ in entries)
+        tfs.extend(tf for _, tf in entries)
+        post_offsets.append(len(docs))
+    terms.close()
+    np.asarray(post_offsets, dtype=np.int64).tofile(
+        os.path.join(run, "post_offsets.bin")
+    )
+    np.asarray(docs, dtype=np.int32).tofile(os.path.join(run, "post_docs.bin"))
+    np.minimum(np.asarray(tfs), np.iinfo(np.uint16).max).astype(np.uint16).tofile(
+        os.path.join(run, "post_tfs.bin")
+    )
+    return run
+
+
+class _Strings:
+    """Read-only view of a string table written by _StringTableWriter."""
+
+    def __init__(self, data_path: str, offsets_path: str):
+        self._file = open(data_path, "rb")
+        size = os.path.getsize(data_path)
+        self._data = (
+            mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        )
+        self.offsets = np.memmap(offsets_path, dtype=np.int64, mode="r")
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> str:
+        return self._data[self.offsets[i] : self.offsets[i + 1]].decode("utf-8")
+
+    def find(self, key: str) -> int:
+        """Index of `key` in a sorted table, or -1."""
+        lo, hi = 0, len(self)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self[mid] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo if lo < len(self) and self[lo] == key else -1
+
+
+def _run_postings(run: str) -> Iterator[Tuple[str, np.ndarray, np.ndarray]]:
+    terms = _Strings(
+        os.path.join(run, "terms.bin"), os.path.join(run, "term_offsets.bin")
+    )
+    offsets = np.fromfile(os.path.join(run, "post_offsets.bin"), dtype=np.int64)
+    docs = np.memmap(os.path.join(run, "post_docs.bin"), dtype=np.int32, mode="r")
+    tfs = np.memmap(os.path.join(run, "post_tfs.bin"), dtype=np.uint16, mode="r")
+    for i in range(len(terms)):
+        yield (
+            terms[i],
+            docs[offsets[i] : offsets[i + 1]],
+            tfs[offsets[i] : offsets[i + 1]],
+        )
+
+
+def _merge_runs(runs: List[str], directory: str):
+    """Merge term-sorted runs; runs hold increasing doc ids, so postings concatenate."""
+    terms = _StringTableWriter(directory, "terms", "term")
+    post_offsets = [0]
+    with (
+        open(os.path.join(directory, "post_docs.bin"), "wb") as docs_file,
+        open(os.path.join(directory, "post_tfs.bin"), "wb") as tfs_file,
+    ):
+        merged = heapq.merge(
+            *(
+                ((term, order, docs, tfs) for term, docs, tfs in _run_postings(run))
+                for order, run in enumerate(runs)
+            ),
+            key=lambda entry: (entry[0], entry[1]),
+        )
+        current, count = None, 0
+        for term, _, docs, tfs in merged:
+            if term != current:
+                if current is not None:
+                    terms.append(current)
+                    post_offsets.append(post_offsets[-1] + count)
+                current, count = term, 0
+            np.asarray(docs, dtype=np.int32).tofile(docs_file)
+            np.asarray(tfs, dtype=np.uint16).tofile(tfs_file)
+            count += len(docs)
+        if current is not None:
+            terms.append(current)
+            post_offsets.append(post_offsets[-1] + count)
+    terms.close()
+    np.asarray(post_offsets, dtype=np.int64).tofile(
+        os.path.join(directory, "post_offsets.bin")
+    )
+
+
+def build_index(
+    dump_path: str, directory: str, block_postings: int = 5_000_000
+) -> dict:
+    """Build an index directory from a dump. Returns the index metadata."""
+    os.makedirs(directory, exist_ok=True)
+    scratch = tempfile.mkdtemp(dir=directory, prefix="build-")
+    texts = _StringTableWriter(directory, "text", "text")
+    titles = _StringTableWriter(directory, "titles", "title")
+    lengths: List[int] = []
+    redirects: List[Tuple[str, str]] = []
+    postings: Dict[str, list] = defaultdict(list)
+    pending, runs = 0, []
+
+    try:
+        for title, redirect, wikitext in iter_dump(dump_path):
+            if redirect:
+                redirects.append((title, redirect))
+                continue
+            doc = len(lengths)
+            text = clean_wikitext(wikitext)
+            texts.append(text)
+            titles.append(title)
+
+            counts = Counter(tokenize(text))
+            for token in tokenize(title):
+                counts[token] += TITLE_WEIGHT
+            lengths.append(sum(counts.values()))
+            for term, tf in counts.items():
+                postings[term].append((doc, tf))
+            pending += len(counts)
+            if pending >= block_postings:
+                runs.append(_write_run(scratch, len(runs), postings))
+                postings, pending = defaultdict(list), 0
+
+        if postings:
+            runs.append(_write_run(scratch, len(runs), postings))
+        texts.close()
+        titles.close()
+        np.asarray(lengths, dtype=np.int32).tofile(
+            os.path.join(directory, "doc_lengths.bin")
+        )
+        _merge_runs(runs, directory)
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    # Title lookup table: article titles plus redirects that resolve to one
+    title_strings = _Strings(
+        os.path.join(directory, "titles.bin"),
+        os.path.join(directory, "title_offsets.bin"),
+    )
+    by_title = {title_strings[i].lower(): i for i in range(len(title_strings))}
+    for source, target in redirects:
+        if target.lower() in by_title:
+            by_title.setdefault(source.lower(), by_title[target.lower()])
+    keys = _StringTableWriter(directory, "keys", "key")
+    key_docs = []
+    for key in sorted(by_title):
+        keys.append(key)
+        key_docs.append(by_title[key])
+    keys.close()
+    np.asarray(key_docs, dtype=np.int32).tofile(os.path.join(directory, "key_docs.bin"))
+
+    meta = {
+        "source": os.path.basename(dump_path),
+        "documents": len(lengths),
+        "redirects": len(redirects),
+        "avg_length": float(np.mean(lengths)) if lengths else 0.0,
+        "built_at": time.time(),
+    }
+    with open(os.path.join(directory, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    return meta
+
+
+# ---------------------------------------------------------------------------
+# Querying
+# ---------------------------------------------------------------------------
+
+
+def split_sections(text: str) -> List[Tuple[str, str]]:
+    """(heading, body) pairs; the lead section has the heading "Introduction"."""
+    sections, heading, body = [], "Introduction", []
+    for line in text.splitlines():
+        match = re.fullmatch(r"\s*(={2,6})\s*(.*?)\s*\1\s*", line)
+        if match:
+            sections.append((heading, "\n".join(body).strip()))
+            heading, body = match.group(2), []
+        else:
+            body.append(line)
+    sections.append((heading, "\n".join(body).strip()))
+    return [(h, b) for h, b in sections if b or h != "Introduction"]
+
+
+class WikipediaIndex:
+    """BM25 search and article reads over an index built by `build_index`."""
+
+    def __init__(self, directory: str, k1: float = 1.2, b: float = 0.75):
+        def path(name):
+            return os.path.join(directory, name)
+
+        with open(path("meta.json"), "rb") as f:
+            raw = f.read()
+        self.meta = json.loads(raw)
+        # Changes whenever the index is rebuilt, even from the same dump
+        self.fingerprint = hashlib.sha256(
+            raw + str(os.stat(path("meta.json")).st_mtime_ns).encode()
+        ).hexdigest()[:16]
+        self.k1, self.b = k1, b
+        self._texts = _Strings(path("text.bin"), path("text_offsets.bin"))
+        self._titles = _Strings(path("titles.bin"), path("title_offsets.bin"))
+        self._terms = _Strings(path("terms.bin"), path("term_offsets.bin"))
+        self._keys = _Strings(path("keys.bin"), path("key_offsets.bin"))
+        self._key_docs = np.memmap(path("key_docs.bin"), dtype=np.int32, mode="r")
+        self._lengths = np.memmap(path("doc_lengths.bin"), dtype=np.int32, mode="r")
+        self._post_offsets = np.memmap(
+            path("post_offsets.bin"), dtype=np.int64, mode="r"
+        )
+        self._post_docs = np.memmap(path("post_docs.bin"), dtype=np.int32, mode="r")
+        self._post_tfs = np.memmap(path("post_tfs.bin"), dtype=np.uint16, mode="r")
+
+    def __len__(self) -> int:
+        return self.meta["documents"]
+
+    def search(self, query: str, k: int = 5) -> List[dict]:
+        """Top `k` articles for `query` by BM25, with a short snippet each."""
+        n = len(self)
+        if not n:
+            return []
+        doc_parts, score_parts = [], []
+        for term in set(tokenize(query)):
+            t = self._terms.find(term)
+            if t < 0:
+                continue
+            start, end = self._post_offsets[t], self._post_offsets[t + 1]
+            docs = self._post_docs[start:end]
+            tfs = self._post_tfs[start:end].astype(np.float32)
+            idf = math.log(1 + (n - len(docs) + 0.5) / (len(docs) + 0.5))
+            norm = self.k1 * (
+                1 - self.b + self.b * self._lengths[docs] / self.meta["avg_length"]
+            )
+            doc_parts.append(docs)
+            score_parts.append(idf * tfs * (self.k1 + 1) / (tfs + norm))
+        if not doc_parts:
+            return []
+
+        docs, inverse = np.unique(np.concatenate(doc_parts), return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(score_parts))
+        top = (
+            np.argsort(-scores)[:k]
+            if len(scores) <= k
+            else np.argpartition(-scores, k)[:k]
+        )
+        top = top[np.argsort(-scores[top])]
+        return [
+            {
+                "title": self._titles[int(docs[i])],
+                "score": round(float(scores[i]), 3),
+                "snippet": self._texts[int(docs[i])][:300],
+            }
+            for i in top
+        ]
+
+    def find(self, title: str) -> Optional[int]:
+        """Article id for a title or redirect (case-insensitive)."""
+        i = self._keys.find(title.lower())
+        return None if i < 0 else int(self._key_docs[i])
+
+    def title(self, doc: int) -> str:
+        return self._titles[doc]
+
+    def text(self, doc: int) -> str:
+        return self._texts[doc]
+
+    def sections(self, doc: int) -> List[Tuple[str, str]]:
+        return split_sections(self._texts[doc])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build an offline Wikipedia index")
+    parser.add_argument("dump", help="MediaWiki XML dump (.xml/.xml.bz2) or JSONL")
+    parser.add_argument("directory", help="where to write the index")
+    parser.add_argument("--block-postings", type=int, default=5_000_000)
+    args = parser.parse_args()
+    print(build_index(args.dump, args.directory, args.block_postings))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel, Field
+from .wikipedia_index import WikipediaIndex
+from ..models.execution_context import ExecutionContext
+from ..tools.base_tool import BaseTool
+
+
+class WikipediaSearchInput(BaseModel):
+    query: str = Field(description="Keywords to search Wikipedia articles for")
+    k: int = Field(default=5, description="Number of articles to return")
+
+
+class WikipediaSearch(BaseTool):
+    """Search a local Wikipedia index by keyword (BM25)."""
+
+    def __init__(self, index: WikipediaIndex, max_k: int = 10):
+        self.index = index
+        self.max_k = max_k
+        super().__init__(
+            name="search_wikipedia",
+            description=(
+                "Search Wikipedia by keywords. Returns matching article titles "
+                "with a relevance score and the start of each article. Use "
+                "read_wikipedia to read an article or one of its sections."
+            ),
+            pydantic_input_model=WikipediaSearchInput,
+            # The index is a fixed snapshot; a rebuilt one gets new memo keys
+            cache_policy="pure",
+            cache_version=index.fingerprint,
+        )
+
+    async def execute(
+        self, context: ExecutionContext, query: str, k: int = 5
+    ) -> List[Dict[str, Any]]:
+        return self.index.search(query, k=max(1, min(k, self.max_k)))
+
+
+class WikipediaReadInput(BaseModel):
+    title: str = Field(description="Article title (redirects are followed)")
+    section: Optional[str] = Field(
+        default=None,
+        description="Section heading to read; omit for the introduction and the list of sections",
+    )
+
+
+class WikipediaRead(BaseTool):
+    """Read an article or one section from a local Wikipedia index."""
+
+    def __init__(self, index: WikipediaIndex, max_chars: int = 6000):
+        self.index = index
+        self.max_chars = max_chars
+        super().__init__(
+            name="read_wikipedia",
+            description=(
+                "Read a Wikipedia article by title. Without a section, returns the "
+                "introduction and the article's section headings; with a section, "
+                "returns that section's text."
+            ),
+            pydantic_input_model=WikipediaReadInput,
+            cache_policy="pure",
+            cache_version=index.fingerprint,
+        )
+
+    async def execute(
+        self, context: ExecutionContext, title: str, section: Optional[str] = None
+    ) -> Dict[str, Any]:
+        doc = self.index.find(title)
+        if doc is None:
+            hits = self.index.search(title, k=5)
+            return {
+                "error": f"No article titled '{title}'",
+                "suggestions": [hit["title"] for hit in hits],
+            }
+        sections = self.index.sections(doc)
+        headings = [heading for heading, _ in sections]
+        if section is None:
+            heading, text = sections[0] if sections else ("Introduction", "")
+        else:
+            matches = [s for s in sections if s[0].lower() == section.strip().lower()]
+            if not matches:
+                return {
+                    "title": self.index.title(doc),
+                    "error": f"No section '{section}'",
+                    "sections": headings,
+                }
+            heading, text = matches[0]
+        truncated = len(text) > self.max_chars
+        return {
+            "title": self.index.title(doc),
+            "section": heading,
+            "text": text[: self.max_chars],
+            "truncated": truncated,
+            "sections": headings,
+        }
@@ -1,4 +1,34 @@
+from importlib import import_module
+
 from .base_tool import BaseTool
 from .calculator import calculator
+from .tool_output import ToolOutputStore, read_tool_output
+
+# Tools with heavy dependencies (pandas, numpy, aiohttp) are imported on first
+# use, so agents that only need the calculator stay quick to start
+_LAZY = {
+    "AttachmentReader": ".attachments",
+    "PythonSandbox": ".python_sandbox",
+    "SandboxPool": ".python_sandbox",
+    "WebFetch": ".web_fetch",
+    "WebFetcher": ".web_fetch",
+}
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        return getattr(import_module(_LAZY[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
-__all__ = ['BaseTool', 'calculator']
+__all__ = [
+    "AttachmentReader",
+    "BaseTool",
+    "calculator",
+    "PythonSandbox",
+    "SandboxPool",
+    "ToolOutputStore",
+    "WebFetch",
+    "WebFetcher",
+    "read_tool_output",
+]
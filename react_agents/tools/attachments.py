@@ -0,0 +1,439 @@
+import asyncio
+import hashlib
+import itertools
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Literal, Optional, Tuple, Union
+import pandas as pd
+from pydantic import BaseModel, Field
+from .base_tool import BaseTool
+from ..models.execution_context import ExecutionContext
+
+TABLE_SUFFIXES = {
+    ".csv": "csv",
+    ".tsv": "csv",
+    ".xlsx": "excel",
+    ".xlsm": "excel",
+    ".xls": "excel",
+    ".parquet": "parquet",
+    ".jsonl": "jsonl",
+}
+AGGREGATES = (
+    "count",
+    "sum",
+    "mean",
+    "median",
+    "min",
+    "max",
+    "std",
+    "nunique",
+    "value_counts",
+)
+
+Operation = Literal["info", "read", "query"]
+FilterOp = Literal["==", "!=", ">", ">=", "<", "<=", "contains", "in"]
+
+
+def file_kind(path: str) -> str:
+    suffix = os.path.splitext(path)[1].lower()
+    if suffix == ".pdf":
+        return "pdf"
+    return TABLE_SUFFIXES.get(suffix, "text")
+
+
+def file_digest(path: str, block_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _records(frame: pd.DataFrame) -> List[dict]:
+    # Round-trip through pandas' JSON writer for plain types (NaN -> None, ISO dates)
+    return json.loads(frame.to_json(orient="records", date_format="iso"))
+
+
+def _scalar(value: Any) -> Any:
+    return _records(pd.DataFrame({"value": [value]}))[0]["value"]
+
+
+def _csv_separator(path: str) -> str:
+    return "\t" if path.lower().endswith(".tsv") else ","
+
+
+def _pdf_reader(path: str):
+    try:
+        from pypdf import PdfReader
+    except ImportError as e:
+        raise ImportError(
+            "Reading PDF attachments needs `pypdf` (pip install pypdf)"
+        ) from e
+    return PdfReader(path)
+
+
+def _excel_rows(path: str, sheet: Optional[str], start: int, count: int):
+    """(header, rows) streamed from a worksheet without loading the workbook."""
+    try:
+        from openpyxl import load_workbook
+    except ImportError as e:
+        raise ImportError(
+            "Reading Excel attachments needs `openpyxl` (pip install openpyxl)"
+        ) from e
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        worksheet = workbook[sheet] if sheet else workbook.worksheets[0]
+        rows = worksheet.iter_rows(values_only=True)
+        header = [str(value) for value in next(rows, ())]
+        return header, [
+            list(row) for row in itertools.islice(rows, start, start + count)
+        ]
+    finally:
+        workbook.close()
+
+
+class Filter(BaseModel):
+    column: str = Field(description="Column to test")
+    op: FilterOp = Field(description="Comparison to apply")
+    value: Union[str, float, int, bool, None, List[Union[str, float, int, bool]]] = (
+        Field(description="Value to compare with (a list for 'in')")
+    )
+
+
+def _mask(frame: pd.DataFrame, condition: Filter) -> pd.Series:
+    """Boolean row mask for one filter, without evaluating any expression."""
+    column, value = frame[condition.column], condition.value
+    if condition.op == "contains":
+        return column.astype(str).str.contains(str(value), case=False, regex=False)
+    if condition.op == "in":
+        return column.isin(value if isinstance(value, list) else [value])
+    if isinstance(value, list):
+        raise ValueError(f"Operator '{condition.op}' takes a single value")
+    return {
+        "==": column.__eq__,
+        "!=": column.__ne__,
+        ">": column.__gt__,
+        ">=": column.__ge__,
+        "<": column.__lt__,
+        "<=": column.__le__,
+    }[condition.op](value)
+
+
+class AttachmentReaderInput(BaseModel):
+    path: str = Field(description="Path of the attached file")
+    operation: Operation = Field(
+        default="info",
+        description=(
+            "info: file type, size and structure (columns, row count, sheets or "
+            "pages); read: rows, pages or lines from `start`; query: filter, "
+            "group and aggregate a table"
+        ),
+    )
+    start: int = Field(
+        default=0, description="First row, page or line to read (0-based)"
+    )
+    count: Optional[int] = Field(
+        default=None, description="How many rows, pages or lines to read"
+    )
+    sheet: Optional[str] = Field(
+        default=None, description="Excel sheet name (default: first sheet)"
+    )
+    column: Optional[str] = Field(
+        default=None, description="Column to aggregate (query)"
+    )
+    aggregate: Optional[str] = Field(
+        default=None,
+        description=f"Aggregate for `column`: one of {', '.join(AGGREGATES)}",
+    )
+    where: Optional[List[Filter]] = Field(
+        default=None,
+        description=(
+            "Row filters, all of which must hold, e.g. "
+            '[{"column": "Region", "op": "==", "value": "West"}] (query)'
+        ),
+    )
+    group_by: Optional[str] = Field(
+        default=None, description="Column to group by (query)"
+    )
+
+
+class AttachmentReader(BaseTool):
+    """Read CSV, Excel, PDF and text attachments in bounded pieces.
+
+    Paths are resolved inside `root` (the GAIA attachments directory) and
+    anything that escapes it is rejected. `read` streams only the requested
+    rows, pages or lines from disk. `info` and `query` work on the whole
+    table; parsed tables are kept in an LRU keyed by the file's content hash
+    (and on disk as parquet when `cache_dir` is set), so repeated questions
+    over the same file skip re-parsing.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        cache_dir: Optional[str] = None,
+        max_rows: int = 50,
+        max_chars: int = 4000,
+        cache_entries: int = 16,
+    ):
+        self.root = os.path.realpath(root)
+        self.cache_dir = cache_dir
+        self.max_rows = max_rows
+        self.max_chars = max_chars
+        self.cache_entries = cache_entries
+        self._tables: "OrderedDict[Tuple[str, Optional[str]], pd.DataFrame]" = (
+            OrderedDict()
+        )
+        # (path, size, mtime) -> digest, so unchanged files are hashed once
+        self._digests: Dict[Tuple[str, int, float], str] = {}
+        # Operations run in worker threads; guards both caches and counters
+        self._lock = threading.Lock()
+        self.parses = 0
+        self.cache_hits = 0
+        super().__init__(
+            name="read_attachment",
+            description=(
+                "Inspect an attached file (CSV, TSV, Excel, parquet, JSONL, PDF or "
+                "text). Start with operation='info', then read rows/pages/lines or "
+                "run a query that filters, groups and aggregates a table."
+            ),
+            pydantic_input_model=AttachmentReaderInput,
+        )
+
+    def _resolve(self, path: str) -> str:
+        resolved = os.path.realpath(os.path.join(self.root, path))
+        if os.path.commonpath([resolved, self.root]) != self.root:
+            raise ValueError(f"'{path}' is outside the attachments directory")
+        if not os.path.isfile(resolved):
+            raise FileNotFoundError(f"No attachment at '{path}'")
+        return resolved
+
+    def digest(self, path: str) -> str:
+        stat = os.stat(path)
+        key = (path, stat.st_size, stat.st_mtime)
+        with self._lock:
+            digest = self._digests.get(key)
+        if digest is None:
+            # Hashed outside the lock; a racing thread computes the same value
+            digest = file_digest(path)
+            with self._lock:
+                self._digests[key] = digest
+        return digest
+
+    # ---- whole-table access (cached) ----------------------------------
+
+    def table(self, path: str, sheet: Optional[str] = None) -> pd.DataFrame:
+        key = (self.digest(path), sheet)
+        with self._lock:
+            if key in self._tables:
+                self._tables.move_to_end(key)
+                self.cache_hits += 1
+                return self._tables[key]
+
+        cached = None
+        if self.cache_dir:
+            cached = os.path.join(self.cache_dir, f"{key[0]}-{sheet or ''}.parquet")
+        if cached and os.path.exists(cached):
+            frame = pd.read_parquet(cached)
+            with self._lock:
+                self.cache_hits += 1
+        else:
+            frame = self._parse(path, sheet)
+            with self._lock:
+                self.parses += 1
+            if cached:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                try:
+                    frame.to_parquet(cached)
+                except (ValueError, TypeError, ImportError):
+                    # Mixed-type object columns cannot always be written
+                    pass
+
+        with self._lock:
+            self._tables[key] = frame
+            while len(self._tables) > self.cache_entries:
+                self._tables.popitem(last=False)
+        return frame
+
+    def _parse(self, path: str, sheet: Optional[str]) -> pd.DataFrame:
+        kind = file_kind(path)
+        if kind == "csv":
+            return pd.read_csv(path, sep=_csv_separator(path))
+        if kind == "excel":
+            return pd.read_excel(path, sheet_name=sheet or 0)
+        if kind == "parquet":
+            return pd.read_parquet(path)
+        if kind == "jsonl":
+            return pd.read_json(path, lines=True)
+        raise ValueError(f"'{os.path.basename(path)}' is not a table")
+
+    # ---- operations -----------------------------------------------------
+
+    def info(self, path: str, sheet: Optional[str] = None) -> Dict[str, Any]:
+        kind = file_kind(path)
+        info: Dict[str, Any] = {
+            "file": os.path.basename(path),
+            "type": kind,
+            "bytes": os.path.getsize(path),
+        }
+        if kind == "pdf":
+            info["pages"] = len(_pdf_reader(path).pages)
+        elif kind == "text":
+            with open(path, encoding="utf-8", errors="replace") as f:
+                info["lines"] = sum(1 for _ in f)
+        else:
+            if kind == "excel":
+                info["sheets"] = list(pd.ExcelFile(path).sheet_names)
+            frame = self.table(path, sheet)
+            info["rows"] = len(frame)
+            info["columns"] = {name: str(dtype) for name, dtype in frame.dtypes.items()}
+            info["preview"] = _records(frame.head(5))
+        return info
+
+    def read(
+        self,
+        path: str,
+        start: int = 0,
+        count: Optional[int] = None,
+        sheet: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        kind = file_kind(path)
+        start = max(0, start)
+        if kind == "pdf":
+            return self._read_pages(path, start, count or 1)
+        if kind == "text":
+            return self._read_lines(path, start, count or 200)
+
+        count = max(1, min(count or self.max_rows, self.max_rows))
+        key = (self.digest(path), sheet)
+        with self._lock:
+            cached = self._tables.get(key)
+        if cached is not None:
+            rows = _records(cached.iloc[start : start + count])
+        elif kind == "csv":
+            # Only the requested rows are parsed
+            frame = pd.read_csv(
+                path,
+                sep=_csv_separator(path),
+                skiprows=range(1, start + 1),
+                nrows=count,
+            )
+            rows = _records(frame)
+        elif kind == "excel":
+            header, values = _excel_rows(path, sheet, start, count)
+            rows = [dict(zip(header, row)) for row in values]
+            rows = _records(pd.DataFrame(rows))
+        else:
+            rows = _records(self.table(path, sheet).iloc[start : start + count])
+        return {"start": start, "rows": rows, **self._more(start, len(rows), count)}
+
+    def _more(self, start: int, returned: int, requested: int) -> Dict[str, Any]:
+        if returned < requested:
+            return {}
+        return {"next_start": start + returned}
+
+    def _read_pages(self, path: str, start: int, count: int) -> Dict[str, Any]:
+        reader = _pdf_reader(path)
+        pages, budget = [], self.max_chars
+        for number in range(start, min(start + count, len(reader.pages))):
+            if budget <= 0:
+                break
+            text = (reader.pages[number].extract_text() or "")[:budget]
+            budget -= len(text)
+            pages.append({"page": number, "text": text})
+        result: Dict[str, Any] = {"pages": pages, "total_pages": len(reader.pages)}
+        if pages and pages[-1]["page"] + 1 < len(reader.pages):
+            result["next_start"] = pages[-1]["page"] + 1
+        return result
+
+    def _read_lines(self, path: str, start: int, count: int) -> Dict[str, Any]:
+        lines: List[str] = []
+        budget = self.max_chars
+        with open(path, encoding="utf-8", errors="replace") as f:
+            for line in itertools.islice(f, start, start + count):
+                if budget <= 0:
+                    break
+                lines.append(line.rstrip("\n")[:budget])
+                budget -= len(lines[-1]) + 1
+        return {
+            "start": start,
+            "text": "\n".join(lines),
+            **self._more(start, len(lines), count),
+        }
+
+    def query(
+        self,
+        path: str,
+        sheet: Optional[str] = None,
+        column: Optional[str] = None,
+        aggregate: Optional[str] = None,
+        where: Optional[List[Filter]] = None,
+        group_by: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        frame = self.table(path, sheet)
+        conditions = [Filter.model_validate(condition) for condition in where or []]
+        for name in (column, group_by, *(c.column for c in conditions)):
+            if name is not None and name not in frame.columns:
+                raise ValueError(f"No column '{name}'. Columns: {list(frame.columns)}")
+        if aggregate is not None and aggregate not in AGGREGATES:
+            raise ValueError(
+                f"Unknown aggregate '{aggregate}'. Use one of {AGGREGATES}"
+            )
+
+        for condition in conditions:
+            frame = frame[_mask(frame, condition)]
+        result: Dict[str, Any] = {"matched_rows": len(frame)}
+        if aggregate is None:
+            columns = [c for c in (group_by, column) if c] or list(frame.columns)
+            result["rows"] = _records(frame[columns].head(self.max_rows))
+            return result
+        if column is None and aggregate != "count":
+            raise ValueError(f"Aggregate '{aggregate}' needs a column")
+
+        values = frame[column] if column else frame.iloc[:, 0]
+        if group_by:
+            grouped = values.groupby(frame[group_by])
+            if aggregate == "value_counts":
+                series = grouped.value_counts()
+                series.index = [" / ".join(map(str, key)) for key in series.index]
+            else:
+                series = grouped.agg(aggregate).sort_values(ascending=False)
+        elif aggregate == "value_counts":
+            series = values.value_counts()
+        else:
+            result["value"] = _scalar(values.agg(aggregate))
+            return result
+
+        result["groups"] = len(series)
+        top = series.head(self.max_rows)
+        result["values"] = {
+            str(key): record["value"]
+            for key, record in zip(top.index, _records(top.to_frame("value")))
+        }
+        return result
+
+    async def execute(
+        self,
+        context: ExecutionContext,
+        path: str,
+        operation: Operation = "info",
+        start: int = 0,
+        count: Optional[int] = None,
+        sheet: Optional[str] = None,
+        column: Optional[str] = None,
+        aggregate: Optional[str] = None,
+        where: Optional[List[Filter]] = None,
+        group_by: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        path = self._resolve(path)
+        if operation == "info":
+            return await asyncio.to_thread(self.info, path, sheet)
+        if operation == "read":
+            return await asyncio.to_thread(self.read, path, start, count, sheet)
+        if operation == "query":
+            return await asyncio.to_thread(
+                self.query, path, sheet, column, aggregate, where, group_by
+            )
+        raise ValueError(f"Unknown operation '{operation}'")
@@ -1,43 +1,67 @@
-from typing import Any, Dict, Type, Union, Optional
+from typing import Any, Dict, Literal, Type, Union, Optional
 from abc import ABC, abstractmethod
 import json
 from .schema_utils import format_tool_definition
 from ..models.execution_context import ExecutionContext
 from ..models.llm_request import LlmRequest
 
+# "pure": same arguments always give the same output, cache indefinitely
+# "ttl": cacheable for `cache_ttl` seconds (e.g. search results)
+# "side_effect": never cached (the default, since it is always safe)
+CachePolicy = Literal["pure", "ttl", "side_effect"]
+
 
 class BaseTool(ABC):
-    
     def __init__(
-        self, 
-        name: str = None, 
-        description: str = None, 
+        self,
+        name: str = None,
+        description: str = None,
         tool_definition: Optional[Union[Dict[str, Any], str]] = None,
         pydantic_input_model: Type = None,
-        output_type: str = "str"
+        output_type: str = "str",
+        max_output_bytes: Optional[int] = None,
+        cache_policy: CachePolicy = "side_effect",
+        cache_ttl: Optional[float] = None,
+        timeout: Optional[float] = None,
+        cache_version: Optional[str] = None,
     ):
         self.name = name or self.__class__.__name__
         self.description = description or self.__doc__ or ""
         self.pydantic_input_model = pydantic_input_model
         self.output_type = output_type
-        
+        # Outputs larger than this are stored out of band (None uses the default cap)
+        self.max_output_bytes = max_output_bytes
+        if cache_policy == "ttl" and cache_ttl is None:
+            raise ValueError(
+                f"Tool '{self.name}' has cache_policy 'ttl' but no cache_ttl"
+            )
+        self.cache_policy = cache_policy
+        self.cache_ttl = cache_ttl
+        # Part of the memo key: change it when the same arguments start giving
+        # different answers (e.g. a rebuilt index behind a "pure" tool)
+        self.cache_version = cache_version
+        # Seconds a single call may take before the agent abandons it
+        # (None falls back to the agent's tool_timeout)
+        self.timeout = timeout
+
         if isinstance(tool_definition, str):
             self._tool_definition = json.loads(tool_definition)
         elif tool_definition is not None:
             self._tool_definition = tool_definition
         else:
-            self._tool_definition = None  
+            self._tool_definition = None
 
     @property
     def tool_definition(self):
         if self._tool_definition is None:
             self._tool_definition = self._generate_definition()
         return self._tool_definition
-    
+
     def _generate_definition(self):
         if self.pydantic_input_model:
             try:
                 from pydantic import BaseModel
+
                 if issubclass(self.pydantic_input_model, BaseModel):
                     parameters = self.pydantic_input_model.model_json_schema()
                     return format_tool_definition(
@@ -47,19 +71,19 @@ class BaseTool(ABC):
                 pass
         else:
             return None
-    
-    async def __call__(self, **kwargs) -> Any:
-        return await self.execute(**kwargs)
-    
+
+    async def __call__(self, context: ExecutionContext, **kwargs) -> Any:
+        return await self.execute(context, **kwargs)
+
     @abstractmethod
     async def execute(self, context: ExecutionContext, **kwargs) -> Any:
         raise NotImplementedError(
             f"{self.__class__.__name__} must implement the execute method"
         )
-        
+
     async def process_llm_request(self, request: LlmRequest, context: ExecutionContext):
         return None
-    
+
     def to_code_prompt(self) -> str:
         """Generate tool description for code execution environment"""
         params_desc = ""
@@ -67,15 +91,19 @@ class BaseTool(ABC):
             func_def = self._tool_definition["function"]
             if "parameters" in func_def and "properties" in func_def["parameters"]:
                 params = []
-                for param_name, param_info in func_def["parameters"]["properties"].items():
+                for param_name, param_info in func_def["parameters"][
+                    "properties"
+                ].items():
                     param_type = param_info.get("type", "Any")
                     param_desc = param_info.get("description", "")
                     required = param_name in func_def["parameters"].get("required", [])
                     req_str = " (required)" if required else " (optional)"
-                    params.append(f"    - {param_name}: {param_type}{req_str} - {param_desc}")
+                    params.append(
+                        f"    - {param_name}: {param_type}{req_str} - {param_desc}"
+                    )
                 if params:
                     params_desc = "\n  Parameters:\n" + "\n".join(params)
-        
+
         return f"""Tool: {self.name}
   Description: {self.description}
-  Output Type: {self.output_type}{params_desc}"""
\ No newline at end of file
+  Output Type: {self.output_type}{params_desc}"""
@@ -10,14 +10,15 @@ class CalculatorInput(BaseModel):
 
 class Calculator(BaseTool):
     """Calculate mathematical expressions."""
-    
+
     def __init__(self):
         super().__init__(
             name="calculator",
             description="Calculate mathematical expressions",
-            pydantic_input_model=CalculatorInput
+            pydantic_input_model=CalculatorInput,
+            cache_policy="pure",
         )
-    
+
     async def execute(self, context: ExecutionContext, expression: str) -> float:
         """Execute the calculation."""
         return eval(expression)
@@ -0,0 +1,344 @@
+import ast
+import asyncio
+import io
+import multiprocessing
+import os
+import resource
+import signal
+import socket
+import time
+import traceback
+from collections import deque
+from contextlib import redirect_stderr, redirect_stdout
+from typing import Any, Dict, Iterable, Optional, Set
+import numpy as np
+from pydantic import BaseModel, Field
+from .base_tool import BaseTool
+from ..models.execution_context import ExecutionContext
+
+# Imported once in the fork server, so every worker starts with them loaded
+DEFAULT_PRELOAD = (
+    "math",
+    "statistics",
+    "fractions",
+    "decimal",
+    "itertools",
+    "collections",
+    "datetime",
+    "json",
+    "re",
+    "numpy",
+    "pandas",
+)
+
+
+# ---------------------------------------------------------------------------
+# Worker process
+# ---------------------------------------------------------------------------
+
+
+def _no_network(*args, **kwargs):
+    raise PermissionError("Network access is disabled in the sandbox")
+
+
+def _isolate_network() -> str:
+    """Move into an empty network namespace, or fall back to blocking sockets."""
+    try:
+        os.unshare(os.CLONE_NEWUSER | os.CLONE_NEWNET)
+        return "namespace"
+    except (AttributeError, OSError):
+        socket.socket = _no_network
+        socket.create_connection = _no_network
+        socket.getaddrinfo = _no_network
+        return "socket_guard"
+
+
+def _cpu_used() -> float:
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _execute(code: str, max_output_chars: int) -> Dict[str, Any]:
+    """Run `code` like a REPL cell: stdout is captured and the value of a
+    trailing expression is returned."""
+    output = io.StringIO()
+    namespace: Dict[str, Any] = {"__name__": "__main__"}
+    reply: Dict[str, Any] = {"result": None, "error": None}
+    start = time.perf_counter()
+    try:
+        tree = ast.parse(code, "<sandbox>", "exec")
+        last = (
+            tree.body.pop()
+            if tree.body and isinstance(tree.body[-1], ast.Expr)
+            else None
+        )
+        with redirect_stdout(output), redirect_stderr(output):
+            exec(compile(tree, "<sandbox>", "exec"), namespace)
+            if last is not None:
+                value = eval(
+                    compile(ast.Expression(last.value), "<sandbox>", "eval"), namespace
+                )
+                if value is not None:
+                    reply["result"] = repr(value)[:max_output_chars]
+    except BaseException as e:
+        # Includes SystemExit, which must not take the worker down. The
+        # traceback skips its header and this function's own frame.
+        lines = traceback.format_exception(type(e), e, e.__traceback__.tb_next)[1:]
+        reply["error"] = "".join(lines[-4:]).strip()[-max_output_chars:]
+    text = output.getvalue()
+    reply["stdout"] = text[:max_output_chars]
+    if len(text) > max_output_chars:
+        reply["stdout_truncated"] = len(text)
+    reply["seconds"] = round(time.perf_counter() - start, 4)
+    return reply
+
+
+def _worker_main(conn, limits: Dict[str, Any]):
+    isolation = _isolate_network()
+    memory = limits["memory_mb"] * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+    size = limits["file_size_mb"] * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_FSIZE, (size, size))
+    # The hard CPU cap covers the worker's whole life; the soft cap is moved
+    # before every call to give that call `cpu_seconds`
+    cpu_seconds = limits["cpu_seconds"]
+    hard_cpu = int(_cpu_used() + cpu_seconds * (limits["max_executions"] + 1)) + 1
+    resource.setrlimit(resource.RLIMIT_CPU, (hard_cpu, hard_cpu))
+    conn.send({"ready": True, "network_isolation": isolation})
+
+    while True:
+        try:
+            code = conn.recv()
+        except EOFError:
+            return
+        soft = min(int(_cpu_used() + cpu_seconds) + 1, hard_cpu)
+        resource.setrlimit(resource.RLIMIT_CPU, (soft, hard_cpu))
+        conn.send(_execute(code, limits["max_output_chars"]))
+
+
+# ---------------------------------------------------------------------------
+# Pool
+# ---------------------------------------------------------------------------
+
+
+class _Worker:
+    def __init__(self, process, conn, isolation: str):
+        self.process = process
+        self.conn = conn
+        self.isolation = isolation
+        self.executions = 0
+
+    def kill(self):
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join(1)
+        self.conn.close()
+
+
+class SandboxPool:
+    """Warm worker processes that execute untrusted Python.
+
+    Workers are forked from a fork server that has already imported
+    `preload`, so starting one is cheap and a call only pays for a pipe round
+    trip. Each worker runs without network access and under rlimits: address
+    space (`memory_mb`), file size, and `cpu_seconds` of CPU per call. A call
+    that exceeds `timeout` wall time kills its worker; workers are also
+    replaced after `max_executions` calls so state leaked between calls does
+    not accumulate. Replacement happens in the background.
+
+    Workers are started with the "forkserver" method, so a script that
+    creates a pool needs the usual `if __name__ == "__main__":` guard.
+    """
+
+    def __init__(
+        self,
+        size: int = 2,
+        timeout: float = 10.0,
+        max_executions: int = 100,
+        cpu_seconds: Optional[float] = None,
+        memory_mb: int = 1024,
+        file_size_mb: int = 16,
+        max_output_chars: int = 10000,
+        preload: Iterable[str] = DEFAULT_PRELOAD,
+    ):
+        self.size = size
+        self.timeout = timeout
+        self.limits = {
+            "cpu_seconds": cpu_seconds or timeout,
+            "memory_mb": memory_mb,
+            "file_size_mb": file_size_mb,
+            "max_output_chars": max_output_chars,
+            "max_executions": max_executions,
+        }
+        self.max_executions = max_executions
+        self._context = multiprocessing.get_context("forkserver")
+        self._context.set_forkserver_preload([__name__, *preload])
+        self._idle: Optional[asyncio.Queue] = None
+        self._workers: Set[_Worker] = set()
+        self._spawning: Set[asyncio.Task] = set()
+        self._start_lock: Optional[asyncio.Lock] = None
+
+        self.waiting = 0
+        self.executions = 0
+        self.timeouts = 0
+        self.crashes = 0
+        self.recycled = 0
+        self.latencies: deque = deque(maxlen=1000)
+
+    def _spawn(self) -> _Worker:
+        parent, child = self._context.Pipe()
+        process = self._context.Process(
+            target=_worker_main, args=(child, self.limits), daemon=True
+        )
+        process.start()
+        child.close()
+        hello = parent.recv()
+        return _Worker(process, parent, hello["network_isolation"])
+
+    async def _add_worker(self):
+        worker = await asyncio.to_thread(self._spawn)
+        self._workers.add(worker)
+        self._idle.put_nowait(worker)
+
+    async def start(self):
+        """Start the workers; called on first use if not called explicitly."""
+        if self._start_lock is None:
+            self._start_lock = asyncio.Lock()
+        async with self._start_lock:
+            if self._idle is not None:
+                return
+            self._idle = asyncio.Queue()
+            # The first spawn also starts the fork server and its imports
+            await self._add_worker()
+            await asyncio.gather(*(self._add_worker() for _ in range(self.size - 1)))
+
+    def _replace(self, worker: _Worker):
+        self._workers.discard(worker)
+        worker.kill()
+        task = asyncio.create_task(self._add_worker())
+        self._spawning.add(task)
+        task.add_done_callback(self._spawning.discard)
+
+    async def _receive(self, worker: _Worker) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        readable = loop.create_future()
+        fd = worker.conn.fileno()
+        loop.add_reader(fd, lambda: readable.done() or readable.set_result(None))
+        try:
+            await readable
+        finally:
+            loop.remove_reader(fd)
+        return worker.conn.recv()
+
+    async def run(self, code: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Execute `code` in a warm worker and return its output."""
+        if self._idle is None:
+            await self.start()
+        timeout = timeout or self.timeout
+        self.waiting += 1
+        try:
+            worker = await self._idle.get()
+        finally:
+            self.waiting -= 1
+
+        start = time.perf_counter()
+        try:
+            worker.conn.send(code)
+            reply = await asyncio.wait_for(self._receive(worker), timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            self._replace(worker)
+            return {"error": f"Execution timed out after {timeout}s"}
+        except (EOFError, OSError):
+            self.crashes += 1
+            worker.process.join(1)
+            self._replace(worker)
+            return {"error": self._crash_reason(worker.process.exitcode)}
+        except asyncio.CancelledError:
+            # The worker may still be busy with the abandoned call
+            self._replace(worker)
+            raise
+
+        self.executions += 1
+        self.latencies.append(time.perf_counter() - start)
+        worker.executions += 1
+        if worker.executions >= self.max_executions:
+            self.recycled += 1
+            self._replace(worker)
+        else:
+            self._idle.put_nowait(worker)
+        return reply
+
+    def _crash_reason(self, exitcode: Optional[int]) -> str:
+        if exitcode == -signal.SIGXCPU:
+            return f"CPU time limit of {self.limits['cpu_seconds']}s exceeded"
+        if exitcode == -signal.SIGKILL:
+            return "Worker was killed (likely out of memory)"
+        return f"Worker exited unexpectedly (exit code {exitcode})"
+
+    async def close(self):
+        for task in list(self._spawning):
+            await asyncio.gather(task, return_exceptions=True)
+        for worker in list(self._workers):
+            worker.kill()
+        self._workers.clear()
+        self._idle = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool size, queue depth, outcomes and call latency (ms)."""
+        latencies = np.array(self.latencies) * 1000
+        p50, p95 = np.percentile(latencies, [50, 95]) if len(latencies) else (0.0, 0.0)
+        return {
+            "size": len(self._workers),
+            "starting": len(self._spawning),
+            "idle": self._idle.qsize() if self._idle is not None else 0,
+            "queue_depth": self.waiting,
+            "executions": self.executions,
+            "timeouts": self.timeouts,
+            "crashes": self.crashes,
+            "recycled": self.recycled,
+            "network_isolation": sorted({w.isolation for w in self._workers}),
+            "latency_p50_ms": float(p50),
+            "latency_p95_ms": float(p95),
+        }
+
+
+# ---------------------------------------------------------------------------
+# Tool
+# ---------------------------------------------------------------------------
+
+
+class PythonSandboxInput(BaseModel):
+    code: str = Field(
+        description=(
+            "Python code to run. Print results or end with an expression; its "
+            "value is returned. Variables do not persist between calls."
+        )
+    )
+
+
+class PythonSandbox(BaseTool):
+    """Run Python code in an isolated worker process."""
+
+    def __init__(self, pool: Optional[SandboxPool] = None, **pool_options):
+        self.pool = pool or SandboxPool(**pool_options)
+        super().__init__(
+            name="run_python",
+            description=(
+                "Execute Python code in a sandbox without network access and "
+                "return its printed output and final expression value. numpy, "
+                "pandas and the standard library are available."
+            ),
+            pydantic_input_model=PythonSandboxInput,
+            # Backstop for the pool's own limit, which excludes queueing
+            timeout=2 * self.pool.timeout,
+        )
+
+    async def execute(self, context: ExecutionContext, code: str) -> Dict[str, Any]:
+        # Within the run deadline the pool kills the worker itself and
+        # reports the timeout, instead of the call being cancelled
+        timeout = self.pool.timeout
+        left = context.time_left()
+        if left is not None:
+            timeout = max(min(timeout, left), 0.01)
+        return await self.pool.run(code, timeout=timeout)
@@ -0,0 +1,191 @@
+import json
+import os
+from dataclasses import asdict, is_dataclass
+from typing import Any, Optional
+from pydantic import BaseModel, Field
+from .base_tool import BaseTool
+from ..models.execution_context import ExecutionContext
+
+# Roughly 1k tokens at ~4 bytes per token
+DEFAULT_MAX_OUTPUT_BYTES = 4000
+DEFAULT_PREVIEW_BYTES = 800
+DEFAULT_PAGE_BYTES = 4000
+
+STATE_KEY = "tool_outputs"
+
+
+def _json_default(value: Any):
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if is_dataclass(value) and not isinstance(value, type):
+        return asdict(value)
+    if isinstance(value, (set, tuple)):
+        return list(value)
+    return str(value)
+
+
+def serialize_tool_output(output: Any) -> str:
+    """Serialize a tool output for the prompt.
+
+    Strings are passed through untouched, everything else becomes JSON so the
+    LLM sees structure rather than a Python repr.
+    """
+    if isinstance(output, list) and len(output) == 1:
+        output = output[0]
+    if isinstance(output, str):
+        return output
+    return json.dumps(output, default=_json_default, ensure_ascii=False)
+
+
+def _char_boundary(data: bytes, index: int) -> int:
+    """The largest index <= `index` that does not split a UTF-8 character."""
+    index = max(0, min(index, len(data)))
+    while 0 < index < len(data) and data[index] & 0xC0 == 0x80:
+        index -= 1
+    return index
+
+
+def _truncate_bytes(text: str, max_bytes: int) -> str:
+    """Cut text to at most max_bytes of UTF-8 without splitting a character."""
+    data = text.encode("utf-8")
+    return data[: _char_boundary(data, max_bytes)].decode("utf-8")
+
+
+class ToolOutputStore:
+    """Keeps large tool outputs out of the prompt.
+
+    Outputs over a tool's byte cap are stored in `ExecutionContext.state` (or
+    on disk when `spill_dir` is set) and replaced with a handle plus a short
+    preview. The model can page through the full content with
+    `read_tool_output`.
+    """
+
+    def __init__(
+        self,
+        default_max_bytes: int = DEFAULT_MAX_OUTPUT_BYTES,
+        preview_bytes: int = DEFAULT_PREVIEW_BYTES,
+        spill_dir: Optional[str] = None,
+    ):
+        self.default_max_bytes = default_max_bytes
+        self.preview_bytes = preview_bytes
+        self.spill_dir = spill_dir
+
+    def bound(
+        self,
+        context: ExecutionContext,
+        tool: BaseTool,
+        tool_call_id: str,
+        output: Any,
+    ) -> Any:
+        """Return the output unchanged if it fits, otherwise a handle and preview."""
+        max_bytes = tool.max_output_bytes or self.default_max_bytes
+        text = serialize_tool_output(output)
+        size = len(text.encode("utf-8"))
+        if size <= max_bytes:
+            return output
+
+        handle = f"{tool.name}:{tool_call_id}"
+        context.state.setdefault(STATE_KEY, {})[handle] = self._store(
+            context, handle, text, size
+        )
+
+        return {
+            "truncated": True,
+            "handle": handle,
+            "total_bytes": size,
+            "preview": _truncate_bytes(text, min(self.preview_bytes, max_bytes)),
+            "note": (
+                "Output was too large to include in full. Call read_tool_output "
+                "with this handle to page through it."
+            ),
+        }
+
+    def _store(
+        self, context: ExecutionContext, handle: str, text: str, size: int
+    ) -> dict:
+        if self.spill_dir is None:
+            return {"text": text, "total_bytes": size}
+
+        directory = os.path.join(self.spill_dir, context.execution_id)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, handle.replace(":", "_").replace("/", "_"))
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        return {"path": path, "total_bytes": size}
+
+
+class ReadToolOutputInput(BaseModel):
+    handle: str = Field(description="Handle of a truncated tool output")
+    offset: int = Field(default=0, description="Byte offset to start reading from")
+    length: int = Field(
+        default=DEFAULT_PAGE_BYTES, description="Maximum number of bytes to read"
+    )
+
+
+class ReadToolOutput(BaseTool):
+    """Page through a tool output that was too large to include in full."""
+
+    def __init__(self, page_bytes: int = DEFAULT_PAGE_BYTES):
+        self.page_bytes = page_bytes
+        super().__init__(
+            name="read_tool_output",
+            description=(
+                "Read part of a tool output that was truncated. Pass the handle "
+                "from the truncated result and a byte offset to continue from."
+            ),
+            pydantic_input_model=ReadToolOutputInput,
+            # Pages are shrunk until their serialized result fits, so the
+            # store never truncates a page a second time
+            max_output_bytes=page_bytes * 2,
+        )
+
+    async def execute(
+        self,
+        context: ExecutionContext,
+        handle: str,
+        offset: int = 0,
+        length: int = DEFAULT_PAGE_BYTES,
+    ) -> dict:
+        entry = context.state.get(STATE_KEY, {}).get(handle)
+        if entry is None:
+            raise ValueError(f"Unknown tool output handle '{handle}'")
+
+        length = max(1, min(length, self.page_bytes))
+        offset = max(0, offset)
+        total = entry["total_bytes"]
+        while True:
+            result = self._page(entry, handle, offset, length, total)
+            size = len(serialize_tool_output(result).encode("utf-8"))
+            if size <= self.max_output_bytes or length == 1:
+                return result
+            length = max(1, length * self.max_output_bytes // size - 16)
+
+    def _page(
+        self, entry: dict, handle: str, offset: int, length: int, total: int
+    ) -> dict:
+        # Read a few bytes either side so both ends can be moved to a
+        # character boundary; a character is at most 4 bytes
+        base = max(0, offset - 3)
+        if "path" in entry:
+            with open(entry["path"], "rb") as f:
+                f.seek(base)
+                data = f.read(offset - base + length + 4)
+        else:
+            data = entry["text"].encode("utf-8")[base : offset + length + 4]
+
+        start = _char_boundary(data, offset - base)
+        end = _char_boundary(data, offset - base + length)
+        if end <= start:
+            # Always return at least one whole character
+            end = _char_boundary(data, start + 4)
+        next_offset = base + end
+        return {
+            "handle": handle,
+            "offset": base + start,
+            "next_offset": next_offset if next_offset < total else None,
+            "total_bytes": total,
+            "content": data[start:end].decode("utf-8"),
+        }
+
+
+read_tool_output = ReadToolOutput()
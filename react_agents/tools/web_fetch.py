@@ -0,0 +1,407 @@
+import asyncio
+import codecs
+import hashlib
+import json
+import os
+import re
+import time
+from dataclasses import asdict, dataclass
+from html.parser import HTMLParser
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+import aiohttp
+from pydantic import BaseModel, Field
+from .base_tool import BaseTool
+from ..models.execution_context import ExecutionContext
+
+DEFAULT_USER_AGENT = "rob-agent/0.1 (+https://github.com/rob212/rob-agent)"
+
+_SKIP_TAGS = {"script", "style", "noscript", "svg", "template", "iframe", "head"}
+_BLOCK_TAGS = set(
+    "p div br li ul ol tr table section article header footer "
+    "h1 h2 h3 h4 h5 h6 pre blockquote".split()
+)
+_SPACES = re.compile(r"[ \t\r\f\v]+")
+_BLANK_LINES = re.compile(r"\n\s*\n+")
+
+
+class HtmlTextExtractor(HTMLParser):
+    """Incremental HTML to text.
+
+    Feed it decoded chunks as they arrive; it keeps visible text (plus the
+    page title) and stops collecting once `max_chars` have been gathered,
+    which `full` reports so the caller can stop downloading.
+    """
+
+    def __init__(self, max_chars: int):
+        super().__init__(convert_charrefs=True)
+        self.max_chars = max_chars
+        self.title = ""
+        self._parts: List[str] = []
+        self._size = 0
+        self._skip = 0
+        self._in_title = False
+
+    @property
+    def full(self) -> bool:
+        return self._size >= self.max_chars
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "title":
+            self._in_title = True
+        elif tag in _SKIP_TAGS:
+            self._skip += 1
+        elif tag in _BLOCK_TAGS:
+            self._append("\n")
+
+    def handle_endtag(self, tag):
+        if tag == "title":
+            self._in_title = False
+        elif tag in _SKIP_TAGS:
+            self._skip = max(0, self._skip - 1)
+        elif tag in _BLOCK_TAGS:
+            self._append("\n")
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title += data
+        elif not self._skip:
+            self._append(data)
+
+    def _append(self, text: str):
+        if not self.full:
+            self._parts.append(text)
+            self._size += len(text)
+
+    def text(self) -> str:
+        text = _SPACES.sub(" ", "".join(self._parts))
+        text = "\n".join(line.strip() for line in text.split("\n"))
+        return _BLANK_LINES.sub("\n\n", text).strip()[: self.max_chars]
+
+
+@dataclass
+class Page:
+    """Text extracted from a fetched URL."""
+
+    url: str
+    status: int
+    content_type: str
+    title: str
+    text: str
+    truncated: bool = False
+    timed_out: bool = False
+    from_cache: bool = False
+    bytes: int = 0
+    seconds: float = 0.0
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    fetched_at: float = 0.0
+
+
+class HttpCache:
+    """Extracted pages on disk, keyed by URL, with their validators.
+
+    Entries younger than `fresh_for` seconds are served without a request;
+    older ones are revalidated with If-None-Match / If-Modified-Since.
+    """
+
+    def __init__(self, directory: str, fresh_for: float = 300.0):
+        self.directory = directory
+        self.fresh_for = fresh_for
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, url: str) -> str:
+        return os.path.join(
+            self.directory, hashlib.sha256(url.encode()).hexdigest() + ".json"
+        )
+
+    def get(self, url: str) -> Optional[Page]:
+        try:
+            with open(self._path(url), encoding="utf-8") as f:
+                return Page(**json.load(f))
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def put(self, page: Page):
+        path = self._path(page.url)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(asdict(page), f)
+        os.replace(path + ".tmp", path)
+
+    def is_fresh(self, page: Page) -> bool:
+        return time.time() - page.fetched_at < self.fresh_for
+
+
+class DomainLimiter:
+    """At most `concurrency` requests per domain, started `min_interval` apart."""
+
+    def __init__(self, concurrency: int = 2, min_interval: float = 0.5):
+        self.concurrency = concurrency
+        self.min_interval = min_interval
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._last_start: Dict[str, float] = {}
+
+    async def acquire(self, domain: str):
+        semaphore = self._semaphores.setdefault(
+            domain, asyncio.Semaphore(self.concurrency)
+        )
+        await semaphore.acquire()
+        try:
+            async with self._locks.setdefault(domain, asyncio.Lock()):
+                loop = asyncio.get_running_loop()
+                wait = (
+                    self._last_start.get(domain, float("-inf"))
+                    + self.min_interval
+                    - loop.time()
+                )
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                self._last_start[domain] = loop.time()
+        except BaseException:
+            semaphore.release()
+            raise
+
+    def release(self, domain: str):
+        self._semaphores[domain].release()
+
+
+class WebFetcher:
+    """Fetches pages over one pooled keep-alive session and extracts their text.
+
+    Bodies are streamed and parsed as they arrive; reading stops after
+    `max_bytes`, after `timeout` seconds (returning what was read so far), or
+    once `max_chars` of text have been extracted.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 2_000_000,
+        max_chars: int = 100_000,
+        timeout: float = 15.0,
+        per_domain: int = 2,
+        min_interval: float = 0.5,
+        max_connections: int = 20,
+        cache_dir: Optional[str] = None,
+        fresh_for: float = 300.0,
+        user_agent: str = DEFAULT_USER_AGENT,
+    ):
+        self.max_bytes = max_bytes
+        self.max_chars = max_chars
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.user_agent = user_agent
+        self.limiter = DomainLimiter(per_domain, min_interval)
+        self.cache = HttpCache(cache_dir, fresh_for) if cache_dir else None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop = None
+        self.requests = 0
+        self.cache_hits = 0
+        self.revalidated = 0
+
+    def session(self) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_connections),
+                headers={"User-Agent": self.user_agent},
+            )
+            self._loop = loop
+        return self._session
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+    async def fetch(self, url: str, timeout: Optional[float] = None) -> Page:
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError(f"Only http(s) URLs can be fetched, got '{url}'")
+
+        cached = self.cache.get(url) if self.cache else None
+        if cached is not None and self.cache.is_fresh(cached):
+            self.cache_hits += 1
+            cached.from_cache = True
+            return cached
+
+        headers = {}
+        if cached is not None:
+            if cached.etag:
+                headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
+
+        domain = parts.hostname
+        await self.limiter.acquire(domain)
+        try:
+            self.requests += 1
+            page = await self._download(url, headers, timeout or self.timeout)
+        finally:
+            self.limiter.release(domain)
+
+        if page.status == 304 and cached is not None:
+            self.revalidated += 1
+            cached.fetched_at = page.fetched_at
+            cached.from_cache = True
+            self.cache.put(cached)
+            return cached
+        # A page cut short by the deadline may be complete next time
+        if self.cache is not None and page.status == 200 and not page.timed_out:
+            self.cache.put(page)
+        return page
+
+    async def _download(
+        self, url: str, headers: Dict[str, str], timeout: float
+    ) -> Page:
+        start = time.perf_counter()
+        deadline = asyncio.get_running_loop().time() + timeout
+        async with self.session().get(
+            url,
+            headers=headers,
+            timeout=aiohttp.ClientTimeout(sock_connect=timeout, sock_read=timeout),
+        ) as response:
+            content_type = response.headers.get("Content-Type", "")
+            page = Page(
+                url=url,
+                status=response.status,
+                content_type=content_type.split(";")[0].strip(),
+                title="",
+                text="",
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified"),
+                fetched_at=time.time(),
+            )
+            if response.status == 304:
+                return page
+
+            is_html = "html" in page.content_type or not page.content_type
+            if not (is_html or _is_text(page.content_type)):
+                page.text = f"Unsupported content type '{page.content_type}'"
+                return page
+
+            decoder = codecs.getincrementaldecoder(response.charset or "utf-8")(
+                errors="replace"
+            )
+            extractor = HtmlTextExtractor(self.max_chars) if is_html else None
+            plain: List[str] = []
+            received = chars = 0
+            try:
+                async with asyncio.timeout_at(deadline):
+                    async for chunk in response.content.iter_chunked(16384):
+                        chunk = chunk[: self.max_bytes - received]
+                        received += len(chunk)
+                        text = decoder.decode(chunk)
+                        if extractor is not None:
+                            extractor.feed(text)
+                            done = extractor.full
+                        else:
+                            plain.append(text)
+                            chars += len(text)
+                            done = chars >= self.max_chars
+                        if done or received >= self.max_bytes:
+                            page.truncated = True
+                            break
+            except TimeoutError:
+                # Keep whatever arrived before the deadline
+                page.truncated = page.timed_out = True
+
+            if extractor is not None:
+                extractor.close()
+                page.title = extractor.title.strip()
+                page.text = extractor.text()
+            else:
+                page.text = "".join(plain)[: self.max_chars]
+            page.bytes = received
+            page.seconds = round(time.perf_counter() - start, 3)
+            return page
+
+
+def _is_text(content_type: str) -> bool:
+    return (
+        content_type.startswith("text/")
+        or "json" in content_type
+        or "xml" in content_type
+    )
+
+
+def excerpt(
+    text: str, max_chars: int, start: int = 0, find: Optional[str] = None
+) -> Dict[str, Any]:
+    """A bounded slice of `text`: from `start`, or around matches of `find`."""
+    if find:
+        windows, pattern = [], re.compile(re.escape(find), re.I)
+        half = max(100, max_chars // 6)
+        budget = max_chars
+        end = -1
+        for match in pattern.finditer(text):
+            if match.start() < end or budget <= 0:
+                continue
+            left, end = max(0, match.start() - half), min(len(text), match.end() + half)
+            windows.append(text[left:end][:budget])
+            budget -= len(windows[-1])
+        return {"matches": len(pattern.findall(text)), "excerpts": windows}
+    piece = text[start : start + max_chars]
+    result: Dict[str, Any] = {"start": start, "text": piece, "total_chars": len(text)}
+    if start + len(piece) < len(text):
+        result["next_start"] = start + len(piece)
+    return result
+
+
+class WebFetchInput(BaseModel):
+    url: str = Field(description="URL of the page to read")
+    find: Optional[str] = Field(
+        default=None, description="Only return passages around this phrase"
+    )
+    start: int = Field(
+        default=0, description="Character offset to continue reading from"
+    )
+
+
+class WebFetch(BaseTool):
+    """Fetch a web page and return a bounded excerpt of its text."""
+
+    def __init__(
+        self,
+        fetcher: Optional[WebFetcher] = None,
+        max_chars: int = 4000,
+        cache_ttl: float = 300.0,
+        **fetcher_options,
+    ):
+        self.fetcher = fetcher or WebFetcher(**fetcher_options)
+        self.max_chars = max_chars
+        super().__init__(
+            name="fetch_web_page",
+            description=(
+                "Read a web page (e.g. a URL from search results). Returns the page "
+                "title and a slice of its text; pass `find` to get only the "
+                "passages mentioning a phrase, or `start` to continue reading."
+            ),
+            pydantic_input_model=WebFetchInput,
+            cache_policy="ttl",
+            cache_ttl=cache_ttl,
+            # Backstop for the fetcher's own limit, which excludes pacing waits
+            timeout=2 * self.fetcher.timeout,
+        )
+
+    async def execute(
+        self,
+        context: ExecutionContext,
+        url: str,
+        find: Optional[str] = None,
+        start: int = 0,
+    ) -> Dict[str, Any]:
+        # Stop reading early enough to return a partial page before the run
+        # deadline (leaving time for pacing waits) instead of being cancelled
+        timeout = self.fetcher.timeout
+        left = context.time_left()
+        if left is not None:
+            timeout = max(min(timeout, 0.5 * left), 0.1)
+        page = await self.fetcher.fetch(url, timeout)
+        if page.status >= 400:
+            raise RuntimeError(f"GET {url} returned HTTP {page.status}")
+        return {
+            "url": page.url,
+            "title": page.title,
+            **excerpt(page.text, self.max_chars, start, find),
+            "truncated_download": page.truncated,
+        }
@@ -4,14 +4,23 @@
 ##
 
 import asyncio
-from datasets import load_dataset
+import os
+import tempfile
+import time
 from dotenv import load_dotenv, find_dotenv
-from litellm import acompletion
 from pydantic import BaseModel
 
+from react_agents.models import BaseLlm, LlmRequest
+from react_agents.models.cascade import CascadeLlm
+from react_agents.models.concurrency import ConcurrencyController, LimitedLlm
+from react_agents.models.litellm import DEFAULT_POOL, LiteLlm
+from react_agents.types.contents import Message
+
+from evaluation.dataset import load_gaia
 from evaluation.runner import run_experiment
 from evaluation.reporting import (
     generate_accuracy_table,
+    generate_routing_summary,
     generate_unsolvable_summary,
 )
 
@@ -26,6 +35,8 @@ MODELS = [
     "gpt-5-mini",
     "anthropic/claude-sonnet-4-5",
     "anthropic/claude-haiku-4-5",
+    # Cascades try the cheap model first and escalate on low confidence
+    "gpt-5-mini > gpt-5",
 ]
 
 GAIA_SYSTEM_PROMPT = """ You are a general AI assistant. 
@@ -38,10 +49,13 @@ If you are asked for a string, don't use articles, neither abbreviations (e.g. f
 If you are asked for a comma separated list, apply the above rules depending on whether the element is a number or a string.”
 """
 
-PROVIDER_SEMAPHORES = {
-    "openai": asyncio.Semaphore(30),
-    "anthropic": asyncio.Semaphore(10),
-}
+# Starting points only: the controller raises limits while calls stay healthy
+# and halves them on 429s or timeouts.
+CONCURRENCY = ConcurrencyController(
+    initial_limits={"openai": 30, "anthropic": 10},
+    default_initial=10,
+    max_limit=100,
+)
 
 
 # =========================
@@ -60,35 +74,47 @@ class GaiaOutput(BaseModel):
 # =========================
 
 
-def get_provider(model: str) -> str:
-    """Extract provider name from model string."""
-    return "anthropic" if model.startswith("anthropic/") else "openai"
+# One client per model, sharing pooled connections and concurrency limits
+LLMS: dict[tuple[str, str | None], BaseLlm] = {}
+
 
+def get_llm(model: str, routing_log: str | None = None) -> BaseLlm:
+    """The client for `model`; cascades ("a > b") log routing to `routing_log`."""
+    key = (model, routing_log if " > " in model else None)
+    if key not in LLMS:
+        if " > " in model:
+            tiers = [get_llm(tier) for tier in model.split(" > ")]
+            LLMS[key] = CascadeLlm(tiers, log_path=routing_log)
+        else:
+            # LimitedLlm does the retrying, so 429s reach the AIMD controller
+            LLMS[key] = LimitedLlm(LiteLlm(model=model, num_retries=0), CONCURRENCY)
+    return LLMS[key]
 
-async def solve_problem(model: str, question: str) -> GaiaOutput:
+
+async def solve_problem(
+    model: str, question: str, routing_log: str | None = None
+) -> GaiaOutput:
     """Solve a single problem and return structured output."""
-    provider = get_provider(model)
-
-    async with PROVIDER_SEMAPHORES[provider]:
-        response = await acompletion(
-            model=model,
-            messages=[
-                {"role": "system", "content": GAIA_SYSTEM_PROMPT},
-                {"role": "user", "content": question},
-            ],
-            response_format=GaiaOutput,
-            num_retries=2,
+    response = await get_llm(model, routing_log).generate(
+        LlmRequest(
+            instructions=[GAIA_SYSTEM_PROMPT],
+            contents=[Message(role="user", content=question)],
+            output_type=GaiaOutput,
         )
-        finish_reason = response.choices[0].finish_reason
-        content = response.choices[0].message.content
+    )
+    if response.error_message:
+        raise RuntimeError(response.error_message)
 
-        if finish_reason == "refusal" or content is None:
-            return GaiaOutput(
-                is_solvable=False,
-                unsolvable_reason=f"Model refused to answer (finish_reason: {finish_reason})",
-                final_answer="",
-            )
-        return GaiaOutput.model_validate_json(content)
+    content = next(
+        (c.content for c in response.content if isinstance(c, Message)), None
+    )
+    if response.finish_reason == "refusal" or content is None:
+        return GaiaOutput(
+            is_solvable=False,
+            unsolvable_reason=f"Model refused to answer (finish_reason: {response.finish_reason})",
+            final_answer="",
+        )
+    return GaiaOutput.model_validate_json(content)
 
 
 # =========================
@@ -96,18 +122,24 @@ async def solve_problem(model: str, question: str) -> GaiaOutput:
 # =========================
 
 
-async def run():
+async def run(routing_log: str | None = None):
     load_dotenv(find_dotenv())
 
-    dataset = load_dataset(
-        "gaia-benchmark/GAIA",
-        "2023_level1",
-        split="validation",
+    # A fresh log per run, so the routing summary only covers this run
+    routing_log = routing_log or os.path.join(
+        tempfile.gettempdir(), f"routing-{time.strftime('%Y%m%d-%H%M%S')}.jsonl"
     )
 
-    subset = dataset.select(range(20))
+    # Snapshotted from the hub on first run, then loaded offline from the local cache
+    dataset = load_gaia(levels=(1,)).filter(levels=[1])
+
+    subset = dataset.head(20)
 
-    results = await run_experiment(subset, MODELS, solve_problem)
+    results = await run_experiment(
+        subset,
+        MODELS,
+        lambda model, question: solve_problem(model, question, routing_log),
+    )
 
     stats = generate_accuracy_table(results)
     unsolvable = generate_unsolvable_summary(results)
@@ -118,6 +150,16 @@ async def run():
     print("\n============= Unsolvable Summary =============")
     print(unsolvable)
 
+    if os.path.exists(routing_log):
+        print(f"\n============= Cascade Routing ({routing_log}) =============")
+        print(generate_routing_summary(routing_log))
+
+    print("\n============= Concurrency Limits =============")
+    for key, stats in CONCURRENCY.snapshot().items():
+        print(f"{key}: {stats}")
+
+    await DEFAULT_POOL.close()
+
 
 if __name__ == "__main__":
     asyncio.run(run())
@@ -1,5 +1,8 @@
 import asyncio
+import json
+import time
 from dotenv import load_dotenv
+from functools import partial
 
 from typing import List, Optional
 from react_agents.models import BaseLlm
@@ -9,58 +12,170 @@ from react_agents.models import AgentResult
 from react_agents.types.contents import Message, ToolCall
 from react_agents.types import Event
 from react_agents.models import ExecutionContext
-from react_agents.tools import BaseTool
+from react_agents.tools import BaseTool, ToolOutputStore, read_tool_output
+from react_agents.cache import ToolMemo
+from react_agents.memory import MemoryStore
+from react_agents.planning import DagRun, Plan, PlanStep, execute_dag, validate_plan
+from react_agents.planning.plan import PLANNER_PROMPT, REPLAN_PROMPT
+from react_agents.tools.tool_output import serialize_tool_output
 from react_agents.types.contents import ToolResult
 from typing import Type
 from pydantic import BaseModel
 
+
+class BudgetExceeded(Exception):
+    """Raised by a budgeted model (see orchestration) once a shared budget has run out."""
+
+
 class Agent:
-    def __init__(self, name: str, model: BaseLlm, tools: List[BaseTool], instructions: str, max_steps: int = 10, output_type: Optional[Type[BaseModel]] = None):
+    def __init__(
+        self,
+        name: str,
+        model: BaseLlm,
+        tools: List[BaseTool],
+        instructions: str,
+        max_steps: int = 10,
+        output_type: Optional[Type[BaseModel]] = None,
+        output_store: Optional[ToolOutputStore] = None,
+        verbose: bool = True,
+        memo: Optional[ToolMemo] = None,
+        memory: Optional[MemoryStore] = None,
+        memory_k: int = 5,
+        memory_max_chars: int = 1000,
+        planner: bool = False,
+        max_replans: int = 1,
+        timeout: Optional[float] = None,
+        tool_timeout: Optional[float] = None,
+        answer_reserve: float = 0.2,
+    ):
         self.name = name
         self.model = model
         self.max_steps = max_steps
         self.instructions = instructions
+        self.output_store = output_store or ToolOutputStore()
+        # Only tools declared pure or TTL-cacheable are memoized
+        self.memo = memo or ToolMemo()
+        self.memory = memory
+        self.memory_k = memory_k
+        # Tool results longer than this are not worth keeping as memories
+        self.memory_max_chars = memory_max_chars
+        # Plan tool calls as a DAG up front instead of one LLM call per action
+        self.planner = planner
+        self.max_replans = max_replans
+        # Run-level time limit in seconds, and the limit for tools without their
+        # own `timeout`; `answer_reserve` is the fraction of the run's time kept
+        # back to write an answer from what was gathered when time runs out
+        self.timeout = timeout
+        self.tool_timeout = tool_timeout
+        self.answer_reserve = answer_reserve
+        self.verbose = verbose
         self.tools = self._setup_tools(tools)
-        
+
     def _setup_tools(self, tools: List[BaseTool]) -> List[BaseTool]:
+        # Let the model page through outputs that were too large for the prompt
+        if tools and read_tool_output.name not in {tool.name for tool in tools}:
+            tools = tools + [read_tool_output]
         return tools
-    
+
     async def run(
         self,
         user_input: str,
-        context: ExecutionContext = None
+        context: ExecutionContext = None,
+        timeout: Optional[float] = None,
     ) -> str:
         # Create or reuse context
         if context is None:
             context = ExecutionContext()
 
+        # A deadline already on the context (e.g. from a parent agent) wins.
+        # LLM calls and tools must finish by `context.deadline`; the time
+        # after it, up to `answer_deadline`, is kept for a final answer.
+        outer_deadline = context.deadline
+        answer_deadline = outer_deadline
+        timeout = timeout or self.timeout
+        if answer_deadline is None and timeout is not None:
+            answer_deadline = time.monotonic() + timeout
+        if answer_deadline is not None:
+            left = answer_deadline - time.monotonic()
+            context.deadline = answer_deadline - max(left, 0) * self.answer_reserve
+        work_deadline = context.deadline
+
         # Add user input as the first event
         user_event = Event(
             execution_id=context.execution_id,
             author="user",
-            content=[Message(role="user", content=user_input)]
+            content=[Message(role="user", content=user_input)],
         )
         context.add_event(user_event)
 
-        # Execute steps until completion or max steps reached
-        while not context.final_result and context.current_step < self.max_steps:
-            await self.step(context)
+        # Retrieve long-term memories once; every step's request includes them
+        if self.memory is not None:
+            memories = await self.memory.recall(user_input, k=self.memory_k)
+            context.state["memories"] = [m.text for m in memories]
 
-            # Check if the last event is a final response
-            last_event = context.events[-1]
-            if self._is_final_response(last_event):
-                context.final_result = self._extract_final_result(last_event)
+        # The loop below then answers from the plan's results, or carries on
+        # step by step if the plan was not enough
+        stop_reason = None
+        try:
+            if self.planner and self.tools:
+                await self.plan_and_execute(context)
+
+            # Execute steps until completion, max steps or the deadline
+            while not context.final_result and context.current_step < self.max_steps:
+                if self._out_of_time(context):
+                    break
+                await self.step(context)
+
+                # Check if the last event is a final response
+                last_event = context.events[-1]
+                if self._is_final_response(last_event):
+                    context.final_result = self._extract_final_result(last_event)
+        except TimeoutError:
+            # Only our own deadline is handled here
+            if not self._out_of_time(context):
+                raise
+        except BudgetExceeded as e:
+            # Like the deadline: stop working and answer from the reserve
+            stop_reason = str(e)
+        finally:
+            context.deadline = outer_deadline
+
+        out_of_time = work_deadline is not None and time.monotonic() >= work_deadline
+        if stop_reason is None and out_of_time:
+            stop_reason = "deadline"
+        if not context.final_result and stop_reason is not None:
+            context.state["stop_reason"] = stop_reason
+            context.final_result = await self.wind_down(context, answer_deadline)
+
+        # A partial answer written when time or budget ran out is not worth
+        # remembering
+        if (
+            self.memory is not None
+            and context.final_result is not None
+            and stop_reason is None
+        ):
+            self.memory.remember(
+                f"Question: {user_input}\nAnswer: {context.final_result}",
+                kind="answer",
+                agent=self.name,
+            )
+        # remember() only queues the writes; make sure they land before a
+        # short-lived process exits
+        if self.memory is not None:
+            await self.memory.flush()
 
         return AgentResult(output=context.final_result, context=context)
-    
+
     async def step(self, context: ExecutionContext):
         # for visibility as we experiment and learn
-        print(f"[Step {context.current_step + 1}]")
+        if self.verbose:
+            print(f"[Step {context.current_step + 1}]")
         # Prepare what to send to the LLM
         llm_request = self._prepare_llm_request(context)
 
         # Get LLM's decision
-        llm_response = await self.think(llm_request)
+        async with asyncio.timeout(context.time_left()):
+            llm_response = await self.think(llm_request)
 
         # Record LLM response as an event
         response_event = Event(
@@ -82,42 +197,272 @@ class Agent:
             context.add_event(tool_event)
 
         context.increment_step()
-        
+
+    async def plan_and_execute(self, context: ExecutionContext):
+        """Ask for a plan of tool calls and run it, replanning only on failure."""
+        outputs = {}
+        feedback = None
+        for attempt in range(self.max_replans + 1):
+            if context.current_step >= self.max_steps or self._out_of_time(context):
+                return
+            async with asyncio.timeout(context.time_left()):
+                response = await self.think(
+                    self._prepare_plan_request(context, feedback)
+                )
+            context.increment_step()
+            plan = self._parse_plan(response)
+            if plan is None or not plan.steps:
+                return
+
+            try:
+                validate_plan(plan, [tool.name for tool in self.tools], outputs)
+            except ValueError as e:
+                feedback = self._replan_feedback(outputs, str(e))
+                continue
+
+            run = await execute_dag(
+                plan, partial(self._run_plan_step, context), outputs, attempt=attempt
+            )
+            context.plans.append(run)
+            self._record_plan_run(context, run)
+            outputs.update(run.outputs)
+            if self.verbose:
+                print(
+                    f"[Plan {attempt + 1}] {len(plan.steps)} steps, "
+                    f"{len(run.failed)} failed, up to {run.max_parallel} at once, "
+                    f"{run.seconds:.2f}s"
+                )
+            if not run.failed:
+                return
+            feedback = self._replan_feedback(
+                outputs,
+                "\n".join(f"- {n.id} ({n.tool}): {n.error}" for n in run.failed),
+            )
+
+    def _prepare_plan_request(
+        self, context: ExecutionContext, feedback: Optional[str]
+    ) -> LlmRequest:
+        request = self._prepare_llm_request(context)
+        tools = []
+        for tool in self.tools:
+            if tool.name == read_tool_output.name:
+                continue
+            definition = tool.tool_definition or {}
+            parameters = definition.get("function", {}).get("parameters", {})
+            tools.append(
+                f"- {tool.name}: {tool.description} Parameters: {json.dumps(parameters)}"
+            )
+        request.instructions.append(PLANNER_PROMPT.format(tools="\n".join(tools)))
+        if feedback:
+            request.instructions.append(feedback)
+        request.tools_dict = {}
+        request.tool_choice = None
+        request.output_type = Plan
+        return request
+
+    def _parse_plan(self, response: LlmResponse) -> Optional[Plan]:
+        # An unusable plan falls back to the step-by-step loop
+        if response.error_message:
+            return None
+        for item in response.content:
+            if isinstance(item, Message) and item.role == "assistant":
+                try:
+                    return Plan.model_validate_json(item.content)
+                except ValueError:
+                    return None
+        return None
+
+    def _replan_feedback(self, outputs: dict, failed: str) -> str:
+        completed = "\n".join(
+            f"- {step_id}: {serialize_tool_output(output)[:300]}"
+            for step_id, output in outputs.items()
+        )
+        return REPLAN_PROMPT.format(completed=completed or "(none)", failed=failed)
+
+    async def _run_plan_step(
+        self, context: ExecutionContext, step: PlanStep, arguments: dict
+    ):
+        tool = next((t for t in self.tools if t.name == step.tool), None)
+        if tool is None:
+            raise ValueError(f"Tool '{step.tool}' not found")
+        return await self._call_tool(tool, context, arguments)
+
+    def _record_plan_run(self, context: ExecutionContext, run: DagRun):
+        """Add the steps that ran as tool calls and results, so the model sees them."""
+        calls, results = [], []
+        for node in run.nodes.values():
+            if node.status not in ("success", "error"):
+                continue
+            tool_call = ToolCall(
+                tool_call_id=f"plan{run.attempt}_{node.id}",
+                name=node.tool,
+                arguments=node.arguments,
+            )
+            calls.append(tool_call)
+            if node.status == "success":
+                tool = next(t for t in self.tools if t.name == node.tool)
+                self._remember_tool_result(tool_call, node.output)
+                output = self.output_store.bound(
+                    context, tool, tool_call.tool_call_id, node.output
+                )
+                results.append(
+                    ToolResult(
+                        tool_call_id=tool_call.tool_call_id,
+                        name=node.tool,
+                        status="success",
+                        content=[output],
+                    )
+                )
+            else:
+                results.append(
+                    ToolResult(
+                        tool_call_id=tool_call.tool_call_id,
+                        name=node.tool,
+                        status="error",
+                        content=[node.error],
+                    )
+                )
+        if calls:
+            context.add_event(
+                Event(
+                    execution_id=context.execution_id, author=self.name, content=calls
+                )
+            )
+            context.add_event(
+                Event(
+                    execution_id=context.execution_id, author=self.name, content=results
+                )
+            )
+
     async def think(self, llm_request: LlmRequest) -> LlmResponse:
         return await self.model.generate(llm_request)
-    
+
     async def act(
-        self, 
-        context: ExecutionContext, 
-        tool_calls: List[ToolCall]
+        self, context: ExecutionContext, tool_calls: List[ToolCall]
     ) -> List[ToolResult]:
         tools_dict = {tool.name: tool for tool in self.tools}
-        results = []
-        
         for tool_call in tool_calls:
             if tool_call.name not in tools_dict:
                 raise ValueError(f"Tool '{tool_call.name}' not found")
-            
+
+        async def call(tool_call: ToolCall) -> ToolResult:
             tool = tools_dict[tool_call.name]
-            
             try:
-                output = await tool(context, **tool_call.arguments)
-                results.append(ToolResult(
+                output = await self._call_tool(tool, context, tool_call.arguments)
+                self._remember_tool_result(tool_call, output)
+                output = self.output_store.bound(
+                    context, tool, tool_call.tool_call_id, output
+                )
+                return ToolResult(
                     tool_call_id=tool_call.tool_call_id,
                     name=tool_call.name,
                     status="success",
                     content=[output],
-                ))
+                )
             except Exception as e:
-                results.append(ToolResult(
+                return ToolResult(
                     tool_call_id=tool_call.tool_call_id,
                     name=tool_call.name,
                     status="error",
                     content=[str(e)],
-                ))
-        
-        return results
-    
+                )
+
+        # Independent calls from one step (e.g. several sub-agents) run at
+        # the same time; results keep the order of the calls
+        return list(await asyncio.gather(*(call(tc) for tc in tool_calls)))
+
+    async def _call_tool(
+        self, tool: BaseTool, context: ExecutionContext, arguments: dict
+    ):
+        """Run a tool under its timeout and the run deadline, whichever comes first.
+
+        A call cut short raises an exception with the reason, so it is
+        recorded as an error ToolResult like any other failure.
+        """
+        limit = tool.timeout if tool.timeout is not None else self.tool_timeout
+        left = context.time_left()
+        by_deadline = left is not None and (limit is None or left < limit)
+        try:
+            async with asyncio.timeout(left if by_deadline else limit):
+                return await self.memo.call(tool, context, arguments)
+        except TimeoutError:
+            if by_deadline:
+                raise TimeoutError(
+                    f"Tool '{tool.name}' was cancelled at the run deadline"
+                )
+            raise TimeoutError(f"Tool '{tool.name}' timed out after {limit}s")
+        except asyncio.CancelledError:
+            # A shared in-flight call (see ToolMemo) was cancelled by another
+            # caller; only propagate if this task itself is being cancelled
+            if asyncio.current_task().cancelling():
+                raise
+            raise RuntimeError(f"Tool '{tool.name}' was cancelled")
+
+    def _out_of_time(self, context: ExecutionContext) -> bool:
+        left = context.time_left()
+        return left is not None and left <= 0
+
+    async def wind_down(
+        self, context: ExecutionContext, deadline: Optional[float]
+    ) -> Optional[str]:
+        """Best answer after the deadline or budget: one last tool-free LLM call
+        within the reserved time, else the latest text the model produced."""
+        left = None if deadline is None else deadline - time.monotonic()
+        if left is None or left > 0:
+            request = self._prepare_llm_request(context)
+            request.instructions.append(
+                "Time is up: no more tools can be called. Answer now with the "
+                "best answer the information gathered so far supports, and say "
+                "what is still uncertain."
+            )
+            request.tools_dict = {}
+            request.tool_choice = None
+            # Lets a budgeted model spend its answer reserve on this call
+            request.metadata["final_answer"] = True
+            try:
+                async with asyncio.timeout(left):
+                    response = await self.think(request)
+            except (TimeoutError, BudgetExceeded):
+                response = None
+            if response is not None and not response.error_message:
+                event = Event(
+                    execution_id=context.execution_id,
+                    author=self.name,
+                    content=response.content,
+                )
+                context.add_event(event)
+                answer = self._extract_final_result(event)
+                if answer:
+                    return answer
+
+        for event in reversed(context.events):
+            if event.author == self.name:
+                answer = self._extract_final_result(event)
+                if answer:
+                    return answer
+        return None
+
+    def _remember_tool_result(self, tool_call: ToolCall, output):
+        """Keep a short, successful tool result as a memory.
+
+        Large outputs (which the prompt only sees as paged handles) and
+        results reporting an error (e.g. `{"error": ...}` from the sandbox)
+        are skipped.
+        """
+        if self.memory is None or tool_call.name == read_tool_output.name:
+            return
+        if isinstance(output, dict) and output.get("error"):
+            return
+        text = serialize_tool_output(output)
+        if len(text) > self.memory_max_chars:
+            return
+        arguments = ", ".join(f"{k}={v!r}" for k, v in tool_call.arguments.items())
+        self.memory.remember(
+            f"{tool_call.name}({arguments}) returned: {text}",
+            kind="tool_result",
+            tool=tool_call.name,
+        )
+
     def _is_final_response(self, event: Event) -> bool:
         """Check if this event contains a final response."""
         has_tool_calls = any(isinstance(c, ToolCall) for c in event.content)
@@ -129,40 +474,50 @@ class Agent:
             if isinstance(item, Message) and item.role == "assistant":
                 return item.content
         return None
-                
+
     def _prepare_llm_request(self, context: ExecutionContext) -> LlmRequest:
         # Flatten events into content items
         flat_contents = []
         for event in context.events:
             flat_contents.extend(event.content)
 
+        instructions = [self.instructions] if self.instructions else []
+        memories = context.state.get("memories")
+        if memories:
+            instructions.append(
+                "Relevant memories from earlier runs:\n"
+                + "\n".join(f"- {memory}" for memory in memories)
+            )
+
         return LlmRequest(
-            instructions=[self.instructions] if self.instructions else [],
+            instructions=instructions,
             contents=flat_contents,
-            tools_dict= {tool.name: tool.tool_definition for tool in self.tools},
+            tools_dict={tool.name: tool.tool_definition for tool in self.tools},
             tool_choice="auto" if self.tools else None,
         )
-    
+
+
 async def main():
     load_dotenv()
-    
+
     # Import your tools and model
     from react_agents.tools import calculator
     from react_agents.models.openai import OpenAILlm  # or whatever LLM you're using
-    
+
     # Create agent
     model = OpenAILlm(model="gpt-4o-mini")
     agent = Agent(
         name="TestAgent",
         model=model,
         tools=[calculator],
-        instructions="You are a helpful assistant"
+        instructions="You are a helpful assistant",
     )
-    
+
     # Run and print results
     result = await agent.run("What is 1234 * 5678?")
     print(result.output)
     print(result.context.current_step)
 
+
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main())
@@ -0,0 +1,314 @@
+## Orchestration
+##
+## A parent agent that fans work out to child agents exposed as tools.
+##
+##     orchestrator = Orchestrator(Budget(max_tokens=200_000, max_steps=40, max_seconds=120))
+##     researcher = orchestrator.agent_tool(
+##         Agent(name="researcher", model=llm, tools=[...], instructions="..."),
+##         description="Research one sub-question and report the answer.",
+##     )
+##     parent = Agent(
+##         name="lead",
+##         model=orchestrator.budgeted(llm),
+##         tools=[researcher],
+##         instructions="Split the question into sub-questions and delegate them.",
+##     )
+##     result = await orchestrator.run(parent, question)
+##
+
+import asyncio
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set
+from pydantic import BaseModel, Field, PrivateAttr
+
+from react_agents.models import (
+    AgentResult,
+    BaseLlm,
+    ExecutionContext,
+    LlmRequest,
+    LlmResponse,
+)
+from react_agents.tools import BaseTool
+
+from agents.agent_2 import Agent, BudgetExceeded
+
+# Seconds past the budget before an agent that has not wound down by itself
+# is cancelled; its own answer deadline falls exactly at the budget's end
+BACKSTOP_GRACE = 0.5
+
+
+def _backstop(remaining: Optional[float]) -> Optional[float]:
+    return None if remaining is None else remaining + BACKSTOP_GRACE
+
+
+@dataclass
+class Budget:
+    """Token, LLM-step and wall-time limits shared by a parent and its children.
+
+    `answer_reserve` is the fraction of the token and step limits kept back
+    for final answers: work stops at the reserve, and the agents' closing
+    answer calls may spend it. The clock starts when `Orchestrator.run` does.
+    """
+
+    max_tokens: Optional[int] = None
+    max_steps: Optional[int] = None
+    max_seconds: Optional[float] = None
+    answer_reserve: float = 0.1
+    tokens: int = 0
+    steps: int = 0
+    started_at: float = field(default_factory=time.monotonic)
+
+    def remaining_seconds(self) -> Optional[float]:
+        if self.max_seconds is None:
+            return None
+        return self.max_seconds - (time.monotonic() - self.started_at)
+
+    def exceeded(self, answering: bool = False) -> Optional[str]:
+        """Why the budget is spent, or None while there is some left.
+
+        Only a final answer (`answering`) may use the reserve.
+        """
+        share = 1.0 if answering else 1.0 - self.answer_reserve
+        if self.max_tokens is not None and self.tokens >= self.max_tokens * share:
+            return f"token budget of {self.max_tokens} spent"
+        if self.max_steps is not None and self.steps >= self.max_steps * share:
+            return f"step budget of {self.max_steps} spent"
+        remaining = self.remaining_seconds()
+        if remaining is not None and remaining <= 0:
+            return f"time budget of {self.max_seconds}s spent"
+        return None
+
+    def check(self):
+        reason = self.exceeded()
+        if reason:
+            raise BudgetExceeded(reason)
+
+
+@dataclass
+class ChildRun:
+    """One child agent run, kept by the orchestrator (not in the parent's context)."""
+
+    agent: str
+    task: str
+    context: ExecutionContext
+    tokens: int = 0
+    seconds: float = 0.0
+    status: str = "running"
+    error: Optional[str] = None
+
+
+# The child run whose LLM calls are being charged, set per child task
+_current_child: ContextVar[Optional[ChildRun]] = ContextVar(
+    "_current_child", default=None
+)
+
+
+class BudgetedLlm(BaseLlm):
+    """Charges every call to a shared Budget and refuses calls once it is spent."""
+
+    inner: BaseLlm
+    _budget: Budget = PrivateAttr()
+    _on_exceeded: Any = PrivateAttr(default=None)
+
+    def __init__(self, inner: BaseLlm, budget: Budget, on_exceeded=None, **kwargs):
+        super().__init__(model=inner.model, inner=inner, **kwargs)
+        self._budget = budget
+        self._on_exceeded = on_exceeded
+
+    async def generate(self, request: LlmRequest) -> LlmResponse:
+        answering = bool(request.metadata.get("final_answer"))
+        reason = self._budget.exceeded(answering=answering)
+        if reason:
+            if self._on_exceeded is not None and not answering:
+                self._on_exceeded(reason)
+            raise BudgetExceeded(reason)
+        self._budget.steps += 1
+        response = await self.inner.generate(request)
+        tokens = (response.usage_metadata or {}).get("total_tokens") or 0
+        self._budget.tokens += tokens
+        child = _current_child.get()
+        if child is not None:
+            child.tokens += tokens
+        return response
+
+
+class AgentToolInput(BaseModel):
+    task: str = Field(description="A self-contained task or question for the sub-agent")
+
+
+class AgentTool(BaseTool):
+    """Delegates a task to a child agent and returns only its final answer."""
+
+    def __init__(
+        self,
+        orchestrator: "Orchestrator",
+        agent: Agent,
+        name: str = None,
+        description: str = None,
+    ):
+        self.orchestrator = orchestrator
+        self.agent = agent
+        super().__init__(
+            name=name or agent.name,
+            description=description or f"Delegate a task to the {agent.name} agent.",
+            pydantic_input_model=AgentToolInput,
+        )
+
+    async def execute(self, context: ExecutionContext, task: str) -> Dict[str, Any]:
+        return await self.orchestrator.run_child(self.agent, context, task)
+
+
+class Orchestrator:
+    """Runs child agents under one shared Budget.
+
+    Each child gets its own ExecutionContext (linked to the parent's by
+    `parent_id`); only its final answer goes back to the parent as a tool
+    result, while the child's full run stays in `children`. When the budget
+    runs out every running child is cancelled, and `run` cancels whatever is
+    still running when the parent finishes.
+    """
+
+    def __init__(self, budget: Budget, max_concurrent_children: Optional[int] = None):
+        self.budget = budget
+        self.children: List[ChildRun] = []
+        self._tasks: Set[asyncio.Task] = set()
+        self._semaphore = (
+            asyncio.Semaphore(max_concurrent_children)
+            if max_concurrent_children
+            else None
+        )
+        self.stop_reason: Optional[str] = None
+
+    def budgeted(self, llm: BaseLlm) -> BudgetedLlm:
+        """Wrap a model so its calls count against the shared budget."""
+        return BudgetedLlm(llm, self.budget, on_exceeded=self.cancel_children)
+
+    def agent_tool(
+        self, agent: Agent, name: str = None, description: str = None
+    ) -> AgentTool:
+        """Expose `agent` as a tool; its model is charged to the shared budget."""
+        if not isinstance(agent.model, BudgetedLlm):
+            agent.model = self.budgeted(agent.model)
+        return AgentTool(self, agent, name=name, description=description)
+
+    def cancel_children(self, reason: str = "cancelled"):
+        if self.stop_reason is None:
+            self.stop_reason = reason
+        # A child that spent the budget is left to wind down with its reserve
+        current = asyncio.current_task()
+        for task in list(self._tasks):
+            if task is not current:
+                task.cancel()
+
+    async def run_child(
+        self, agent: Agent, parent: ExecutionContext, task: str
+    ) -> Dict[str, Any]:
+        self.budget.check()
+        child = ChildRun(
+            agent=agent.name,
+            task=task,
+            # Children must finish by the parent's deadline
+            context=ExecutionContext(
+                parent_id=parent.execution_id, deadline=parent.deadline
+            ),
+        )
+        self.children.append(child)
+        start = time.perf_counter()
+
+        async def run():
+            # Without a parent deadline the child still has to stop (and wind
+            # down) within the budget's time
+            if self._semaphore is None:
+                return await agent.run(
+                    task, child.context, timeout=self.budget.remaining_seconds()
+                )
+            async with self._semaphore:
+                return await agent.run(
+                    task, child.context, timeout=self.budget.remaining_seconds()
+                )
+
+        token = _current_child.set(child)
+        try:
+            child_task = asyncio.create_task(run())
+        finally:
+            _current_child.reset(token)
+        self._tasks.add(child_task)
+        try:
+            result: AgentResult = await asyncio.wait_for(
+                child_task, _backstop(self.budget.remaining_seconds())
+            )
+            # A child stopped by the deadline or budget still returns the
+            # answer it wound down to
+            stop_reason = child.context.state.get("stop_reason")
+            child.status = "stopped" if stop_reason else "success"
+            child.error = stop_reason
+            report = {
+                "agent": agent.name,
+                "output": result.output,
+                "steps": child.context.current_step,
+                "tokens": child.tokens,
+            }
+            if stop_reason:
+                report["stop_reason"] = stop_reason
+            return report
+        except asyncio.CancelledError:
+            # Our own cancellation (the parent was cancelled) must propagate;
+            # a child cancelled by the orchestrator is reported as an error
+            if asyncio.current_task().cancelling():
+                child.status = "cancelled"
+                raise
+            child.status, child.error = "cancelled", self.stop_reason or "cancelled"
+            raise RuntimeError(f"Sub-agent {agent.name} was cancelled: {child.error}")
+        except asyncio.TimeoutError:
+            child.status, child.error = "cancelled", "time budget spent"
+            self.cancel_children(child.error)
+            raise RuntimeError(f"Sub-agent {agent.name} stopped: {child.error}")
+        except BudgetExceeded as e:
+            child.status, child.error = "cancelled", str(e)
+            raise RuntimeError(f"Sub-agent {agent.name} stopped: {e}")
+        except Exception as e:
+            child.status, child.error = "error", str(e)
+            raise
+        finally:
+            child.seconds = time.perf_counter() - start
+            self._tasks.discard(child_task)
+
+    async def run(
+        self, agent: Agent, question: str, context: ExecutionContext = None
+    ) -> AgentResult:
+        """Run the parent agent within the budget, then cancel any leftover children."""
+        context = context or ExecutionContext()
+        self.budget.started_at = time.monotonic()
+        remaining = self.budget.remaining_seconds()
+        try:
+            # The parent winds down by itself at the deadline; wait_for is
+            # only the backstop
+            result = await asyncio.wait_for(
+                agent.run(question, context, timeout=remaining), _backstop(remaining)
+            )
+            self.stop_reason = self.stop_reason or context.state.get("stop_reason")
+            return result
+        except (BudgetExceeded, asyncio.TimeoutError) as e:
+            self.stop_reason = self.stop_reason or str(e) or "time budget spent"
+            context.state["stop_reason"] = self.stop_reason
+            return AgentResult(output=context.final_result, context=context)
+        finally:
+            if self._tasks:
+                self.cancel_children("parent finished")
+                await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """Budget use and how the children ended."""
+        statuses: Dict[str, int] = {}
+        for child in self.children:
+            statuses[child.status] = statuses.get(child.status, 0) + 1
+        return {
+            "tokens": self.budget.tokens,
+            "steps": self.budget.steps,
+            "seconds": round(time.monotonic() - self.budget.started_at, 3),
+            "children": len(self.children),
+            **{f"children_{status}": count for status, count in statuses.items()},
+            "stop_reason": self.stop_reason,
+        }
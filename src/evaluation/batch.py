@@ -0,0 +1,217 @@
+"""Offline evaluation through a provider batch endpoint.
+
+Batch jobs trade latency (results within hours) for lower prices and
+separate, much higher rate limits, which suits evaluations nobody waits on.
+
+`BatchSolver` is a `solve_fn` for `run_experiment`: every single-turn call
+made while the experiment runs is queued, and the queue goes out as one batch
+file per model. Give `run_experiment` enough concurrency to have every pair
+in flight at once, or the batches are only as large as the worker pool.
+
+`run_in_waves` runs multi-step agents in lockstep: step N of every problem is
+one batch, and step N + 1 is submitted when that batch returns.
+
+Try it offline against the local stand-in endpoint (run from `src`):
+
+    uv run python -m evaluation.batch --mode agent --mock 50 --local
+    uv run python -m evaluation.batch --mode solve --mock 50 --local \
+        --models mock-strong mock-weak
+"""
+
+import argparse
+import asyncio
+from typing import Type
+
+from pydantic import BaseModel
+
+from react_agents.models import LlmRequest
+from react_agents.models.batch import BatchBackend, BatchLlm
+from react_agents.types.contents import Message
+
+
+def json_schema_format(output_type: Type[BaseModel]) -> dict:
+    """A chat completions `response_format` for a pydantic model."""
+    schema = output_type.model_json_schema()
+    # Strict mode needs every property listed as required
+    schema["required"] = list(schema.get("properties", {}))
+    schema["additionalProperties"] = False
+    return {
+        "type": "json_schema",
+        "json_schema": {"name": output_type.__name__, "schema": schema, "strict": True},
+    }
+
+
+class BatchSolver:
+    """A `solve_fn(model, question)` that answers through batch jobs.
+
+    One BatchLlm is kept per model because a batch file may only target a
+    single model. `backend_factory()` builds the endpoint for each of them.
+    """
+
+    def __init__(
+        self,
+        instructions: str,
+        output_type: Type[BaseModel],
+        backend_factory=None,
+        **batch_options,
+    ):
+        self.instructions = instructions
+        self.output_type = output_type
+        self.backend_factory = backend_factory
+        self.batch_options = batch_options
+        self.llms: dict[str, BatchLlm] = {}
+
+    def llm(self, model: str) -> BatchLlm:
+        if model not in self.llms:
+            backend = self.backend_factory() if self.backend_factory else None
+            self.llms[model] = BatchLlm(
+                model=model,
+                backend=backend,
+                response_format=json_schema_format(self.output_type),
+                **self.batch_options,
+            )
+        return self.llms[model]
+
+    async def __call__(self, model: str, question: str) -> BaseModel:
+        response = await self.llm(model).generate(
+            LlmRequest(
+                instructions=[self.instructions],
+                contents=[Message(role="user", content=question)],
+            )
+        )
+        if response.error_message:
+            raise RuntimeError(response.error_message)
+        text = next(c.content for c in response.content if isinstance(c, Message))
+        return self.output_type.model_validate_json(text)
+
+    def batches(self) -> dict[str, list[dict]]:
+        return {model: llm.batches for model, llm in self.llms.items()}
+
+
+async def run_in_waves(make_agent, llm: BatchLlm, problems: list[dict]) -> list:
+    """Run one agent per problem, batching each step across all of them.
+
+    `make_agent(llm)` builds a fresh agent. Returns AgentResults in problem order.
+    """
+
+    async def run(problem: dict):
+        try:
+            return await make_agent(llm).run(problem["Question"])
+        finally:
+            llm.leave()
+
+    # Join everyone before the first run starts, or it would be a wave of one
+    llm.join(len(problems))
+    return await asyncio.gather(*(run(problem) for problem in problems))
+
+
+def _backend_factory(args):
+    if not args.local:
+        return None
+
+    from react_agents.models.batch import LocalBatchBackend
+    from react_agents.models.mock import MockLlm
+
+    from .mock import MockSolverLlm
+
+    def factory() -> BatchBackend:
+        # Single-turn solves get structured answers; agents get tool calls
+        responder = MockSolverLlm() if args.mode == "solve" else MockLlm()
+        return LocalBatchBackend(responder, turnaround=args.turnaround)
+
+    return factory
+
+
+def _load_problems(args) -> list[dict]:
+    if args.mock:
+        from .mock import mock_problems
+
+        return mock_problems(args.mock)
+
+    from .dataset import load_gaia
+
+    return load_gaia(levels=(1,)).filter(levels=[1]).head(args.limit).to_list()
+
+
+async def _run_solve(args, problems: list[dict]):
+    from agents.agent_1 import GAIA_SYSTEM_PROMPT, GaiaOutput
+
+    from .reporting import generate_accuracy_table
+    from .runner import run_experiment
+
+    solver = BatchSolver(
+        GAIA_SYSTEM_PROMPT,
+        GaiaOutput,
+        backend_factory=_backend_factory(args),
+        poll_interval=args.poll_interval,
+    )
+    results = await run_experiment(
+        problems,
+        args.models,
+        solver,
+        max_concurrency=len(problems) * len(args.models),
+    )
+    print(generate_accuracy_table(results))
+    for model, batches in solver.batches().items():
+        print(f"{model}: {batches}")
+
+
+async def _run_agents(args, problems: list[dict]):
+    from agents.agent_2 import Agent
+    from react_agents.tools import calculator
+
+    from .runner import _is_correct
+
+    def make_agent(llm):
+        return Agent(
+            name="batch",
+            model=llm,
+            tools=[calculator],
+            instructions="Answer with a number or as few words as possible.",
+            verbose=False,
+        )
+
+    factory = _backend_factory(args)
+    for model in args.models:
+        llm = BatchLlm(
+            model=model,
+            backend=factory() if factory else None,
+            poll_interval=args.poll_interval,
+        )
+        results = await run_in_waves(make_agent, llm, problems)
+        correct = sum(
+            _is_correct(None if r.output is None else str(r.output), p["Final answer"])
+            for r, p in zip(results, problems)
+        )
+        print(f"{model}: {correct}/{len(problems)} correct")
+        for batch in llm.batches:
+            print(f"  {batch}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run an evaluation through batch jobs")
+    parser.add_argument("--mode", choices=["agent", "solve"], default="solve")
+    parser.add_argument("--models", nargs="+", default=["gpt-5-mini"])
+    parser.add_argument("--mock", type=int, default=0, help="use N mock problems")
+    parser.add_argument("--limit", type=int, default=20, help="GAIA problems to use")
+    parser.add_argument(
+        "--local", action="store_true", help="answer with the local mock endpoint"
+    )
+    parser.add_argument(
+        "--turnaround", type=float, default=0.1, help="local batch duration"
+    )
+    parser.add_argument("--poll-interval", type=float, default=30.0)
+    args = parser.parse_args()
+
+    if args.local:
+        args.poll_interval = min(args.poll_interval, args.turnaround or 0.01)
+
+    problems = _load_problems(args)
+    if args.mode == "solve":
+        asyncio.run(_run_solve(args, problems))
+    else:
+        asyncio.run(_run_agents(args, problems))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,545 @@
+"""Latency, throughput and cost benchmarks for agents and solve functions.
+
+Each benchmarked run records its wall time and, per step, the time spent in
+the LLM and in tools plus the tokens used. Runs are repeated at several
+concurrency levels and summarised as latency percentiles, throughput and cost
+per correct answer. A summary can be saved as a JSON baseline and later runs
+compared against it, so regressions show up as a failing exit code.
+
+Offline, with the mock LLM (run from `src`):
+
+    uv run python -m evaluation.benchmark --mock 40 --concurrency 1 4 16 \
+        --baseline benchmarks/mock_agent.json --update-baseline
+
+Against recorded provider responses, record once and then replay:
+
+    uv run python -m evaluation.benchmark --limit 10 --model gpt-4o-mini --record rec.jsonl
+    uv run python -m evaluation.benchmark --limit 10 --model gpt-4o-mini --replay rec.jsonl
+
+Plan-and-execute against the ReAct loop on multi-part questions:
+
+    uv run python -m evaluation.benchmark --mock 40 --hops 4 --tool-latency 0.2 \
+        --planner both
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+import numpy as np
+
+from react_agents.models import BaseLlm, LlmRequest, LlmResponse
+from react_agents.models.execution_context import ExecutionContext
+from react_agents.tools import BaseTool
+
+from .pricing import cost_usd
+from .runner import _is_correct
+
+# Metrics where a higher value is a regression; everything else is the opposite
+_LOWER_IS_BETTER = (
+    "latency_p50",
+    "latency_p95",
+    "latency_p99",
+    "step_latency_p95",
+    "cost_per_correct",
+)
+_HIGHER_IS_BETTER = ("throughput_rps", "accuracy")
+
+
+@dataclass
+class StepMetrics:
+    started_at: float
+    wall_s: float = 0.0
+    llm_s: float = 0.0
+    # Wall-clock time with at least one tool running; parallel calls that
+    # overlap count once. `tool_sum_s` adds up every call's duration
+    tool_s: float = 0.0
+    tool_sum_s: float = 0.0
+    tool_spans: list[tuple[float, float]] = field(default_factory=list)
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+
+    def add_tool_call(self, start: float, end: float):
+        self.tool_spans.append((start, end))
+        self.tool_sum_s += end - start
+        self.tool_s = _covered(self.tool_spans)
+
+
+def _covered(spans: list[tuple[float, float]]) -> float:
+    """Total length of the union of time spans."""
+    total, reached = 0.0, float("-inf")
+    for start, end in sorted(spans):
+        if end > reached:
+            total += end - max(start, reached)
+            reached = end
+    return total
+
+
+@dataclass
+class RunMetrics:
+    task_id: str
+    model: str
+    wall_s: float = 0.0
+    correct: bool = False
+    error: str | None = None
+    steps: list[StepMetrics] = field(default_factory=list)
+
+    @property
+    def llm_s(self) -> float:
+        return sum(s.llm_s for s in self.steps)
+
+    @property
+    def tool_s(self) -> float:
+        return sum(s.tool_s for s in self.steps)
+
+    @property
+    def tool_sum_s(self) -> float:
+        return sum(s.tool_sum_s for s in self.steps)
+
+    @property
+    def prompt_tokens(self) -> int:
+        return sum(s.prompt_tokens for s in self.steps)
+
+    @property
+    def completion_tokens(self) -> int:
+        return sum(s.completion_tokens for s in self.steps)
+
+
+_current_run: ContextVar[RunMetrics | None] = ContextVar("_current_run", default=None)
+
+
+class TimedLlm(BaseLlm):
+    """Wraps an LLM and records each call as a new step of the current run."""
+
+    inner: BaseLlm
+
+    def __init__(self, inner: BaseLlm, **kwargs):
+        super().__init__(model=inner.model, inner=inner, **kwargs)
+
+    async def generate(self, request: LlmRequest) -> LlmResponse:
+        run = _current_run.get()
+        start = time.perf_counter()
+        response = await self.inner.generate(request)
+        if run is not None:
+            usage = response.usage_metadata
+            run.steps.append(
+                StepMetrics(
+                    started_at=start,
+                    llm_s=time.perf_counter() - start,
+                    prompt_tokens=usage.get("prompt_tokens") or 0,
+                    completion_tokens=usage.get("completion_tokens") or 0,
+                )
+            )
+        return response
+
+
+class TimedTool(BaseTool):
+    """Wraps a tool and adds its execution time to the current step."""
+
+    def __init__(self, inner: BaseTool):
+        self.inner = inner
+        super().__init__(
+            name=inner.name,
+            description=inner.description,
+            tool_definition=inner.tool_definition,
+            output_type=inner.output_type,
+            max_output_bytes=inner.max_output_bytes,
+            cache_policy=inner.cache_policy,
+            cache_ttl=inner.cache_ttl,
+            timeout=inner.timeout,
+            cache_version=inner.cache_version,
+        )
+
+    async def execute(self, context: ExecutionContext, **kwargs) -> Any:
+        start = time.perf_counter()
+        try:
+            return await self.inner.execute(context, **kwargs)
+        finally:
+            run = _current_run.get()
+            if run is not None and run.steps:
+                run.steps[-1].add_tool_call(start, time.perf_counter())
+
+
+class DelayedTool(BaseTool):
+    """Adds a fixed delay to a tool, standing in for a network lookup."""
+
+    def __init__(self, inner: BaseTool, delay: float):
+        self.inner = inner
+        self.delay = delay
+        super().__init__(
+            name=inner.name,
+            description=inner.description,
+            tool_definition=inner.tool_definition,
+            output_type=inner.output_type,
+            max_output_bytes=inner.max_output_bytes,
+            cache_policy=inner.cache_policy,
+            cache_ttl=inner.cache_ttl,
+            timeout=inner.timeout,
+            cache_version=inner.cache_version,
+        )
+
+    async def execute(self, context: ExecutionContext, **kwargs) -> Any:
+        await asyncio.sleep(self.delay)
+        return await self.inner.execute(context, **kwargs)
+
+
+def agent_runner(make_agent, llm: BaseLlm, tools: list[BaseTool]):
+    """Benchmark an Agent. `make_agent(model, tools)` builds a fresh agent."""
+    timed_llm = TimedLlm(llm)
+    timed_tools = [TimedTool(tool) for tool in tools]
+
+    async def run(problem: dict) -> str | None:
+        agent = make_agent(timed_llm, timed_tools)
+        result = await agent.run(problem["Question"])
+        return None if result.output is None else str(result.output)
+
+    return run
+
+
+def solve_runner(solve_fn, model: str):
+    """Benchmark a one-shot `solve_fn(model, question)` such as `solve_problem`.
+
+    The whole call counts as one LLM step; tokens are only known if the call
+    goes through a TimedLlm.
+    """
+
+    async def run(problem: dict) -> str | None:
+        run_metrics = _current_run.get()
+        start = time.perf_counter()
+        output = await solve_fn(model, problem["Question"])
+        if run_metrics is not None and not run_metrics.steps:
+            run_metrics.steps.append(
+                StepMetrics(started_at=start, llm_s=time.perf_counter() - start)
+            )
+        return output.final_answer
+
+    return run
+
+
+async def _timed_run(problem: dict, model: str, run_fn) -> RunMetrics:
+    metrics = RunMetrics(task_id=problem["task_id"], model=model)
+    token = _current_run.set(metrics)
+    start = time.perf_counter()
+    try:
+        answer = await run_fn(problem)
+        metrics.correct = _is_correct(answer, problem["Final answer"])
+    except Exception as e:
+        metrics.error = str(e)
+    finally:
+        end = time.perf_counter()
+        _current_run.reset(token)
+    metrics.wall_s = end - start
+    # A step lasts until the next LLM call starts, or the run ends
+    for step, following in zip(metrics.steps, metrics.steps[1:] + [None]):
+        step.wall_s = (following.started_at if following else end) - step.started_at
+    return metrics
+
+
+async def run_benchmark(
+    problems: list[dict], model: str, run_fn, concurrency: int
+) -> tuple[list[RunMetrics], float]:
+    """Run every problem once with at most `concurrency` runs in flight."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded(problem):
+        async with semaphore:
+            return await _timed_run(problem, model, run_fn)
+
+    start = time.perf_counter()
+    runs = await asyncio.gather(*(bounded(p) for p in problems))
+    return runs, time.perf_counter() - start
+
+
+def _percentiles(values: list[float], prefix: str) -> dict[str, float]:
+    if not values:
+        return {f"{prefix}_p{q}": 0.0 for q in (50, 95, 99)}
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {f"{prefix}_p50": p50, f"{prefix}_p95": p95, f"{prefix}_p99": p99}
+
+
+def summarize(runs: list[RunMetrics], total_wall_s: float, concurrency: int) -> dict:
+    """Aggregate run metrics into one machine-readable summary."""
+    llm_s = sum(r.llm_s for r in runs)
+    tool_s = sum(r.tool_s for r in runs)
+    tool_sum_s = sum(r.tool_sum_s for r in runs)
+    prompt_tokens = sum(r.prompt_tokens for r in runs)
+    completion_tokens = sum(r.completion_tokens for r in runs)
+    correct = sum(r.correct for r in runs)
+    cost = cost_usd(runs[0].model, prompt_tokens, completion_tokens) if runs else None
+
+    summary = {
+        "runs": len(runs),
+        "concurrency": concurrency,
+        "errors": sum(1 for r in runs if r.error),
+        "accuracy": correct / len(runs) if runs else 0.0,
+        "total_wall_s": total_wall_s,
+        "throughput_rps": len(runs) / total_wall_s if total_wall_s else 0.0,
+        **_percentiles([r.wall_s for r in runs], "latency"),
+        **_percentiles([s.wall_s for r in runs for s in r.steps], "step_latency"),
+        "mean_steps": float(np.mean([len(r.steps) for r in runs])) if runs else 0.0,
+        "llm_s": llm_s,
+        "tool_s": tool_s,
+        "tool_sum_s": tool_sum_s,
+        "llm_share": llm_s / (llm_s + tool_s) if llm_s + tool_s else 0.0,
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "completion_tokens_per_s": completion_tokens / llm_s if llm_s else 0.0,
+        "cost_usd": cost,
+        "cost_per_correct": cost / correct if cost is not None and correct else None,
+    }
+    return {
+        k: float(v) if isinstance(v, np.floating) else v for k, v in summary.items()
+    }
+
+
+async def concurrency_sweep(
+    problems: list[dict], model: str, run_fn, levels: list[int]
+) -> dict:
+    """Benchmark the same problems at each concurrency level."""
+    report = {"model": model, "tasks": len(problems), "levels": {}}
+    for level in levels:
+        runs, wall = await run_benchmark(problems, model, run_fn, level)
+        report["levels"][str(level)] = {
+            "summary": summarize(runs, wall, level),
+            "runs": [
+                {
+                    **asdict(r),
+                    "llm_s": r.llm_s,
+                    "tool_s": r.tool_s,
+                    "tool_sum_s": r.tool_sum_s,
+                }
+                for r in runs
+            ],
+        }
+    return report
+
+
+def save_baseline(report: dict, path: str):
+    """Save the summaries (not the per-run detail) of a sweep as a baseline."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    baseline = {
+        "model": report["model"],
+        "tasks": report["tasks"],
+        "levels": {k: v["summary"] for k, v in report["levels"].items()},
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(baseline, f, indent=2)
+
+
+def compare_to_baseline(
+    report: dict, baseline: dict, tolerance: float = 0.2
+) -> list[str]:
+    """List metrics that got worse than the baseline by more than `tolerance`."""
+    regressions = []
+    for level, base in baseline["levels"].items():
+        current = report["levels"].get(level, {}).get("summary")
+        if current is None:
+            continue
+        for metric in _LOWER_IS_BETTER + _HIGHER_IS_BETTER:
+            old, new = base.get(metric), current.get(metric)
+            if old is None or new is None or old == 0:
+                continue
+            change = (new - old) / abs(old)
+            if metric in _HIGHER_IS_BETTER:
+                change = -change
+            if change > tolerance:
+                regressions.append(
+                    f"concurrency {level}: {metric} {old:.4g} -> {new:.4g} "
+                    f"({change:+.0%} worse)"
+                )
+    return regressions
+
+
+def _print_report(report: dict):
+    columns = (
+        "runs",
+        "accuracy",
+        "throughput_rps",
+        "latency_p50",
+        "latency_p95",
+        "latency_p99",
+        "llm_share",
+        "completion_tokens_per_s",
+        "cost_per_correct",
+    )
+    print(f"\n{report['model']} on {report['tasks']} tasks")
+    print("concurrency  " + "  ".join(f"{c:>14}" for c in columns))
+    for level, data in report["levels"].items():
+        summary = data["summary"]
+        cells = [
+            f"{summary[c]:>14.4g}" if summary[c] is not None else f"{'-':>14}"
+            for c in columns
+        ]
+        print(f"{level:>11}  " + "  ".join(cells))
+
+
+def _print_planner_comparison(react: dict, plan: dict):
+    """LLM calls and latency of the ReAct loop against plan-and-execute."""
+    columns = ("mean_steps", "latency_p50", "latency_p95", "throughput_rps")
+    print("\nplan-and-execute vs ReAct")
+    print("concurrency  " + "  ".join(f"{c:>24}" for c in columns))
+    for level, data in react["levels"].items():
+        before = data["summary"]
+        after = plan["levels"][level]["summary"]
+        cells = []
+        for c in columns:
+            change = (after[c] - before[c]) / before[c] if before[c] else 0.0
+            cells.append(f"{before[c]:>8.3g} -> {after[c]:<8.3g}{change:>+6.0%}")
+        print(f"{level:>11}  " + "  ".join(cells))
+
+
+def _load_problems(args) -> list[dict]:
+    if args.mock:
+        from .mock import mock_problems
+
+        return mock_problems(args.mock, hops=args.hops)
+
+    from .dataset import load_gaia
+
+    dataset = load_gaia(levels=tuple(args.levels)).filter(levels=args.levels)
+    return dataset.head(args.limit).to_list()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark an agent or solve function")
+    parser.add_argument("--mode", choices=["agent", "solve"], default="agent")
+    parser.add_argument("--model", default="gpt-4o-mini")
+    parser.add_argument(
+        "--mock", type=int, default=0, help="use N mock problems and the mock LLM"
+    )
+    parser.add_argument("--limit", type=int, default=20, help="GAIA problems to use")
+    parser.add_argument(
+        "--levels", type=int, nargs="+", default=[1], help="GAIA levels to use"
+    )
+    parser.add_argument(
+        "--hops", type=int, default=1, help="independent parts per mock problem"
+    )
+    parser.add_argument(
+        "--planner",
+        choices=["off", "on", "both"],
+        default="off",
+        help="plan-and-execute agent mode; 'both' compares it with the ReAct loop",
+    )
+    parser.add_argument(
+        "--tool-latency", type=float, default=0.0, help="seconds added per tool call"
+    )
+    parser.add_argument("--record", help="record provider responses to this JSONL file")
+    parser.add_argument(
+        "--replay", help="replay provider responses from this JSONL file"
+    )
+    parser.add_argument(
+        "--race", nargs="+", default=[], help="race --model against these models"
+    )
+    parser.add_argument(
+        "--stagger", type=float, default=0.0, help="seconds between racer starts"
+    )
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--baseline", help="baseline JSON to compare against")
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument(
+        "--output", help="write the full report, including per-run detail"
+    )
+    args = parser.parse_args()
+    if args.planner != "off" and args.mode != "agent":
+        parser.error("--planner needs --mode agent")
+    if args.planner == "both" and args.baseline:
+        parser.error("--baseline compares one configuration; use --planner on or off")
+
+    problems = _load_problems(args)
+    plan_run_fn = None
+
+    if args.mode == "solve":
+        if args.mock:
+            from .mock import mock_solve as solve_fn
+        else:
+            from agents.agent_1 import solve_problem as solve_fn
+        model = args.model
+        run_fn = solve_runner(solve_fn, model)
+    else:
+        from agents.agent_2 import Agent
+        from react_agents.tools import calculator
+
+        if args.mock:
+            from react_agents.models.mock import MockLlm
+
+            llm = MockLlm(latency=0.01)
+        elif args.replay:
+            from react_agents.models.replay import ReplayLlm
+
+            llm = ReplayLlm(args.replay, model=args.model)
+        else:
+            from react_agents.models.litellm import LiteLlm
+
+            llm = LiteLlm(model=args.model)
+            if args.race:
+                from react_agents.models.race import RaceLlm
+
+                racers = [llm] + [LiteLlm(model=m) for m in args.race]
+                llm = RaceLlm(racers, max_racers=len(racers), stagger=args.stagger)
+            if args.record:
+                from react_agents.models.replay import RecordingLlm
+
+                llm = RecordingLlm(llm, args.record)
+
+        def agent_factory(planner: bool):
+            def make_agent(model, tools):
+                return Agent(
+                    name="benchmark",
+                    model=model,
+                    tools=tools,
+                    instructions="Answer with a number or as few words as possible.",
+                    verbose=False,
+                    planner=planner,
+                )
+
+            return make_agent
+
+        tools = [calculator]
+        if args.tool_latency:
+            tools = [DelayedTool(tool, args.tool_latency) for tool in tools]
+        model = llm.model
+        run_fn = agent_runner(agent_factory(args.planner == "on"), llm, tools)
+        if args.planner == "both":
+            plan_run_fn = agent_runner(agent_factory(True), llm, tools)
+
+    report = asyncio.run(concurrency_sweep(problems, model, run_fn, args.concurrency))
+    _print_report(report)
+    output = report
+    if plan_run_fn is not None:
+        plan_report = asyncio.run(
+            concurrency_sweep(problems, model, plan_run_fn, args.concurrency)
+        )
+        _print_report(plan_report)
+        _print_planner_comparison(report, plan_report)
+        output = {"react": report, "plan": plan_report}
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(output, f, indent=2)
+
+    if args.baseline:
+        if args.update_baseline or not os.path.exists(args.baseline):
+            save_baseline(report, args.baseline)
+            print(f"\nBaseline written to {args.baseline}")
+        else:
+            with open(args.baseline, encoding="utf-8") as f:
+                regressions = compare_to_baseline(report, json.load(f), args.tolerance)
+            if regressions:
+                print("\nRegressions against baseline:")
+                for line in regressions:
+                    print(f"  {line}")
+                sys.exit(1)
+            print("\nNo regressions against baseline.")
+
+
+if __name__ == "__main__":
+    main()
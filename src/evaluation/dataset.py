@@ -0,0 +1,243 @@
+"""Local, memory-mapped cache of the GAIA dataset.
+
+`snapshot_gaia` pulls the GAIA levels from the Hugging Face hub once and
+writes them to a single uncompressed Arrow IPC file. `GaiaDataset` then opens
+that file through a memory map, so loading is offline and near-instant, and
+filters on level, attachments and annotator tools are evaluated by Arrow
+before any rows are turned into Python dicts.
+
+    dataset = load_gaia(levels=(1,)).filter(levels=[1], has_attachment=False)
+    subset = dataset.head(20)
+    shard = dataset.shard(num_shards=4, index=0)
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+from typing import Iterator
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+GAIA_REPO = "gaia-benchmark/GAIA"
+GAIA_CONFIGS = {1: "2023_level1", 2: "2023_level2", 3: "2023_level3"}
+DEFAULT_CACHE_DIR = os.getenv(
+    "GAIA_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "rob-agent", "gaia"),
+)
+
+
+def _normalize_tools(metadata: dict | None) -> str:
+    """Turn annotator tools ("1. Web browser\\n2. Calculator") into "|web browser|calculator|"."""
+    tools = (metadata or {}).get("Tools", "") or ""
+    names = [
+        re.sub(r"^\s*\d+[.)]\s*", "", line).strip().lower()
+        for line in tools.splitlines()
+    ]
+    return "|" + "|".join(n for n in names if n) + "|"
+
+
+def _snapshot_path(cache_dir: str, split: str) -> str:
+    return os.path.join(cache_dir, f"{split}.arrow")
+
+
+def write_snapshot(
+    rows: list[dict],
+    cache_dir: str,
+    split: str,
+    levels: tuple[int, ...] | None = None,
+) -> str:
+    """Write GAIA rows, with derived filter columns, to the Arrow cache.
+
+    `levels` (the levels the rows were drawn from, by default those present)
+    is stored in the file's schema metadata so a partial snapshot is never
+    mistaken for the full dataset.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    records = []
+    for row in rows:
+        metadata = row.get("Annotator Metadata")
+        records.append(
+            {
+                "task_id": row["task_id"],
+                "Question": row["Question"],
+                "Level": str(row["Level"]),
+                "Final answer": row.get("Final answer", ""),
+                "file_name": row.get("file_name", "") or "",
+                "file_path": row.get("file_path", "") or "",
+                "Annotator Metadata": json.dumps(metadata or {}),
+                "level": int(row["Level"]),
+                "has_attachment": bool(row.get("file_name")),
+                "tools": _normalize_tools(metadata),
+            }
+        )
+
+    if levels is None:
+        levels = {record["level"] for record in records}
+    table = pa.Table.from_pylist(records).replace_schema_metadata(
+        {"levels": ",".join(str(level) for level in sorted(levels))}
+    )
+    path = _snapshot_path(cache_dir, split)
+    tmp = f"{path}.tmp"
+    with pa.OSFile(tmp, "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp, path)
+    return path
+
+
+def snapshot_gaia(
+    cache_dir: str = DEFAULT_CACHE_DIR,
+    split: str = "validation",
+    levels: tuple[int, ...] = (1, 2, 3),
+) -> str:
+    """Download GAIA levels from the hub and write them to the local cache."""
+    from datasets import load_dataset
+
+    rows = []
+    for level in levels:
+        dataset = load_dataset(GAIA_REPO, GAIA_CONFIGS[level], split=split)
+        rows.extend(dict(row) for row in dataset)
+    return write_snapshot(rows, cache_dir, split, tuple(levels))
+
+
+def snapshot_levels(
+    cache_dir: str = DEFAULT_CACHE_DIR, split: str = "validation"
+) -> set[int]:
+    """Levels held by the cached snapshot (empty if missing or unlabeled)."""
+    try:
+        with pa.memory_map(_snapshot_path(cache_dir, split)) as source:
+            metadata = pa.ipc.open_file(source).schema.metadata or {}
+    except FileNotFoundError:
+        return set()
+    return {int(level) for level in metadata.get(b"levels", b"").split(b",") if level}
+
+
+class GaiaDataset:
+    """A view over the cached GAIA snapshot.
+
+    Filtering and sharding return new views; rows are only converted to dicts
+    when iterated. Rows have the same keys as the hub dataset (with
+    "Annotator Metadata" decoded) plus `level`, `has_attachment` and `tools`.
+    """
+
+    def __init__(self, table: pa.Table, cache_dir: str, split: str):
+        self._table = table
+        metadata = table.schema.metadata or {}
+        # Levels the snapshot was taken with; filters do not change this
+        self.levels = {
+            int(level) for level in metadata.get(b"levels", b"").split(b",") if level
+        }
+        self.cache_dir = cache_dir
+        self.split = split
+
+    @classmethod
+    def open(cls, cache_dir: str = DEFAULT_CACHE_DIR, split: str = "validation"):
+        source = pa.memory_map(_snapshot_path(cache_dir, split))
+        table = pa.ipc.open_file(source).read_all()
+        return cls(table, cache_dir, split)
+
+    def filter(
+        self,
+        levels: list[int] | None = None,
+        has_attachment: bool | None = None,
+        tools: list[str] | None = None,
+        task_ids: list[str] | None = None,
+    ) -> "GaiaDataset":
+        """Keep rows matching every given predicate.
+
+        `tools` keeps rows whose annotators used any of the named tools
+        (case-insensitive, e.g. ["calculator", "web browser"]).
+        """
+        condition = None
+
+        def both(a, b):
+            return b if a is None else a & b
+
+        if levels is not None:
+            condition = both(condition, ds.field("level").isin(levels))
+        if has_attachment is not None:
+            condition = both(condition, ds.field("has_attachment") == has_attachment)
+        if task_ids is not None:
+            condition = both(condition, ds.field("task_id").isin(task_ids))
+        if tools:
+            any_tool = None
+            for tool in tools:
+                match = pc.match_substring(ds.field("tools"), f"|{tool.lower()}|")
+                any_tool = match if any_tool is None else any_tool | match
+            condition = both(condition, any_tool)
+
+        if condition is None:
+            return self
+        table = ds.dataset(self._table).to_table(filter=condition)
+        return GaiaDataset(table, self.cache_dir, self.split)
+
+    def head(self, n: int) -> "GaiaDataset":
+        return GaiaDataset(self._table.slice(0, n), self.cache_dir, self.split)
+
+    def shard(self, num_shards: int, index: int) -> "GaiaDataset":
+        """Deterministic shard by task id hash, stable across filters and hosts."""
+        mask = [
+            int(hashlib.sha1(task_id.encode()).hexdigest(), 16) % num_shards == index
+            for task_id in self._table.column("task_id").to_pylist()
+        ]
+        return GaiaDataset(
+            self._table.filter(pa.array(mask, type=pa.bool_())),
+            self.cache_dir,
+            self.split,
+        )
+
+    def __len__(self) -> int:
+        return self._table.num_rows
+
+    def __iter__(self) -> Iterator[dict]:
+        for batch in self._table.to_batches():
+            for row in batch.to_pylist():
+                row["Annotator Metadata"] = json.loads(row["Annotator Metadata"])
+                yield row
+
+    def to_list(self) -> list[dict]:
+        return list(self)
+
+    def attachment_path(self, problem: dict) -> str | None:
+        """Local path to a problem's attachment, fetched on first use."""
+        file_name = problem.get("file_name")
+        if not file_name:
+            return None
+
+        if problem.get("file_path") and os.path.exists(problem["file_path"]):
+            return problem["file_path"]
+
+        local = os.path.join(self.cache_dir, "files", self.split, file_name)
+        if os.path.exists(local):
+            return local
+
+        from huggingface_hub import hf_hub_download
+
+        downloaded = hf_hub_download(
+            GAIA_REPO,
+            f"2023/{self.split}/{file_name}",
+            repo_type="dataset",
+        )
+        os.makedirs(os.path.dirname(local), exist_ok=True)
+        shutil.copyfile(downloaded, local)
+        return local
+
+
+def load_gaia(
+    cache_dir: str = DEFAULT_CACHE_DIR,
+    split: str = "validation",
+    levels: tuple[int, ...] = (1, 2, 3),
+) -> GaiaDataset:
+    """Open the cached snapshot, creating it from the hub on first use.
+
+    A snapshot that lacks any of `levels` (e.g. one made with `levels=(1,)`)
+    is taken again with the union of both, rather than served as complete.
+    """
+    held = snapshot_levels(cache_dir, split)
+    if not set(levels) <= held:
+        snapshot_gaia(cache_dir, split, tuple(sorted(held | set(levels))))
+    return GaiaDataset.open(cache_dir, split)
@@ -0,0 +1,137 @@
+"""Throughput and memory benchmark for the RAG ingestion pipeline.
+
+Ingests a corpus three times into a fresh index: cold, again unchanged
+(everything should be skipped), and after editing a share of the documents
+(only their changed chunks should be embedded). Each phase reports chunks/s,
+embedded chunks/s and peak resident memory.
+
+With a generated corpus and the offline embedder (run from `src`):
+
+    uv run python -m evaluation.ingest_benchmark --docs 500 --workers 4
+
+Or point it at real documents with `--corpus path/to/docs`.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import shutil
+import tempfile
+
+from react_agents.models.embeddings import HashingEmbedder, LiteLlmEmbedder
+from react_agents.rag import KnowledgeBase
+
+_WORDS = (
+    "agent tool model answer question search index memory chunk vector "
+    "latency batch cache level file table page token result step plan"
+).split()
+
+
+def _paragraph(rng: random.Random) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(rng.randint(40, 120))) + "."
+
+
+def generate_corpus(directory: str, docs: int, paragraphs: int, seed: int = 0):
+    """Write `docs` markdown files of random paragraphs."""
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+    for i in range(docs):
+        with open(
+            os.path.join(directory, f"doc-{i:06d}.md"), "w", encoding="utf-8"
+        ) as f:
+            f.write("\n\n".join(_paragraph(rng) for _ in range(paragraphs)))
+
+
+def modify_corpus(directory: str, share: float, seed: int = 1) -> int:
+    """Rewrite one paragraph in a share of the files. Returns files changed."""
+    rng = random.Random(seed)
+    paths = sorted(os.listdir(directory))
+    changed = rng.sample(paths, max(1, int(len(paths) * share)))
+    for name in changed:
+        path = os.path.join(directory, name)
+        with open(path, encoding="utf-8") as f:
+            paragraphs = f.read().split("\n\n")
+        paragraphs[rng.randrange(len(paragraphs))] = _paragraph(rng)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n\n".join(paragraphs))
+    return len(changed)
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def run_phases(kb: KnowledgeBase, corpus: str, args, modify: bool) -> list[dict]:
+    phases = []
+    names = ["cold", "unchanged"] + (["modified"] if modify else [])
+    for name in names:
+        if name == "modified":
+            modify_corpus(corpus, args.modify)
+        report = await kb.ingest(
+            corpus, workers=args.workers, batch_size=args.batch_size
+        )
+        phases.append(
+            {
+                "phase": name,
+                "documents": report.documents,
+                "chunks": report.chunks,
+                "embedded": report.embedded,
+                "skipped": report.skipped,
+                "moved": report.moved,
+                "deleted": report.deleted,
+                "seconds": round(report.seconds, 3),
+                "chunks_per_s": round(report.chunks_per_s, 1),
+                "embedded_per_s": round(report.embedded_per_s, 1),
+                "peak_rss_mb": round(_peak_rss_mb(), 1),
+            }
+        )
+    return phases
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark RAG ingestion")
+    parser.add_argument("--corpus", help="directory of documents (default: generated)")
+    parser.add_argument("--docs", type=int, default=200)
+    parser.add_argument("--paragraphs", type=int, default=20)
+    parser.add_argument(
+        "--modify", type=float, default=0.05, help="share of docs to edit"
+    )
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument(
+        "--embedder", default="hashing", help='"hashing" or a LiteLLM model'
+    )
+    parser.add_argument("--output", help="write the phase reports as JSON")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="ingest-bench-")
+    try:
+        corpus = args.corpus
+        if corpus is None:
+            corpus = os.path.join(workdir, "corpus")
+            generate_corpus(corpus, args.docs, args.paragraphs)
+
+        embedder = (
+            HashingEmbedder()
+            if args.embedder == "hashing"
+            else LiteLlmEmbedder(model=args.embedder)
+        )
+        kb = KnowledgeBase(embedder, path=os.path.join(workdir, "index"))
+        # Never edit a corpus we did not generate
+        phases = asyncio.run(run_phases(kb, corpus, args, modify=args.corpus is None))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    for phase in phases:
+        print(phase)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(phases, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
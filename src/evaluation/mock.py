@@ -0,0 +1,108 @@
+import asyncio
+import hashlib
+import random
+from pydantic import BaseModel
+
+from react_agents.models import BaseLlm, LlmRequest, LlmResponse
+from react_agents.types.contents import Message
+
+# Share of questions each mock model answers correctly
+MOCK_MODEL_ACCURACY = {
+    "mock-strong": 0.8,
+    "mock-weak": 0.4,
+}
+DEFAULT_MOCK_ACCURACY = 0.5
+
+
+class MockOutput(BaseModel):
+    """Same fields as the agents' GaiaOutput."""
+
+    is_solvable: bool
+    unsolvable_reason: str = ""
+    final_answer: str = ""
+
+
+def mock_problems(count: int, seed: int = 0, hops: int = 1) -> list[dict]:
+    """Generate GAIA-shaped arithmetic problems whose answer is in the question.
+
+    With `hops` > 1 each question sums that many independent products
+    ("What is the sum of 12 * 3, 45 * 6 and 7 * 8?"), so an agent needs
+    several tool calls that do not depend on each other.
+    """
+    rng = random.Random(seed)
+    problems = []
+    for i in range(count):
+        if hops > 1:
+            pairs = [(rng.randint(1, 99), rng.randint(1, 99)) for _ in range(hops)]
+            parts = [f"{a} * {b}" for a, b in pairs]
+            question = f"What is the sum of {', '.join(parts[:-1])} and {parts[-1]}?"
+            answer = sum(a * b for a, b in pairs)
+        else:
+            a, b = rng.randint(1, 999), rng.randint(1, 999)
+            question, answer = f"What is {a} + {b}?", a + b
+        problems.append(
+            {
+                "task_id": f"mock-{i:05d}",
+                "Question": question,
+                "Level": str(i % 3 + 1),
+                "Final answer": str(answer),
+                "file_name": "",
+            }
+        )
+    return problems
+
+
+def _roll(model: str, question: str) -> float:
+    """Deterministic pseudo-random number in [0, 1) for a model-question pair."""
+    digest = hashlib.sha256(f"{model}|{question}".encode()).digest()
+    return int.from_bytes(digest[:8], "big") / 2**64
+
+
+async def mock_solve(model: str, question: str, latency: float = 0.01) -> MockOutput:
+    """Solve a mock problem without calling an LLM.
+
+    Whether the answer is right is fixed per (model, question), so reruns and
+    sharded runs give identical results.
+    """
+    await asyncio.sleep(latency)
+    accuracy = MOCK_MODEL_ACCURACY.get(model, DEFAULT_MOCK_ACCURACY)
+    roll = _roll(model, question)
+    if roll >= (1 + accuracy) / 2:
+        return MockOutput(is_solvable=False, unsolvable_reason="Mock model gave up")
+
+    expression = question.removeprefix("What is ").removeprefix("the sum of ")
+    expression = expression.rstrip("?").replace(" and ", " + ").replace(", ", " + ")
+    correct = eval(expression, {"__builtins__": {}})
+    answer = correct if roll < accuracy else correct + 1
+    return MockOutput(is_solvable=True, final_answer=str(answer))
+
+
+class MockSolverLlm(BaseLlm):
+    """An LLM that answers single-turn mock problems with `mock_solve`.
+
+    Replies are MockOutput JSON, so they parse as the agents' GaiaOutput. The
+    model is taken from `request.metadata["model"]` when present (as the local
+    batch endpoint sets it), so each mock model keeps its own accuracy.
+    """
+
+    model: str = "mock"
+
+    async def generate(self, request: LlmRequest) -> LlmResponse:
+        question = next(
+            (
+                item.content
+                for item in reversed(request.contents)
+                if isinstance(item, Message) and item.role == "user"
+            ),
+            "",
+        )
+        model = request.metadata.get("model") or self.model
+        try:
+            output = await mock_solve(model, question, latency=0)
+        except Exception:
+            output = MockOutput(
+                is_solvable=False, unsolvable_reason="Not a mock problem"
+            )
+        return LlmResponse(
+            content=[Message(role="assistant", content=output.model_dump_json())]
+        )
@@ -0,0 +1,20 @@
+"""Token pricing shared by the benchmark and the reports."""
+
+
+def cost_usd(model: str, prompt_tokens: int, completion_tokens: int) -> float | None:
+    """Price the tokens with litellm's model price map, if it knows the model."""
+    if not prompt_tokens and not completion_tokens:
+        return None
+    try:
+        from litellm import cost_per_token, model_cost
+
+        if model not in model_cost and model.split("/")[-1] not in model_cost:
+            return None
+        prompt_cost, completion_cost = cost_per_token(
+            model=model,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+        )
+        return prompt_cost + completion_cost
+    except ImportError:
+        return None
@@ -1,61 +1,195 @@
 import pandas as pd
-from collections import Counter
-
-
-def generate_accuracy_table(data: dict[str, list]) -> pd.DataFrame:
-    table = []
-
-    for model, tasks in data.items():
-        total = len(tasks)
-        if total == 0:
-            judged_accuracy = "0/0 (0%)"
-            judged_solvable = "0/0 (0%)"
-        else:
-            correct_count = sum(1 for t in tasks if t.get("correct") == True)
-            solvable_count = sum(1 for t in tasks if t.get("is_solvable") == True)
-
-            judged_accuracy = (
-                f"{correct_count}/{total} ({correct_count / total * 100:.0f}%)"
-            )
-            judged_solvable = (
-                f"{solvable_count}/{total} ({solvable_count / total * 100:.0f}%)"
-            )
-
-        table.append(
-            {
-                "Model": model,
-                "Judged Accuracy": judged_accuracy,
-                "Judged Solvable": judged_solvable,
-            }
-        )
 
-    df = pd.DataFrame(table)
-    # Optional: sort by accuracy descending
-    df = df.sort_values("Judged Accuracy", ascending=False).reset_index(drop=True)
+from .pricing import cost_usd
+
+
+def results_to_frame(data: dict[str, list] | pd.DataFrame) -> pd.DataFrame:
+    """Flatten run_experiment's {model: [result, ...]} into one row per result."""
+    if isinstance(data, pd.DataFrame):
+        return data
+    rows = [{**task, "model": model} for model, tasks in data.items() for task in tasks]
+    df = pd.DataFrame(rows)
+    for column in ("model", "correct", "is_solvable", "unsolvable_reason"):
+        if column not in df:
+            df[column] = pd.Series(dtype=object)
+    # Keep models that have no results so they still get a row in the tables
+    df["model"] = pd.Categorical(df["model"], categories=list(data.keys()))
     return df
 
 
-def generate_unsolvable_summary(data: dict[str, list]) -> pd.DataFrame:
+def _format_ratio(count: pd.Series, total: pd.Series) -> pd.Series:
+    pct = (count / total.where(total > 0)).fillna(0) * 100
+    return (
+        count.astype(int).astype(str)
+        + "/"
+        + total.astype(int).astype(str)
+        + " ("
+        + pct.round().astype(int).astype(str)
+        + "%)"
+    )
+
+
+def accuracy_stats(data: dict[str, list] | pd.DataFrame) -> pd.DataFrame:
+    """Numeric per-model accuracy and solvability."""
+    df = results_to_frame(data)
+    stats = (
+        df.assign(
+            correct=df["correct"].eq(True),
+            is_solvable=df["is_solvable"].eq(True),
+        )
+        .groupby("model", observed=False)
+        .agg(
+            total=("correct", "size"),
+            correct=("correct", "sum"),
+            solvable=("is_solvable", "sum"),
+        )
+    )
+    total = stats["total"].where(stats["total"] > 0)
+    stats["accuracy"] = (stats["correct"] / total).fillna(0.0)
+    stats["solvable_rate"] = (stats["solvable"] / total).fillna(0.0)
+    return stats.reset_index()
+
+
+def generate_accuracy_table(data: dict[str, list] | pd.DataFrame) -> pd.DataFrame:
+    stats = accuracy_stats(data)
+    # Sort on the numeric accuracy, not the formatted "9/20 (45%)" string
+    stats = stats.sort_values(
+        ["accuracy", "correct"], ascending=False, kind="stable"
+    ).reset_index(drop=True)
+
+    return pd.DataFrame(
+        {
+            "Model": stats["model"].astype(str),
+            "Judged Accuracy": _format_ratio(stats["correct"], stats["total"]),
+            "Judged Solvable": _format_ratio(stats["solvable"], stats["total"]),
+        }
+    )
+
+
+def generate_unsolvable_summary(data: dict[str, list] | pd.DataFrame) -> pd.DataFrame:
     """
     Aggregates identical unsolvable_reason strings across all models
     and returns a count table.
     """
+    reasons = (
+        results_to_frame(data)["unsolvable_reason"].dropna().astype(str).str.strip()
+    )
+    # ignore empty strings
+    reasons = reasons[reasons != ""]
+
+    # Sort by most frequent
+    counts = reasons.value_counts(sort=True)
+
+    return pd.DataFrame(
+        {"Unsolvable Reason": counts.index, "Count": counts.to_numpy()}
+    ).reset_index(drop=True)
+
+
+def generate_run_summary(df: pd.DataFrame) -> pd.DataFrame:
+    """Accuracy, solvability, latency and cost per run and model.
+
+    `df` is a results frame as returned by `ResultStore.load`.
+    """
+    df = df.assign(
+        correct=df["correct"].eq(True),
+        is_solvable=df["is_solvable"].eq(True),
+    )
+    keys = [k for k in ("run_id", "prompt_version", "model") if k in df]
+    grouped = df.groupby(keys, observed=True, dropna=False)
+    summary = grouped.agg(
+        tasks=("correct", "size"),
+        correct=("correct", "sum"),
+        accuracy=("correct", "mean"),
+        solvable_rate=("is_solvable", "mean"),
+        latency_p50=("latency_s", "median"),
+        latency_mean=("latency_s", "mean"),
+    )
+    summary["latency_p95"] = grouped["latency_s"].quantile(0.95)
+    # Leave cost empty rather than 0 for runs that did not record it
+    summary["cost_usd"] = grouped["cost_usd"].sum(min_count=1)
+    summary["cost_per_correct"] = summary["cost_usd"] / summary["correct"].where(
+        summary["correct"] > 0
+    )
+    return (
+        summary.reset_index()
+        .sort_values(
+            keys[:-1] + ["accuracy"], ascending=[True] * (len(keys) - 1) + [False]
+        )
+        .reset_index(drop=True)
+    )
 
-    reasons = []
 
-    for model, tasks in data.items():
-        for task in tasks:
-            reason = task.get("unsolvable_reason", "")
-            if reason:  # ignore empty strings
-                reasons.append(reason.strip())
+def diff_runs(df: pd.DataFrame, base_run: str, new_run: str) -> pd.DataFrame:
+    """Per-model change in accuracy between two runs, with task-level flips.
 
-    # Count identical reasons
-    reason_counts = Counter(reasons)
+    Only tasks present in both runs are compared.
+    """
+    runs = df[df["run_id"].isin([base_run, new_run])]
+    correct = runs.pivot_table(
+        index=["model", "task_id"],
+        columns="run_id",
+        values="correct",
+        aggfunc="last",
+        observed=True,
+    ).dropna()
+    base = correct[base_run].astype(bool)
+    new = correct[new_run].astype(bool)
+    flips = pd.DataFrame(
+        {
+            "base_correct": base,
+            "new_correct": new,
+            "fixed": ~base & new,
+            "regressed": base & ~new,
+        }
+    )
+    diff = flips.groupby(level="model", observed=True).agg(
+        tasks=("base_correct", "size"),
+        base_accuracy=("base_correct", "mean"),
+        new_accuracy=("new_correct", "mean"),
+        fixed=("fixed", "sum"),
+        regressed=("regressed", "sum"),
+    )
+    diff["delta"] = diff["new_accuracy"] - diff["base_accuracy"]
+    return diff.reset_index().sort_values("delta").reset_index(drop=True)
 
-    # Convert to DataFrame
-    df = pd.DataFrame(reason_counts.items(), columns=["Unsolvable Reason", "Count"])
 
-    # Sort by most frequent
-    df = df.sort_values("Count", ascending=False).reset_index(drop=True)
+def generate_routing_summary(log_path: str) -> pd.DataFrame:
+    """Per-tier attempts, escalation rate, latency, cost and escalation signals.
 
-    return df
+    `log_path` is the JSONL decision log written by `CascadeLlm`. Signal
+    columns count how often each signal made a tier hand the request on.
+    """
+    decisions = pd.read_json(log_path, lines=True)
+    decisions["decision"] = range(len(decisions))
+    attempts = pd.json_normalize(
+        decisions.to_dict("records"), record_path="attempts", meta=["decision"]
+    )
+    for column in ("latency_s", "prompt_tokens", "completion_tokens"):
+        if column not in attempts:
+            attempts[column] = float("nan")
+    # The last attempt of every decision is the answer that was returned
+    attempts["answered"] = attempts.groupby("decision").cumcount(ascending=False).eq(0)
+    tokens = attempts[["model", "prompt_tokens", "completion_tokens"]].fillna(0)
+    attempts["cost_usd"] = pd.Series(
+        [cost_usd(m, int(p), int(c)) for m, p, c in tokens.itertuples(index=False)],
+        index=attempts.index,
+        dtype=float,
+    )
+
+    grouped = attempts.groupby("model", sort=False)
+    summary = grouped.agg(
+        attempts=("answered", "size"),
+        answered=("answered", "sum"),
+        latency_p50=("latency_s", "median"),
+        latency_mean=("latency_s", "mean"),
+    )
+    summary["escalation_rate"] = 1 - summary["answered"] / summary["attempts"]
+    summary["latency_p95"] = grouped["latency_s"].quantile(0.95)
+    summary["cost_usd"] = grouped["cost_usd"].sum(min_count=1)
+
+    escalated = attempts[~attempts["answered"]].explode("signals", ignore_index=True)
+    if not escalated.empty:
+        signals = pd.crosstab(escalated["model"], escalated["signals"])
+        summary = summary.join(signals).fillna({c: 0 for c in signals.columns})
+        summary = summary.astype({c: int for c in signals.columns})
+    return summary.reset_index()
@@ -1,4 +1,7 @@
-from tqdm.asyncio import tqdm_asyncio
+import asyncio
+import time
+from collections import deque
+from tqdm import tqdm
 
 
 def _is_correct(prediction: str | None, answer: str) -> bool:
@@ -7,8 +10,10 @@ def _is_correct(prediction: str | None, answer: str) -> bool:
         return False
     return prediction.strip().lower() == answer.strip().lower()
 
+
 async def _evaluate_gaia_single(problem: dict, model: str, solve_fn) -> dict:
     """Evaluate a single problem-model pair and return result."""
+    start = time.perf_counter()
     try:
         output = await solve_fn(model, problem["Question"])
         return {
@@ -19,6 +24,7 @@ async def _evaluate_gaia_single(problem: dict, model: str, solve_fn) -> dict:
             "prediction": output.final_answer,
             "answer": problem["Final answer"],
             "unsolvable_reason": output.unsolvable_reason,
+            "latency_s": time.perf_counter() - start,
         }
     except Exception as e:
         return {
@@ -29,24 +35,82 @@ async def _evaluate_gaia_single(problem: dict, model: str, solve_fn) -> dict:
             "prediction": None,
             "answer": problem["Final answer"],
             "error": str(e),
+            "latency_s": time.perf_counter() - start,
         }
 
 
 async def run_experiment(
-    problems: list[dict], models: list[str], solve_fn
+    problems: list[dict],
+    models: list[str],
+    solve_fn,
+    sink=None,
+    max_concurrency: int = 32,
+    model_concurrency: dict[str, int] | None = None,
+    progress: bool = True,
+    controller=None,
 ) -> dict[str, list]:
-    """Evaluate all models on all problems."""
-    tasks = [
-        _evaluate_gaia_single(problem, model, solve_fn)
-        for problem in problems
-        for model in models
-    ]
+    """Evaluate all models on all problems.
+
+    Each model has its own queue of pending problems, drained by as many
+    workers as `model_concurrency` allows it (default `max_concurrency`);
+    a worker then takes one of the `max_concurrency` shared slots for the
+    call. Because the model limit is applied before a slot is taken, a slow
+    model never holds slots that other models' work could use. When a
+    `sink` is given each result is written to it as soon as it completes,
+    and pairs the sink already holds are skipped, so an interrupted run can
+    be resumed. A `ConcurrencyController` can be passed as `controller` to
+    adapt per-provider and per-model concurrency to rate limits instead.
+    """
+    if controller is not None:
+        solve_fn = controller.wrap(solve_fn)
+
+    done = sink.completed() if sink is not None else set()
+    queues = {model: deque() for model in models}
+    for problem in problems:
+        for model in models:
+            if (problem["task_id"], model) not in done:
+                queues[model].append(problem)
+
+    slots = asyncio.Semaphore(max_concurrency)
+    new_results = []
+    progress_bar = tqdm(
+        total=sum(len(q) for q in queues.values()), disable=not progress
+    )
+
+    async def worker(model: str, queue: deque):
+        while queue:
+            problem = queue.popleft()
+            async with slots:
+                result = await _evaluate_gaia_single(problem, model, solve_fn)
+            if sink is not None:
+                sink.write(result)
+            new_results.append(result)
+            progress_bar.update(1)
+
+    workers = []
+    for model, queue in queues.items():
+        limit = (model_concurrency or {}).get(model, max_concurrency)
+        count = min(limit, max_concurrency, len(queue))
+        workers += [asyncio.create_task(worker(model, queue)) for _ in range(count)]
+    try:
+        await asyncio.gather(*workers)
+    finally:
+        for w in workers:
+            w.cancel()
+        progress_bar.close()
 
-    all_results = await tqdm_asyncio.gather(*tasks)
+    # Combine with results from earlier runs, keeping problem order
+    by_pair = {}
+    if sink is not None:
+        by_pair.update({(r["task_id"], r["model"]): r for r in sink.load()})
+    by_pair.update({(r["task_id"], r["model"]): r for r in new_results})
 
     # Group results by model
     results = {model: [] for model in models}
-    for result in all_results:
-        results[result["model"]].append(result)
+    for problem in problems:
+        for model in models:
+            result = by_pair.get((problem["task_id"], model))
+            if result is not None:
+                results[model].append(result)
 
     return results
@@ -0,0 +1,247 @@
+"""Adaptive evaluation that stops spending LLM calls once the numbers are settled.
+
+Problems are sampled in random batches (and, with `max_passes > 1`, re-sampled
+for further passes, since model answers vary between runs). After each batch
+every model gets a Wilson confidence interval on its accuracy and every pair of
+models gets a paired bootstrap interval on the difference. A model stops being
+evaluated once its interval is narrower than `target_width` or all of its
+comparisons are decided, i.e. the difference interval excludes zero.
+
+Checking after every batch is a form of repeated peeking, which makes a
+"decided" verdict somewhat more likely than the nominal confidence suggests.
+Use `min_samples` and a higher `confidence` when the decision matters.
+"""
+
+import argparse
+import asyncio
+import math
+import random
+from dataclasses import dataclass, field
+from itertools import combinations
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+from .runner import run_experiment
+
+
+def wilson_interval(
+    successes: int, n: int, confidence: float = 0.95
+) -> tuple[float, float]:
+    """Wilson score interval for a binomial proportion."""
+    if n == 0:
+        return 0.0, 1.0
+    z = NormalDist().inv_cdf(1 - (1 - confidence) / 2)
+    p = successes / n
+    denominator = 1 + z**2 / n
+    centre = (p + z**2 / (2 * n)) / denominator
+    margin = z * math.sqrt(p * (1 - p) / n + z**2 / (4 * n**2)) / denominator
+    return max(0.0, centre - margin), min(1.0, centre + margin)
+
+
+def bootstrap_interval(
+    values,
+    confidence: float = 0.95,
+    n_resamples: int = 2000,
+    seed: int = 0,
+) -> tuple[float, float]:
+    """Percentile bootstrap interval for the mean of `values`."""
+    values = np.asarray(values, dtype=float)
+    if len(values) == 0:
+        return -1.0, 1.0
+    rng = np.random.default_rng(seed)
+    idx = rng.integers(0, len(values), size=(n_resamples, len(values)))
+    means = values[idx].mean(axis=1)
+    alpha = (1 - confidence) / 2
+    low, high = np.quantile(means, [alpha, 1 - alpha])
+    return float(low), float(high)
+
+
+@dataclass
+class SequentialReport:
+    """Outcome of a sequential evaluation."""
+
+    results: dict[str, list]
+    models: pd.DataFrame
+    comparisons: pd.DataFrame
+    calls_made: int
+    exhaustive_calls: int
+
+    @property
+    def calls_saved(self) -> int:
+        return self.exhaustive_calls - self.calls_made
+
+    def summary(self) -> str:
+        saved_pct = self.calls_saved / self.exhaustive_calls * 100
+        return (
+            f"{self.calls_made} LLM calls made, {self.calls_saved} saved "
+            f"({saved_pct:.0f}%) compared with {self.exhaustive_calls} for an "
+            f"exhaustive run"
+        )
+
+
+@dataclass
+class _ModelState:
+    outcomes: dict[tuple[int, str], bool] = field(default_factory=dict)
+    active: bool = True
+
+    @property
+    def n(self) -> int:
+        return len(self.outcomes)
+
+    @property
+    def correct(self) -> int:
+        return sum(self.outcomes.values())
+
+
+def _paired_differences(a: _ModelState, b: _ModelState) -> list[int]:
+    shared = a.outcomes.keys() & b.outcomes.keys()
+    return [int(a.outcomes[k]) - int(b.outcomes[k]) for k in shared]
+
+
+async def run_sequential_experiment(
+    problems: list[dict],
+    models: list[str],
+    solve_fn,
+    target_width: float = 0.2,
+    confidence: float = 0.95,
+    batch_size: int = 5,
+    min_samples: int = 10,
+    max_passes: int = 1,
+    max_concurrency: int = 32,
+    seed: int = 0,
+) -> SequentialReport:
+    """Evaluate models on adaptively sampled problems until the results settle."""
+    rng = random.Random(seed)
+    states = {model: _ModelState() for model in models}
+    results = {model: [] for model in models}
+    calls_made = 0
+
+    def update_activity():
+        for model, state in states.items():
+            if not state.active or state.n < min_samples:
+                continue
+            low, high = wilson_interval(state.correct, state.n, confidence)
+            if high - low <= target_width:
+                state.active = False
+                continue
+            others = [o for o in models if o != model]
+            if others and all(
+                _is_decided(state, states[o], confidence, seed) for o in others
+            ):
+                state.active = False
+
+    for pass_index in range(max_passes):
+        order = list(problems)
+        rng.shuffle(order)
+        for start in range(0, len(order), batch_size):
+            active = [m for m in models if states[m].active]
+            if not active:
+                break
+            batch = order[start : start + batch_size]
+            batch_results = await run_experiment(
+                batch,
+                active,
+                solve_fn,
+                max_concurrency=max_concurrency,
+                progress=False,
+            )
+            for model, model_results in batch_results.items():
+                for result in model_results:
+                    key = (pass_index, result["task_id"])
+                    states[model].outcomes[key] = bool(result["correct"])
+                    results[model].append(result)
+                    calls_made += 1
+            update_activity()
+
+    return SequentialReport(
+        results=results,
+        models=_model_table(states, confidence),
+        comparisons=_comparison_table(states, models, confidence, seed),
+        calls_made=calls_made,
+        exhaustive_calls=len(problems) * len(models) * max_passes,
+    )
+
+
+def _is_decided(a: _ModelState, b: _ModelState, confidence: float, seed: int) -> bool:
+    low, high = bootstrap_interval(_paired_differences(a, b), confidence, seed=seed)
+    return low > 0 or high < 0
+
+
+def _model_table(states: dict[str, _ModelState], confidence: float) -> pd.DataFrame:
+    rows = []
+    for model, state in states.items():
+        low, high = wilson_interval(state.correct, state.n, confidence)
+        rows.append(
+            {
+                "Model": model,
+                "Samples": state.n,
+                "Correct": state.correct,
+                "Accuracy": state.correct / state.n if state.n else 0.0,
+                "CI Low": low,
+                "CI High": high,
+            }
+        )
+    df = pd.DataFrame(rows)
+    return df.sort_values("Accuracy", ascending=False).reset_index(drop=True)
+
+
+def _comparison_table(
+    states: dict[str, _ModelState], models: list[str], confidence: float, seed: int
+) -> pd.DataFrame:
+    rows = []
+    for a, b in combinations(models, 2):
+        diffs = _paired_differences(states[a], states[b])
+        low, high = bootstrap_interval(diffs, confidence, seed=seed)
+        rows.append(
+            {
+                "Model A": a,
+                "Model B": b,
+                "Paired Samples": len(diffs),
+                "Difference": float(np.mean(diffs)) if diffs else 0.0,
+                "CI Low": low,
+                "CI High": high,
+                "Decided": low > 0 or high < 0,
+            }
+        )
+    return pd.DataFrame(
+        rows,
+        columns=[
+            "Model A",
+            "Model B",
+            "Paired Samples",
+            "Difference",
+            "CI Low",
+            "CI High",
+            "Decided",
+        ],
+    )
+
+
+def main():
+    from .mock import mock_problems, mock_solve
+
+    parser = argparse.ArgumentParser(description="Sequential evaluation on mock data")
+    parser.add_argument("--mock", type=int, default=200)
+    parser.add_argument("--models", nargs="+", default=["mock-strong", "mock-weak"])
+    parser.add_argument("--target-width", type=float, default=0.2)
+    parser.add_argument("--passes", type=int, default=1)
+    args = parser.parse_args()
+
+    report = asyncio.run(
+        run_sequential_experiment(
+            mock_problems(args.mock),
+            args.models,
+            mock_solve,
+            target_width=args.target_width,
+            max_passes=args.passes,
+        )
+    )
+    print(report.models)
+    print(report.comparisons)
+    print(report.summary())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,355 @@
+"""Sharded GAIA evaluation across processes or hosts.
+
+Work is coordinated entirely through a shared directory, so the same code runs
+several processes on one box or several hosts on a network filesystem:
+
+    <dir>/plan.json              models and shard ids
+    <dir>/shards/<id>.json       the problems and model for one shard
+    <dir>/leases/<id>/<gen>      one file per lease holder, newest generation
+                                 wins; its mtime is the worker's heartbeat
+    <dir>/results/<id>.jsonl     results, appended as they complete
+    <dir>/done/<id>              marker written when a shard finishes
+
+Workers lease a shard by exclusively creating the next generation's lease file
+and keep it alive by touching it. A lease that has not been touched within the
+lease timeout is treated as abandoned and can be taken over; because results
+are appended to a resumable sink the new worker only redoes the unfinished
+pairs. A worker that finds a newer generation than its own has lost the lease
+and stops working on the shard.
+
+Try it locally with the mock solver (run from `src`):
+
+    uv run python -m evaluation.sharding local runs/mock --mock 200 \
+        --models mock-strong mock-weak --workers 4
+"""
+
+import argparse
+import asyncio
+import importlib
+import json
+import multiprocessing
+import os
+import socket
+import time
+import uuid
+
+from .runner import run_experiment
+from .sinks import JsonlResultSink, read_jsonl_results
+
+DEFAULT_SHARD_SIZE = 10
+DEFAULT_LEASE_TIMEOUT = 60.0
+DEFAULT_HEARTBEAT_INTERVAL = 10.0
+
+
+def _path(directory: str, *parts: str) -> str:
+    return os.path.join(directory, *parts)
+
+
+def _write_json_atomic(path: str, data):
+    tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, default=str)
+    os.replace(tmp, path)
+
+
+def plan_shards(
+    directory: str,
+    problems: list[dict],
+    models: list[str],
+    shard_size: int = DEFAULT_SHARD_SIZE,
+) -> list[str]:
+    """Partition problems x models into shards and write them to `directory`."""
+    for sub in ("shards", "leases", "results", "done"):
+        os.makedirs(_path(directory, sub), exist_ok=True)
+
+    shard_ids = []
+    for m, model in enumerate(models):
+        for start in range(0, len(problems), shard_size):
+            shard_id = f"m{m:02d}-p{start:06d}"
+            _write_json_atomic(
+                _path(directory, "shards", f"{shard_id}.json"),
+                {"model": model, "problems": problems[start : start + shard_size]},
+            )
+            shard_ids.append(shard_id)
+
+    _write_json_atomic(
+        _path(directory, "plan.json"), {"models": models, "shards": shard_ids}
+    )
+    return shard_ids
+
+
+def _load_plan(directory: str) -> dict:
+    with open(_path(directory, "plan.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _is_done(directory: str, shard_id: str) -> bool:
+    return os.path.exists(_path(directory, "done", shard_id))
+
+
+def _generations(leases: str) -> list[int]:
+    try:
+        names = os.listdir(leases)
+    except FileNotFoundError:
+        return []
+    return sorted(int(name) for name in names if name.isdigit())
+
+
+def _try_lease(
+    directory: str, shard_id: str, worker_id: str, timeout: float
+) -> str | None:
+    """Take the shard's lease if it is free or its holder stopped heartbeating.
+
+    Returns the new lease file. Each holder creates the next generation's
+    file with O_EXCL, so of several workers racing for an expired lease
+    only one can win it.
+    """
+    leases = _path(directory, "leases", shard_id)
+    os.makedirs(leases, exist_ok=True)
+    generations = _generations(leases)
+    if generations:
+        try:
+            age = time.time() - os.path.getmtime(_path(leases, str(generations[-1])))
+            if age < timeout:
+                return None
+        except FileNotFoundError:
+            # Cleaned up by a worker that has just taken the lease
+            return None
+
+    generation = generations[-1] + 1 if generations else 0
+    lease = _path(leases, str(generation))
+    try:
+        fd = os.open(lease, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    except FileExistsError:
+        return None
+    with os.fdopen(fd, "w") as f:
+        f.write(worker_id)
+    for old in generations:
+        try:
+            os.remove(_path(leases, str(old)))
+        except FileNotFoundError:
+            pass
+    return lease
+
+
+def _holds_lease(lease: str, worker_id: str) -> bool:
+    """Whether `lease` is still the newest generation and carries `worker_id`."""
+    leases, generation = os.path.split(lease)
+    generations = _generations(leases)
+    if not generations or generations[-1] != int(generation):
+        return False
+    try:
+        with open(lease, encoding="utf-8") as f:
+            return f.read() == worker_id
+    except FileNotFoundError:
+        return False
+
+
+def _release_lease(lease: str, worker_id: str):
+    # Expire rather than delete, so generations keep increasing
+    if _holds_lease(lease, worker_id):
+        try:
+            os.utime(lease, (0, 0))
+        except FileNotFoundError:
+            pass
+
+
+async def _heartbeat(lease: str, worker_id: str, interval: float):
+    """Touch the lease until it is lost to another worker, then return."""
+    while True:
+        await asyncio.sleep(interval)
+        if not _holds_lease(lease, worker_id):
+            return
+        try:
+            os.utime(lease)
+        except FileNotFoundError:
+            return
+
+
+def load_solver(spec: str):
+    """Import a solve function from a "module:function" string."""
+    module_name, _, attr = spec.partition(":")
+    return getattr(importlib.import_module(module_name), attr)
+
+
+async def run_worker(
+    directory: str,
+    solve_fn,
+    worker_id: str | None = None,
+    lease_timeout: float = DEFAULT_LEASE_TIMEOUT,
+    heartbeat_interval: float = DEFAULT_HEARTBEAT_INTERVAL,
+    max_concurrency: int = 8,
+) -> int:
+    """Lease and run shards until every shard is done. Returns shards completed."""
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+    shard_ids = _load_plan(directory)["shards"]
+    completed = 0
+
+    while True:
+        remaining = [s for s in shard_ids if not _is_done(directory, s)]
+        if not remaining:
+            return completed
+
+        lease = shard_id = None
+        for candidate in remaining:
+            lease = _try_lease(directory, candidate, worker_id, lease_timeout)
+            if lease is not None:
+                shard_id = candidate
+                break
+        if shard_id is None:
+            # Everything left is leased by live workers; wait in case one dies
+            await asyncio.sleep(heartbeat_interval)
+            continue
+        if _is_done(directory, shard_id):
+            # Finished by the previous holder after we listed the shards
+            _release_lease(lease, worker_id)
+            continue
+
+        work = asyncio.create_task(
+            _run_shard(directory, shard_id, solve_fn, max_concurrency)
+        )
+        heartbeat = asyncio.create_task(
+            _heartbeat(lease, worker_id, heartbeat_interval)
+        )
+        try:
+            await asyncio.wait({work, heartbeat}, return_when=asyncio.FIRST_COMPLETED)
+            if not work.done():
+                # The lease was taken over; leave the shard to its new holder
+                work.cancel()
+                await asyncio.gather(work, return_exceptions=True)
+                continue
+            work.result()
+            _write_json_atomic(
+                _path(directory, "done", shard_id), {"worker": worker_id}
+            )
+            completed += 1
+        finally:
+            work.cancel()
+            heartbeat.cancel()
+            _release_lease(lease, worker_id)
+
+
+async def _run_shard(directory: str, shard_id: str, solve_fn, max_concurrency: int):
+    with open(_path(directory, "shards", f"{shard_id}.json"), encoding="utf-8") as f:
+        shard = json.load(f)
+    with JsonlResultSink(_path(directory, "results", f"{shard_id}.jsonl")) as sink:
+        await run_experiment(
+            shard["problems"],
+            [shard["model"]],
+            solve_fn,
+            sink=sink,
+            max_concurrency=max_concurrency,
+        )
+
+
+def _worker_process(directory: str, solver: str, kwargs: dict):
+    asyncio.run(run_worker(directory, load_solver(solver), **kwargs))
+
+
+def run_local(directory: str, solver: str, num_workers: int, **worker_kwargs):
+    """Run `num_workers` worker processes on this machine and wait for them."""
+    ctx = multiprocessing.get_context("spawn")
+    processes = [
+        ctx.Process(target=_worker_process, args=(directory, solver, worker_kwargs))
+        for _ in range(num_workers)
+    ]
+    for p in processes:
+        p.start()
+    for p in processes:
+        p.join()
+
+
+def merge_results(directory: str) -> dict[str, list]:
+    """Combine every shard's results into the shape `generate_accuracy_table` expects."""
+    plan = _load_plan(directory)
+    results = {model: [] for model in plan["models"]}
+    for shard_id in plan["shards"]:
+        path = _path(directory, "results", f"{shard_id}.jsonl")
+        if not os.path.exists(path):
+            continue
+        # Workers may still be appending, so never open shards for writing
+        for result in read_jsonl_results(path):
+            results[result["model"]].append(result)
+    return results
+
+
+def _load_problems(args) -> list[dict]:
+    if args.mock:
+        from .mock import mock_problems
+
+        return mock_problems(args.mock)
+
+    from .dataset import load_gaia
+
+    dataset = load_gaia(split=args.split, levels=tuple(args.levels))
+    dataset = dataset.filter(levels=args.levels)
+    if args.limit:
+        dataset = dataset.head(args.limit)
+    return dataset.to_list()
+
+
+def _print_tables(directory: str):
+    from .reporting import generate_accuracy_table, generate_unsolvable_summary
+
+    results = merge_results(directory)
+    print("\n============= Accuracy Table =============")
+    print(generate_accuracy_table(results))
+    print("\n============= Unsolvable Summary =============")
+    print(generate_unsolvable_summary(results))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sharded GAIA evaluation")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    plan = argparse.ArgumentParser(add_help=False)
+    plan.add_argument("directory")
+    plan.add_argument("--models", nargs="+", required=True)
+    plan.add_argument("--shard-size", type=int, default=DEFAULT_SHARD_SIZE)
+    plan.add_argument("--mock", type=int, default=0, help="use N mock problems")
+    plan.add_argument("--levels", type=int, nargs="+", default=[1])
+    plan.add_argument("--split", default="validation")
+    plan.add_argument("--limit", type=int, default=0)
+
+    worker = argparse.ArgumentParser(add_help=False)
+    worker.add_argument("--solver", default=None, help='"module:function"')
+    worker.add_argument("--lease-timeout", type=float, default=DEFAULT_LEASE_TIMEOUT)
+    worker.add_argument("--heartbeat", type=float, default=DEFAULT_HEARTBEAT_INTERVAL)
+    worker.add_argument("--concurrency", type=int, default=8)
+
+    sub.add_parser("plan", parents=[plan])
+    p_worker = sub.add_parser("worker", parents=[worker])
+    p_worker.add_argument("directory")
+    p_local = sub.add_parser("local", parents=[plan, worker])
+    p_local.add_argument("--workers", type=int, default=os.cpu_count())
+    sub.add_parser("merge").add_argument("directory")
+
+    args = parser.parse_args()
+
+    if args.command in ("plan", "local"):
+        plan_shards(args.directory, _load_problems(args), args.models, args.shard_size)
+
+    if args.command in ("worker", "local"):
+        solver = args.solver or (
+            "evaluation.mock:mock_solve"
+            if getattr(args, "mock", 0)
+            else "agents.agent_1:solve_problem"
+        )
+        worker_kwargs = {
+            "lease_timeout": args.lease_timeout,
+            "heartbeat_interval": args.heartbeat,
+            "max_concurrency": args.concurrency,
+        }
+        if args.command == "worker":
+            asyncio.run(
+                run_worker(args.directory, load_solver(solver), **worker_kwargs)
+            )
+        else:
+            run_local(args.directory, solver, args.workers, **worker_kwargs)
+
+    if args.command in ("merge", "local"):
+        _print_tables(args.directory)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+import json
+import os
+import sqlite3
+import time
+
+
+def _is_complete(result: dict) -> bool:
+    """Errored results are stored but retried on the next run."""
+    return not result.get("error")
+
+
+def _drop_torn_line(path: str, block: int = 65536):
+    """Truncate a JSONL file after its last newline.
+
+    A crash mid-write leaves a partial last line; appending to it would glue
+    the next record onto it and lose that record too.
+    """
+    try:
+        f = open(path, "rb+")
+    except FileNotFoundError:
+        return
+    with f:
+        end = f.seek(0, os.SEEK_END)
+        position = end
+        while position > 0:
+            start = max(0, position - block)
+            f.seek(start)
+            newline = f.read(position - start).rfind(b"\n")
+            if newline != -1:
+                position = start + newline + 1
+                break
+            position = start
+        if position != end:
+            f.truncate(position)
+
+
+def read_jsonl_results(path: str) -> list[dict]:
+    """Results in a JSONL file, last line per (task_id, model) winning.
+
+    Opens the file read-only, so it is safe on a file another process is
+    still appending to; a torn or half-written last line is skipped.
+    """
+    latest = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                result = json.loads(line)
+            except json.JSONDecodeError:
+                # A torn final line from a crash or a write in progress
+                continue
+            latest[(result["task_id"], result["model"])] = result
+    return list(latest.values())
+
+
+class JsonlResultSink:
+    """Append-only JSONL file of evaluation results.
+
+    Each result is flushed as soon as it is written, so a process crash loses
+    at most the line being written; a torn last line is cut off when the file
+    is reopened. fsync is batched to once per `fsync_interval` seconds (and on
+    close), so an OS crash can lose that much. When a (task_id, model) pair
+    appears more than once, the last line wins.
+    """
+
+    def __init__(self, path: str, fsync_interval: float = 1.0):
+        self.path = path
+        self.fsync_interval = fsync_interval
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        _drop_torn_line(path)
+        self._file = open(path, "a", encoding="utf-8")
+        self._synced_at = time.monotonic()
+
+    def write(self, result: dict):
+        self._file.write(json.dumps(result, default=str) + "\n")
+        self._file.flush()
+        # write() runs on the event loop; a per-line fsync would block it
+        if time.monotonic() - self._synced_at >= self.fsync_interval:
+            os.fsync(self._file.fileno())
+            self._synced_at = time.monotonic()
+
+    def load(self) -> list[dict]:
+        return read_jsonl_results(self.path)
+
+    def completed(self) -> set[tuple[str, str]]:
+        return {(r["task_id"], r["model"]) for r in self.load() if _is_complete(r)}
+
+    def close(self):
+        if not self._file.closed:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class SqliteResultSink:
+    """SQLite table of evaluation results keyed by (task_id, model)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS results (
+                task_id TEXT NOT NULL,
+                model TEXT NOT NULL,
+                complete INTEGER NOT NULL,
+                data TEXT NOT NULL,
+                PRIMARY KEY (task_id, model)
+            )
+            """
+        )
+        self._conn.commit()
+
+    def write(self, result: dict):
+        self._conn.execute(
+            "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)",
+            (
+                result["task_id"],
+                result["model"],
+                int(_is_complete(result)),
+                json.dumps(result, default=str),
+            ),
+        )
+        self._conn.commit()
+
+    def load(self) -> list[dict]:
+        rows = self._conn.execute("SELECT data FROM results").fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+    def completed(self) -> set[tuple[str, str]]:
+        rows = self._conn.execute(
+            "SELECT task_id, model FROM results WHERE complete = 1"
+        ).fetchall()
+        return set(rows)
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_sink(path: str):
+    """Open a result sink, choosing the backend from the file extension."""
+    if path.endswith((".db", ".sqlite", ".sqlite3")):
+        return SqliteResultSink(path)
+    return JsonlResultSink(path)
@@ -0,0 +1,96 @@
+import os
+import uuid
+from datetime import datetime, timezone
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from .reporting import results_to_frame
+
+SCHEMA = pa.schema(
+    [
+        ("run_id", pa.string()),
+        ("model", pa.string()),
+        ("prompt_version", pa.string()),
+        ("timestamp", pa.timestamp("us", tz="UTC")),
+        ("task_id", pa.string()),
+        ("correct", pa.bool_()),
+        ("is_solvable", pa.bool_()),
+        ("prediction", pa.string()),
+        ("answer", pa.string()),
+        ("unsolvable_reason", pa.string()),
+        ("error", pa.string()),
+        ("latency_s", pa.float64()),
+        ("prompt_tokens", pa.int64()),
+        ("completion_tokens", pa.int64()),
+        ("cost_usd", pa.float64()),
+    ]
+)
+
+
+class ResultStore:
+    """Columnar Parquet store of evaluation results across many runs.
+
+    Every `append` writes one Parquet file whose rows are tagged with the run
+    id, model, prompt version and timestamp. `load` reads the whole directory
+    as one Arrow dataset, pushing run/model filters and column selection down
+    to the files so only the needed data is read.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def append(
+        self,
+        results: dict[str, list] | pd.DataFrame,
+        run_id: str | None = None,
+        prompt_version: str = "",
+        timestamp: datetime | None = None,
+    ) -> str:
+        """Store the results of one run and return its run id."""
+        run_id = run_id or datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+        df = results_to_frame(results).copy()
+        df["model"] = df["model"].astype(str)
+        df["run_id"] = run_id
+        df["prompt_version"] = prompt_version
+        df["timestamp"] = pd.Timestamp(timestamp or datetime.now(timezone.utc))
+
+        for column in SCHEMA.names:
+            if column not in df:
+                df[column] = None
+        # Results that errored have None rather than False for is_solvable
+        for column in ("correct", "is_solvable"):
+            df[column] = df[column].astype("boolean")
+
+        table = pa.Table.from_pandas(
+            df[SCHEMA.names], schema=SCHEMA, preserve_index=False
+        )
+        pq.write_table(
+            table, os.path.join(self.root, f"{run_id}-{uuid.uuid4().hex[:8]}.parquet")
+        )
+        return run_id
+
+    def load(
+        self,
+        run_ids: list[str] | None = None,
+        models: list[str] | None = None,
+        columns: list[str] | None = None,
+    ) -> pd.DataFrame:
+        """Load results, optionally filtered by run and model."""
+        dataset = ds.dataset(self.root, format="parquet", schema=SCHEMA)
+        condition = None
+        if run_ids is not None:
+            condition = ds.field("run_id").isin(run_ids)
+        if models is not None:
+            model_filter = ds.field("model").isin(models)
+            condition = model_filter if condition is None else condition & model_filter
+        table = dataset.to_table(filter=condition, columns=columns)
+        return table.to_pandas()
+
+    def run_ids(self) -> list[str]:
+        """All run ids in the store, oldest first."""
+        df = self.load(columns=["run_id", "timestamp"])
+        return df.groupby("run_id")["timestamp"].min().sort_values().index.tolist()
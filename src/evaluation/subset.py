@@ -0,0 +1,246 @@
+"""Pick a small, stratified smoke-test set of GAIA questions from past results.
+
+Every (run, model) pair in the history is treated as one "system". For each
+question we estimate how hard it is (share of systems that got it wrong) and
+how discriminative it is (correlation between getting it right and the
+system's accuracy on the other questions). Questions are grouped into strata
+by level, tool need and difficulty band; the budget is split across strata in
+proportion to their size, and within a stratum the most discriminative
+questions are taken.
+
+A set chosen this way is not an unbiased sample, so full-set accuracy is
+predicted from smoke-set accuracy through a linear calibration fitted on the
+history. `cross_validate_fidelity` estimates the error of that prediction by
+choosing and calibrating the set on some systems and scoring it on the others,
+so changes can be gated on the smoke set with a known error.
+
+    uv run python -m evaluation.subset results/ --size 20 --output smoke.json
+"""
+
+import argparse
+import json
+
+import numpy as np
+import pandas as pd
+
+DIFFICULTY_BANDS = ("easy", "medium", "hard")
+
+
+def _tool_need(row) -> str:
+    tools = row.get("tools") or ""
+    if row.get("has_attachment"):
+        return "file"
+    if "web browser" in tools or "search" in tools:
+        return "web"
+    if tools.strip("|"):
+        return "other"
+    return "none"
+
+
+def metadata_frame(problems) -> pd.DataFrame:
+    """Question metadata (level, tool need) from GaiaDataset rows."""
+    df = pd.DataFrame(
+        [
+            {
+                "task_id": p["task_id"],
+                "level": int(p.get("level") or p.get("Level") or 0),
+                "has_attachment": bool(p.get("file_name")),
+                "tools": p.get("tools", ""),
+            }
+            for p in problems
+        ]
+    )
+    df["tool_need"] = df.apply(_tool_need, axis=1)
+    return df.drop(columns=["tools"])
+
+
+def _outcome_matrix(history: pd.DataFrame) -> pd.DataFrame:
+    """Systems x questions matrix of 1/0 correctness (NaN where not attempted)."""
+    history = history.assign(
+        system=history["run_id"].astype(str) + "|" + history["model"].astype(str),
+        correct=history["correct"].eq(True).astype(float),
+    )
+    return history.pivot_table(
+        index="system", columns="task_id", values="correct", aggfunc="mean"
+    )
+
+
+def question_stats(history: pd.DataFrame) -> pd.DataFrame:
+    """Per-question attempts, difficulty and discrimination from past results."""
+    matrix = _outcome_matrix(history)
+    values = matrix.to_numpy()
+    attempted = ~np.isnan(values)
+    filled = np.nan_to_num(values)
+
+    totals = filled.sum(axis=1, keepdims=True)
+    counts = attempted.sum(axis=1, keepdims=True)
+    # Each system's accuracy on every other question it attempted
+    rest = (totals - filled) / np.maximum(counts - attempted, 1)
+
+    discrimination = []
+    for j in range(values.shape[1]):
+        mask = attempted[:, j]
+        x, y = values[mask, j], rest[mask, j]
+        if mask.sum() < 3 or x.std() == 0 or y.std() == 0:
+            discrimination.append(0.0)
+        else:
+            discrimination.append(float(np.corrcoef(x, y)[0, 1]))
+
+    return pd.DataFrame(
+        {
+            "task_id": matrix.columns,
+            "attempts": attempted.sum(axis=0),
+            "difficulty": 1 - np.nanmean(values, axis=0),
+            "discrimination": discrimination,
+        }
+    )
+
+
+def _allocate(sizes: pd.Series, budget: int) -> pd.Series:
+    """Split `budget` across strata in proportion to size (largest remainder)."""
+    budget = min(budget, int(sizes.sum()))
+    exact = sizes / sizes.sum() * budget
+    alloc = np.floor(exact).astype(int)
+    remainder = (exact - alloc).sort_values(ascending=False)
+    for stratum in remainder.index[: budget - alloc.sum()]:
+        alloc.loc[stratum] += 1
+    return alloc
+
+
+def select_smoke_set(
+    history: pd.DataFrame, metadata: pd.DataFrame, size: int
+) -> list[str]:
+    """Choose `size` task ids, stratified and favouring discriminative questions."""
+    stats = metadata.merge(question_stats(history), on="task_id", how="left")
+    # Unseen questions count as middling and uninformative
+    stats["difficulty"] = stats["difficulty"].fillna(0.5)
+    stats["discrimination"] = stats["discrimination"].fillna(0.0)
+    stats["band"] = pd.cut(
+        stats["difficulty"], bins=[-0.01, 1 / 3, 2 / 3, 1.0], labels=DIFFICULTY_BANDS
+    )
+    strata = ["level", "tool_need", "band"]
+
+    sizes = stats.groupby(strata, observed=True).size()
+    alloc = _allocate(sizes, size)
+
+    # Best first within each stratum; prefer questions near 50% on ties
+    stats["balance"] = -(stats["difficulty"] - 0.5).abs()
+    ranked = stats.sort_values(
+        ["discrimination", "balance", "task_id"], ascending=[False, False, True]
+    )
+    ranked["rank"] = ranked.groupby(strata, observed=True).cumcount()
+    ranked = ranked.join(alloc.rename("quota"), on=strata)
+    chosen = ranked[ranked["rank"] < ranked["quota"]]
+    return chosen.sort_values("task_id")["task_id"].tolist()
+
+
+def _smoke_and_full(history: pd.DataFrame, task_ids: list[str]) -> pd.DataFrame:
+    matrix = _outcome_matrix(history)
+    smoke = matrix[matrix.columns.intersection(task_ids)].mean(axis=1)
+    return pd.DataFrame({"full": matrix.mean(axis=1), "smoke": smoke}).dropna()
+
+
+def _calibration(both: pd.DataFrame) -> tuple[float, float]:
+    """Least-squares fit of full accuracy from smoke accuracy."""
+    if len(both) < 2 or both["smoke"].std() == 0:
+        return float(both["full"].mean() - both["smoke"].mean()), 1.0
+    slope, intercept = np.polyfit(both["smoke"], both["full"], 1)
+    return float(intercept), float(slope)
+
+
+def _fidelity(both: pd.DataFrame, predicted: pd.Series) -> dict:
+    if len(both) < 2:
+        return {"systems": len(both), "pearson": None, "spearman": None, "mae": None}
+    error = (predicted - both["full"]).abs()
+    return {
+        "systems": len(both),
+        "pearson": float(both["full"].corr(both["smoke"])),
+        # Spearman is Pearson on ranks
+        "spearman": float(both["full"].rank().corr(both["smoke"].rank())),
+        "mae": float(error.mean()),
+        "p95_error": float(error.quantile(0.95)),
+    }
+
+
+def estimate_fidelity(history: pd.DataFrame, task_ids: list[str]) -> dict:
+    """In-sample agreement between smoke-set and full-set accuracy across systems.
+
+    Errors are for the calibrated prediction `intercept + slope * smoke`,
+    since a set chosen for discrimination is not an unbiased sample.
+    """
+    both = _smoke_and_full(history, task_ids)
+    intercept, slope = _calibration(both)
+    return {
+        **_fidelity(both, intercept + slope * both["smoke"]),
+        "intercept": intercept,
+        "slope": slope,
+    }
+
+
+def cross_validate_fidelity(
+    history: pd.DataFrame,
+    metadata: pd.DataFrame,
+    size: int,
+    folds: int = 5,
+    seed: int = 0,
+) -> dict:
+    """Out-of-sample fidelity: select and calibrate on some systems, score on the rest."""
+    systems = history["run_id"].astype(str) + "|" + history["model"].astype(str)
+    unique = np.array(sorted(systems.unique()))
+    rng = np.random.default_rng(seed)
+    rng.shuffle(unique)
+    fold = systems.map({s: i % folds for i, s in enumerate(unique)})
+
+    held_out = []
+    for k in range(min(folds, len(unique))):
+        train, test = history[fold != k], history[fold == k]
+        task_ids = select_smoke_set(train, metadata, size)
+        intercept, slope = _calibration(_smoke_and_full(train, task_ids))
+        both = _smoke_and_full(test, task_ids)
+        held_out.append(both.assign(predicted=intercept + slope * both["smoke"]))
+
+    both = pd.concat(held_out)
+    return _fidelity(both, both["predicted"])
+
+
+def main():
+    from .dataset import load_gaia
+    from .store import ResultStore
+
+    parser = argparse.ArgumentParser(description="Select a smoke-test question set")
+    parser.add_argument("store", help="ResultStore directory with past runs")
+    parser.add_argument("--size", type=int, default=20)
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--output", help="write the chosen task ids as JSON")
+    args = parser.parse_args()
+
+    history = ResultStore(args.store).load(
+        columns=["run_id", "model", "task_id", "correct"]
+    )
+    metadata = metadata_frame(load_gaia())
+    task_ids = select_smoke_set(history, metadata, args.size)
+    calibration = estimate_fidelity(history, task_ids)
+    fidelity = cross_validate_fidelity(history, metadata, args.size, args.folds)
+
+    print(f"Selected {len(task_ids)} of {len(metadata)} questions")
+    print(
+        f"Predict full accuracy as {calibration['intercept']:.3f} + "
+        f"{calibration['slope']:.3f} * smoke accuracy"
+    )
+    print(f"Held-out fidelity: {fidelity}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "task_ids": task_ids,
+                    "intercept": calibration["intercept"],
+                    "slope": calibration["slope"],
+                    "fidelity": fidelity,
+                },
+                f,
+                indent=2,
+            )
+
+
+if __name__ == "__main__":
+    main()
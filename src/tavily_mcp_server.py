@@ -1,16 +1,149 @@
+import argparse
+import asyncio
+import hashlib
 import os
-from tavily import TavilyClient
+import time
+from collections import OrderedDict
 from dotenv import load_dotenv
 from mcp.server.fastmcp import FastMCP
+from tavily import AsyncTavilyClient
 
 load_dotenv()
 
-tavily_client = TavilyClient(os.getenv("TAVILY_API_KEY"))
+# Defaults can be overridden per deployment through the environment or the CLI.
+DEFAULT_MAX_RESULTS = int(os.getenv("SEARCH_DEFAULT_MAX_RESULTS", "5"))
+MAX_RESULTS_LIMIT = int(os.getenv("SEARCH_MAX_RESULTS_LIMIT", "10"))
+MAX_CONCURRENT_SEARCHES = int(os.getenv("SEARCH_MAX_CONCURRENCY", "8"))
+CACHE_TTL_SECONDS = float(os.getenv("SEARCH_CACHE_TTL", "600"))
+CACHE_MAX_ENTRIES = int(os.getenv("SEARCH_CACHE_SIZE", "1024"))
+
+
+class TavilySearchBackend:
+    """Async search backend that calls the Tavily API."""
+
+    def __init__(self, api_key: str | None = None):
+        self._client = AsyncTavilyClient(api_key or os.getenv("TAVILY_API_KEY"))
+
+    async def search(self, query: str, max_results: int) -> list[dict]:
+        response = await self._client.search(query, max_results=max_results)
+        return response.get("results", [])
+
+
+class FakeSearchBackend:
+    """Offline backend returning canned results after a simulated delay.
+
+    Used for load testing the server without network access or API spend.
+    """
+
+    def __init__(self, latency: float = 0.2):
+        self.latency = latency
+        self.calls = 0
+
+    async def search(self, query: str, max_results: int) -> list[dict]:
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        digest = hashlib.sha1(query.encode()).hexdigest()[:8]
+        return [
+            {
+                "title": f"Result {i + 1} for {query}",
+                "url": f"https://example.com/{digest}/{i + 1}",
+                "content": f"Fake content {i + 1} about {query}.",
+            }
+            for i in range(max_results)
+        ]
+
+
+class SearchService:
+    """Runs searches through a bounded pool and a result cache shared by all clients.
+
+    Identical queries that arrive while a search is already in flight wait on
+    that search instead of hitting the backend again.
+    """
+
+    def __init__(
+        self,
+        backend,
+        max_concurrency: int = MAX_CONCURRENT_SEARCHES,
+        cache_ttl: float = CACHE_TTL_SECONDS,
+        cache_size: int = CACHE_MAX_ENTRIES,
+        max_results_limit: int = MAX_RESULTS_LIMIT,
+    ):
+        self.backend = backend
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        self.max_results_limit = max_results_limit
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._cache: OrderedDict[tuple, tuple[float, list[dict]]] = OrderedDict()
+        self._in_flight: dict[tuple, asyncio.Task] = {}
+
+    def clamp_max_results(self, max_results: int) -> int:
+        return max(1, min(max_results, self.max_results_limit))
+
+    async def search(self, query: str, max_results: int) -> list[dict]:
+        max_results = self.clamp_max_results(max_results)
+        key = (" ".join(query.lower().split()), max_results)
+
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._fetch(key, query, max_results))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        # Shield so one client disconnecting does not cancel the shared search
+        return await asyncio.shield(task)
+
+    async def _fetch(self, key: tuple, query: str, max_results: int) -> list[dict]:
+        async with self._semaphore:
+            results = await self.backend.search(query, max_results)
+        self._cache_put(key, results)
+        return results
+
+    def _cache_get(self, key: tuple) -> list[dict] | None:
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        stored_at, results = entry
+        if time.monotonic() - stored_at > self.cache_ttl:
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        return results
+
+    def _cache_put(self, key: tuple, results: list[dict]):
+        self._cache[key] = (time.monotonic(), results)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+
+def create_backend(name: str, fake_latency: float = 0.2):
+    """Build a search backend by name ("tavily" or "fake")."""
+    if name == "fake":
+        return FakeSearchBackend(latency=fake_latency)
+    if name == "tavily":
+        return TavilySearchBackend()
+    raise ValueError(f"Unknown search backend: {name}")
+
 
 mcp = FastMCP("custom-tavily-search")
 
+search_service: SearchService | None = None
+
+
+def get_search_service() -> SearchService:
+    global search_service
+    if search_service is None:
+        search_service = SearchService(
+            create_backend(os.getenv("SEARCH_BACKEND", "tavily"))
+        )
+    return search_service
+
+
 @mcp.tool()
-def search_web(query: str, max_results: int = 5) -> str:
+async def search_web(query: str, max_results: int = DEFAULT_MAX_RESULTS) -> str:
     """
     Search the web using Tavily API.
 
@@ -22,11 +155,7 @@ def search_web(query: str, max_results: int = 5) -> str:
         Search results as formatted string
     """
     try:
-        response = tavily_client.search(
-            query,
-            max_results=max_results,
-        )
-        results = response.get("results", [])
+        results = await get_search_service().search(query, max_results)
         return "\n\n".join(
             f"Title: {r['title']}\nURL: {r['url']}\nContent: {r['content']}"
             for r in results
@@ -34,6 +163,44 @@ def search_web(query: str, max_results: int = 5) -> str:
     except Exception as e:
         return f"Error searching web: {str(e)}"
 
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Tavily search MCP server")
+    parser.add_argument(
+        "--transport",
+        choices=["stdio", "streamable-http"],
+        default=os.getenv("MCP_TRANSPORT", "stdio"),
+        help="stdio serves one client; streamable-http lets many agents share one server",
+    )
+    parser.add_argument("--host", default=os.getenv("MCP_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("MCP_PORT", "8000")))
+    parser.add_argument(
+        "--backend",
+        choices=["tavily", "fake"],
+        default=os.getenv("SEARCH_BACKEND", "tavily"),
+        help="use 'fake' for offline load testing",
+    )
+    parser.add_argument("--fake-latency", type=float, default=0.2)
+    parser.add_argument("--max-concurrency", type=int, default=MAX_CONCURRENT_SEARCHES)
+    parser.add_argument("--max-results-limit", type=int, default=MAX_RESULTS_LIMIT)
+    parser.add_argument("--cache-ttl", type=float, default=CACHE_TTL_SECONDS)
+    parser.add_argument("--cache-size", type=int, default=CACHE_MAX_ENTRIES)
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
-    mcp.run(transport='stdio')
-    
\ No newline at end of file
+    args = parse_args()
+
+    search_service = SearchService(
+        create_backend(args.backend, fake_latency=args.fake_latency),
+        max_concurrency=args.max_concurrency,
+        cache_ttl=args.cache_ttl,
+        cache_size=args.cache_size,
+        max_results_limit=args.max_results_limit,
+    )
+
+    if args.transport == "streamable-http":
+        mcp.settings.host = args.host
+        mcp.settings.port = args.port
+
+    mcp.run(transport=args.transport)
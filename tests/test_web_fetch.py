@@ -0,0 +1,108 @@
+import asyncio
+import tempfile
+import unittest
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from react_agents.tools.web_fetch import WebFetcher
+
+PAGE = "<html><head><title>Fixture</title></head><body><p>Hello from the fixture</p></body></html>"
+
+
+def fixture_app(hits: dict) -> web.Application:
+    """A local site with an ETag page, a large page, a slow page and a fast one."""
+
+    async def etag(request):
+        hits.setdefault("etag", []).append(request.headers.get("If-None-Match"))
+        if request.headers.get("If-None-Match") == '"v1"':
+            return web.Response(status=304, headers={"ETag": '"v1"'})
+        return web.Response(
+            text=PAGE, content_type="text/html", headers={"ETag": '"v1"'}
+        )
+
+    async def big(request):
+        return web.Response(text="x" * 1_000_000, content_type="text/plain")
+
+    async def slow(request):
+        response = web.StreamResponse(headers={"Content-Type": "text/plain"})
+        await response.prepare(request)
+        await response.write(b"first part ")
+        await asyncio.sleep(2)
+        await response.write(b"second part")
+        return response
+
+    async def fast(request):
+        hits.setdefault("fast", []).append(asyncio.get_running_loop().time())
+        return web.Response(text="ok", content_type="text/plain")
+
+    app = web.Application()
+    app.router.add_get("/etag", etag)
+    app.router.add_get("/big", big)
+    app.router.add_get("/slow", slow)
+    app.router.add_get("/fast", fast)
+    return app
+
+
+class WebFetcherTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.hits = {}
+        self.server = TestServer(fixture_app(self.hits))
+        await self.server.start_server()
+        self.cache_dir = tempfile.TemporaryDirectory()
+
+    async def asyncTearDown(self):
+        await self.server.close()
+        self.cache_dir.cleanup()
+
+    def url(self, path: str) -> str:
+        return str(self.server.make_url(path))
+
+    async def test_stale_page_is_revalidated_with_etag(self):
+        fetcher = WebFetcher(cache_dir=self.cache_dir.name, fresh_for=0, min_interval=0)
+        try:
+            first = await fetcher.fetch(self.url("/etag"))
+            second = await fetcher.fetch(self.url("/etag"))
+        finally:
+            await fetcher.close()
+        self.assertEqual(first.title, "Fixture")
+        self.assertIn("Hello from the fixture", first.text)
+        self.assertEqual(self.hits["etag"], [None, '"v1"'])
+        self.assertTrue(second.from_cache)
+        self.assertEqual(second.text, first.text)
+        self.assertEqual(fetcher.revalidated, 1)
+
+    async def test_download_stops_at_max_bytes(self):
+        fetcher = WebFetcher(max_bytes=10_000, max_chars=1_000_000, min_interval=0)
+        try:
+            page = await fetcher.fetch(self.url("/big"))
+        finally:
+            await fetcher.close()
+        self.assertTrue(page.truncated)
+        self.assertEqual(page.bytes, 10_000)
+        self.assertEqual(len(page.text), 10_000)
+
+    async def test_timeout_returns_partial_page(self):
+        fetcher = WebFetcher(min_interval=0)
+        try:
+            page = await fetcher.fetch(self.url("/slow"), timeout=0.3)
+        finally:
+            await fetcher.close()
+        self.assertTrue(page.timed_out)
+        self.assertEqual(page.text, "first part ")
+        self.assertLess(page.seconds, 1.5)
+
+    async def test_requests_to_one_domain_are_paced(self):
+        fetcher = WebFetcher(per_domain=1, min_interval=0.2)
+        try:
+            await asyncio.gather(*(fetcher.fetch(self.url("/fast")) for _ in range(3)))
+        finally:
+            await fetcher.close()
+        arrivals = self.hits["fast"]
+        self.assertEqual(len(arrivals), 3)
+        gaps = [later - earlier for earlier, later in zip(arrivals, arrivals[1:])]
+        self.assertTrue(all(gap >= 0.18 for gap in gaps), gaps)
+
+
+if __name__ == "__main__":
+    unittest.main()